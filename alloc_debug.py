@@ -0,0 +1,247 @@
+"""yokero のメモリ確保・GC の計測（デバッグ用）
+
+フレームごとに次のものを数え、画面の状態（GameState）ごとに集計する。
+
+- Surface の作成（pygame.Surface と pygame.transform の拡大縮小・回転）: 呼び出し元の行ごとの回数とピクセルのバイト数
+- Python オブジェクトのメモリ（tracemalloc）: 1フレーム中の増加のピーク、一定間隔のスナップショットで増え続けている行
+- GC（gc.callbacks）: 世代ごとの回数と停止時間
+
+Surface のピクセルは SDL が確保するので tracemalloc には現れない。そのため Surface の作成は
+pygame.Surface を数える版に差し替えて別に数える（stop() で元に戻す）。
+フォントの render() で作られる Surface は数えない。
+
+    python main.py --alloc-debug
+    python benchmarks/bench_render.py --alloc
+"""
+import gc
+import os
+import sys
+import time
+import tracemalloc
+
+import pygame
+
+# 数える pygame.transform の関数
+TRANSFORM_FUNCTIONS = ('scale', 'smoothscale', 'rotate', 'rotozoom', 'scale2x')
+
+
+def _call_site(depth):
+    """呼び出し元の「ファイル名:行 (関数名)」"""
+    frame = sys._getframe(depth + 1)
+    return f"{os.path.basename(frame.f_code.co_filename)}:{frame.f_lineno} ({frame.f_code.co_name})"
+
+
+class _StateStats:
+    """1つの画面の状態の集計"""
+
+    def __init__(self):
+        self.frames = 0
+        self.surfaces = {}  # 呼び出し元 -> [回数, バイト数]
+        self.py_peak_total = 0  # 1フレーム中の増加のピークの合計（バイト）
+        self.py_peak_max = 0
+        self.py_net_total = 0  # フレームの前後の差の合計（バイト）
+        self.growth = {}  # 呼び出し元 -> [バイト数, 個数]（スナップショットの差のうち増えたもの）
+        self.gc = {}  # 世代 -> [回数, 合計 ms, 最大 ms]
+
+    def summary(self):
+        frames = max(1, self.frames)
+        surface_count = sum(count for count, _ in self.surfaces.values())
+        surface_bytes = sum(size for _, size in self.surfaces.values())
+        pauses = [pause for _, _, pause in self.gc.values()]
+        return {
+            'frames': self.frames,
+            'surfaces_per_frame': round(surface_count / frames, 3),
+            'surface_kib_per_frame': round(surface_bytes / frames / 1024, 3),
+            'py_peak_kib_mean': round(self.py_peak_total / frames / 1024, 3),
+            'py_peak_kib_max': round(self.py_peak_max / 1024, 3),
+            'py_net_kib_per_frame': round(self.py_net_total / frames / 1024, 3),
+            'gc_collections': sum(count for count, _, _ in self.gc.values()),
+            'gc_pause_ms_total': round(sum(total for _, total, _ in self.gc.values()), 3),
+            'gc_pause_ms_max': round(max(pauses, default=0.0), 3),
+        }
+
+
+class AllocationTracker:
+    """フレームごとのメモリ確保と GC を画面の状態ごとに集計する
+
+    begin_frame(状態名) と end_frame() でフレームを囲む。フレームの外で起きたものは数えない。
+    """
+
+    def __init__(self, snapshot_interval=60, traceback_frames=1):
+        self.snapshot_interval = snapshot_interval  # 何フレームごとにスナップショットを取るか（0 で取らない）
+        self.traceback_frames = traceback_frames
+        self.states = {}
+        self.running = False
+        self._current = None  # フレーム中なら、その状態の _StateStats
+        self._frame_base = 0
+        self._frame_count = 0
+        self._snapshot = None
+        self._snapshot_state = None
+        self._gc_start = None
+        self._original_surface = None
+        self._original_transforms = {}
+        self._started_tracemalloc = False
+
+    def start(self):
+        if self.running:
+            return
+        self.running = True
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.traceback_frames)
+            self._started_tracemalloc = True
+        gc.callbacks.append(self._on_gc)
+        self._install_surface_hooks()
+
+    def stop(self):
+        if not self.running:
+            return
+        self.running = False
+        self._current = None
+        self._remove_surface_hooks()
+        if self._on_gc in gc.callbacks:
+            gc.callbacks.remove(self._on_gc)
+        self._snapshot = None
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+            self._started_tracemalloc = False
+
+    # --- フレーム ---
+
+    def begin_frame(self, state):
+        if not self.running:
+            return
+        stats = self.states.get(state)
+        if stats is None:
+            stats = self.states[state] = _StateStats()
+        tracemalloc.reset_peak()
+        self._frame_base = tracemalloc.get_traced_memory()[0]
+        self._current = stats
+
+    def end_frame(self):
+        stats = self._current
+        if stats is None:
+            return
+        self._current = None
+        current, peak = tracemalloc.get_traced_memory()
+        peak_delta = peak - self._frame_base
+        stats.frames += 1
+        stats.py_peak_total += peak_delta
+        stats.py_peak_max = max(stats.py_peak_max, peak_delta)
+        stats.py_net_total += current - self._frame_base
+        self._frame_count += 1
+        if self.snapshot_interval and self._frame_count % self.snapshot_interval == 0:
+            self._take_snapshot(stats)
+
+    def _take_snapshot(self, stats):
+        """前回のスナップショットから増えたメモリを呼び出し元ごとに足し込む"""
+        snapshot = tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, __file__),
+            tracemalloc.Filter(False, '<frozen *>'),
+        ))
+        # 状態が切り替わった直後の差は前の状態のものが混ざるので使わない
+        if self._snapshot is not None and self._snapshot_state is stats:
+            for diff in snapshot.compare_to(self._snapshot, 'lineno'):
+                if diff.size_diff <= 0:
+                    continue
+                frame = diff.traceback[0]
+                site = f"{os.path.basename(frame.filename)}:{frame.lineno}"
+                entry = stats.growth.setdefault(site, [0, 0])
+                entry[0] += diff.size_diff
+                entry[1] += diff.count_diff
+        self._snapshot = snapshot
+        self._snapshot_state = stats
+
+    # --- GC ---
+
+    def _on_gc(self, phase, info):
+        if phase == 'start':
+            self._gc_start = time.perf_counter()
+            return
+        if self._gc_start is None:
+            return
+        pause = (time.perf_counter() - self._gc_start) * 1000
+        self._gc_start = None
+        stats = self._current
+        if stats is None:
+            return
+        entry = stats.gc.setdefault(info['generation'], [0, 0.0, 0.0])
+        entry[0] += 1
+        entry[1] += pause
+        entry[2] = max(entry[2], pause)
+
+    # --- Surface の作成 ---
+
+    def _count_surface(self, site, surface):
+        stats = self._current
+        if stats is None:
+            return
+        width, height = surface.get_size()
+        entry = stats.surfaces.get(site)
+        if entry is None:
+            entry = stats.surfaces[site] = [0, 0]
+        entry[0] += 1
+        entry[1] += width * height * surface.get_bytesize()
+
+    def _install_surface_hooks(self):
+        tracker = self
+        original_surface = self._original_surface = pygame.Surface
+
+        class CountingSurface(original_surface):
+            def __init__(self, *args, **kwargs):
+                super().__init__(*args, **kwargs)
+                tracker._count_surface(_call_site(1), self)
+
+        pygame.Surface = CountingSurface
+        for name in TRANSFORM_FUNCTIONS:
+            original = getattr(pygame.transform, name, None)
+            if original is None:
+                continue
+            self._original_transforms[name] = original
+
+            def counting(*args, _original=original, **kwargs):
+                result = _original(*args, **kwargs)
+                tracker._count_surface(_call_site(1), result)
+                return result
+
+            setattr(pygame.transform, name, counting)
+
+    def _remove_surface_hooks(self):
+        if self._original_surface is not None:
+            pygame.Surface = self._original_surface
+            self._original_surface = None
+        for name, original in self._original_transforms.items():
+            setattr(pygame.transform, name, original)
+        self._original_transforms = {}
+
+    # --- 結果 ---
+
+    def summary(self):
+        """状態ごとの集計（ベンチマークの JSON 用）"""
+        return {state: stats.summary() for state, stats in self.states.items()}
+
+    def report(self, top=10):
+        """状態ごとの集計を文字列で返す"""
+        lines = []
+        for state, stats in self.states.items():
+            s = stats.summary()
+            frames = max(1, stats.frames)
+            lines.append(f"== {state}（{stats.frames}フレーム）")
+            lines.append(f"  Surface の作成: {s['surfaces_per_frame']:.2f} 個/フレーム  "
+                         f"{s['surface_kib_per_frame']:.1f} KiB/フレーム")
+            lines.append(f"  Python のメモリ: 1フレーム中の増加 平均 {s['py_peak_kib_mean']:.1f} KiB  "
+                         f"最大 {s['py_peak_kib_max']:.1f} KiB  前後の差 {s['py_net_kib_per_frame']:+.2f} KiB/フレーム")
+            for generation in sorted(stats.gc):
+                count, total, longest = stats.gc[generation]
+                lines.append(f"  GC 世代{generation}: {count}回  合計 {total:.2f} ms  最大 {longest:.2f} ms")
+            if stats.surfaces:
+                lines.append("  Surface を作っている行:")
+                ranked = sorted(stats.surfaces.items(), key=lambda item: item[1][1], reverse=True)[:top]
+                for site, (count, size) in ranked:
+                    lines.append(f"    {count / frames:7.2f} 個/フレーム {size / frames / 1024:9.1f} KiB/フレーム  {site}")
+            if stats.growth:
+                lines.append("  メモリが増え続けている行（スナップショットの差）:")
+                ranked = sorted(stats.growth.items(), key=lambda item: item[1][0], reverse=True)[:top]
+                for site, (size, count) in ranked:
+                    lines.append(f"    {size / 1024:9.1f} KiB {count:7d} 個  {site}")
+        return '\n'.join(lines)
@@ -0,0 +1,148 @@
+"""yokero バランス調整用モンテカルロ実行ツール
+
+ヘッドレスのゲームを複数プロセスで大量に実行し、
+パラメータセットごとの生存時間・スコアの分布を CSV に書き出す。
+
+例:
+    python balance.py --games 2000 --spawn-interval 120,100 --speed-step 0.5,0.75 --out balance.csv
+"""
+import os
+
+# 画面・音声なしで動かす（pygame の読み込み前に設定する必要がある）
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+
+import argparse
+import csv
+import itertools
+import statistics
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+FPS = 60
+POLICY_NAMES = ('random', 'dodge')
+
+# ワーカープロセス内で使い回すゲーム（パラメータセットごと）
+_worker_games = {}
+
+
+def _run_chunk(tunables, policy_name, seeds, max_frames):
+    """ワーカープロセスで複数ゲームを実行"""
+    from bots import make_headless_game, make_policy, play_headless
+
+    key = tuple(sorted(tunables.items()))
+    game = _worker_games.get(key)
+    if game is None:
+        game = _worker_games[key] = make_headless_game(tunables)
+    return [play_headless(game, make_policy(policy_name, seed), seed=seed, max_frames=max_frames)
+            for seed in seeds]
+
+
+def _percentile(sorted_values, ratio):
+    """ソート済みリストのパーセンタイル（線形補間）"""
+    if not sorted_values:
+        return 0.0
+    position = (len(sorted_values) - 1) * ratio
+    lower = int(position)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    weight = position - lower
+    return sorted_values[lower] * (1 - weight) + sorted_values[upper] * weight
+
+
+def summarize(values):
+    """分布の要約統計"""
+    ordered = sorted(values)
+    return {
+        'mean': statistics.fmean(ordered),
+        'std': statistics.pstdev(ordered),
+        'p10': _percentile(ordered, 0.10),
+        'p50': _percentile(ordered, 0.50),
+        'p90': _percentile(ordered, 0.90),
+        'min': ordered[0],
+        'max': ordered[-1],
+    }
+
+
+def _parse_list(text, cast):
+    return [cast(value) for value in text.split(',') if value.strip()]
+
+
+def build_parameter_sets(args):
+    """コマンドライン引数からパラメータセットの直積を作る"""
+    grid = itertools.product(
+        _parse_list(args.spawn_interval, int),
+        _parse_list(args.count_step, int),
+        _parse_list(args.speed_step, float),
+    )
+    return [
+        {
+            'obstacle_spawn_interval': spawn_interval,
+            'obstacle_count_step': count_step,
+            'speed_up_step': speed_step,
+        }
+        for spawn_interval, count_step, speed_step in grid
+    ]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="yokero のヘッドレス・モンテカルロ・バランス調整")
+    parser.add_argument('--games', type=int, default=1000, help="パラメータセットごとのゲーム数")
+    parser.add_argument('--policy', choices=sorted(POLICY_NAMES), default='dodge', help="プレイヤーの種類")
+    parser.add_argument('--spawn-interval', default='120', help="obstacle_spawn_interval（カンマ区切り）")
+    parser.add_argument('--count-step', default='3', help="obstacle_count_step: 追加数を+1するまでの回数（カンマ区切り）")
+    parser.add_argument('--speed-step', default='0.5', help="speed_up_step: 速度上昇量（カンマ区切り）")
+    parser.add_argument('--max-seconds', type=float, default=600, help="1ゲームの上限時間（秒）")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help="ワーカープロセス数")
+    parser.add_argument('--chunk', type=int, default=25, help="1タスクあたりのゲーム数")
+    parser.add_argument('--seed', type=int, default=0, help="シードの開始値")
+    parser.add_argument('--out', default='balance.csv', help="出力する CSV ファイル")
+    args = parser.parse_args(argv)
+    if args.games < 1:
+        parser.error("--games は 1 以上で指定してください")
+    if args.chunk < 1:
+        parser.error("--chunk は 1 以上で指定してください")
+
+    parameter_sets = build_parameter_sets(args)
+    max_frames = int(args.max_seconds * FPS)
+    results = {index: [] for index in range(len(parameter_sets))}
+
+    started = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=args.workers) as executor:
+        futures = {}
+        for index, tunables in enumerate(parameter_sets):
+            # 同じシード列を全パラメータセットで使い、比較しやすくする
+            for start in range(0, args.games, args.chunk):
+                seeds = [args.seed + n for n in range(start, min(start + args.chunk, args.games))]
+                future = executor.submit(_run_chunk, tunables, args.policy, seeds, max_frames)
+                futures[future] = index
+        for future in as_completed(futures):
+            results[futures[future]].extend(future.result())
+    elapsed = time.perf_counter() - started
+
+    fields = ['obstacle_spawn_interval', 'obstacle_count_step', 'speed_up_step', 'policy', 'games', 'survived']
+    for metric in ('survival_s', 'score'):
+        fields += [f"{metric}_{stat}" for stat in ('mean', 'std', 'p10', 'p50', 'p90', 'min', 'max')]
+
+    with open(args.out, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=fields)
+        writer.writeheader()
+        for index, tunables in enumerate(parameter_sets):
+            runs = results[index]
+            row = dict(tunables, policy=args.policy, games=len(runs),
+                       survived=sum(1 for run in runs if run['survived']))
+            for metric, values in (('survival_s', [run['frames'] / FPS for run in runs]),
+                                   ('score', [run['score'] for run in runs])):
+                for stat, value in summarize(values).items():
+                    row[f"{metric}_{stat}"] = round(value, 3)
+            writer.writerow(row)
+
+    total_games = args.games * len(parameter_sets)
+    print(f"{total_games} ゲームを {elapsed:.1f}秒で実行しました"
+          f"（{args.workers} プロセス, {total_games / elapsed:.1f} ゲーム/秒） -> {args.out}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
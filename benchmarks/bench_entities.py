@@ -0,0 +1,162 @@
+"""エンティティのメモリ量と衝突判定ループの割り当て数を計測するベンチマーク
+
+__slots__ + 使い回しの Rect（現在の実装）と、
+辞書ベース + get_rect() のたびに Rect を作る従来の実装を比較する。
+
+    python benchmarks/bench_entities.py
+"""
+import os
+import sys
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import gc
+import random
+import time
+import tracemalloc
+
+import pygame
+
+from main import Item, Obstacle, Player, SCREEN_HEIGHT, SCREEN_WIDTH, WHITE
+
+
+class LegacyObstacle:
+    """従来の障害物（辞書ベース、get_rect() のたびに Rect を作る）"""
+    def __init__(self, x, y, width, height, speed):
+        self.x = x
+        self.y = y
+        self.width = width
+        self.height = height
+        self.base_width = width
+        self.base_height = height
+        self.speed = speed
+        self.base_speed = speed
+        self.color = WHITE
+
+    def update(self):
+        self.x -= self.speed
+
+    def get_rect(self):
+        return pygame.Rect(self.x, self.y, self.width, self.height)
+
+
+class LegacyPlayer:
+    """従来のプレイヤー（辞書ベース、get_rect() のたびに Rect を作る）"""
+    def __init__(self):
+        self.width = 40
+        self.height = 60
+        self.x = 50
+        self.y = SCREEN_HEIGHT // 2 - self.height // 2
+
+    def get_rect(self):
+        return pygame.Rect(self.x, self.y, self.width, self.height)
+
+
+def make_obstacles(cls, count, rng):
+    return [cls(rng.randint(0, SCREEN_WIDTH), rng.randint(0, SCREEN_HEIGHT - 100),
+                rng.choice([30, 40, 50, 60, 80]), rng.randint(40, 200), 3.5)
+            for _ in range(count)]
+
+
+def bytes_per_entity(factory, count=10000):
+    """1エンティティあたりのメモリ量（tracemalloc で計測）"""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    objects = [factory() for _ in range(count)]
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    total = sum(stat.size_diff for stat in after.compare_to(before, 'filename'))
+    # リスト自体の分を除く
+    total -= sys.getsizeof(objects)
+    return total / count
+
+
+def collision_loop_legacy(player, obstacles):
+    hits = 0
+    for obstacle in obstacles:
+        obstacle.update()
+        if player.get_rect().colliderect(obstacle.get_rect()):
+            hits += 1
+    return hits
+
+
+def collision_loop_cached(player, obstacles):
+    hits = 0
+    player_rect = player.rect
+    for obstacle in obstacles:
+        obstacle.update()
+        if player_rect.colliderect(obstacle.rect):
+            hits += 1
+    return hits
+
+
+def measure_loop(loop, player, obstacles, frames):
+    """1フレームあたりの時間（マイクロ秒）"""
+    started = time.perf_counter()
+    for _ in range(frames):
+        loop(player, obstacles)
+        # 画面外に出た障害物は右端に戻して数を保つ
+        for obstacle in obstacles:
+            if obstacle.x < -200:
+                obstacle.x += SCREEN_WIDTH + 200
+    elapsed = time.perf_counter() - started
+    return elapsed / frames * 1e6
+
+
+def count_rect_allocations(loop, player, obstacles, frames=100):
+    """ループ中に作られる Rect の数（pygame.Rect を差し替えて数える）"""
+    created = 0
+    original = pygame.Rect
+
+    class CountingRect(original):
+        def __init__(self, *args):
+            nonlocal created
+            created += 1
+            super().__init__(*args)
+
+    pygame.Rect = CountingRect
+    try:
+        for _ in range(frames):
+            loop(player, obstacles)
+    finally:
+        pygame.Rect = original
+    return created / frames
+
+
+def main():
+    rng = random.Random(0)
+    frames = 2000
+    count = 60  # 終盤の障害物数
+
+    print("== 1エンティティあたりのメモリ ==")
+    legacy_bytes = bytes_per_entity(lambda: LegacyObstacle(100, 100, 40, 120, 3.5))
+    slots_bytes = bytes_per_entity(lambda: Obstacle(100, 100, 40, 120, 3.5))
+    item_bytes = bytes_per_entity(lambda: Item(100, 100, 'speed'))
+    rect_bytes = bytes_per_entity(lambda: pygame.Rect(100, 100, 40, 120))
+    print(f"  従来の Obstacle (dict)           : {legacy_bytes:7.1f} bytes  (+ get_rect のたびに Rect {rect_bytes:.0f} bytes)")
+    print(f"  Obstacle (__slots__ + Rect)      : {slots_bytes:7.1f} bytes  (うち本体 {slots_bytes - rect_bytes:.0f} bytes, "
+          f"本体は従来の {(slots_bytes - rect_bytes) / legacy_bytes:.0%})")
+    print(f"  Item (__slots__ + Rect)          : {item_bytes:7.1f} bytes")
+
+    print(f"== 衝突判定ループ（障害物 {count} 個, {frames} フレーム） ==")
+    legacy_player = LegacyPlayer()
+    legacy_obstacles = make_obstacles(LegacyObstacle, count, rng)
+    player = Player()
+    obstacles = make_obstacles(Obstacle, count, random.Random(0))
+
+    legacy_us = measure_loop(collision_loop_legacy, legacy_player, legacy_obstacles, frames)
+    cached_us = measure_loop(collision_loop_cached, player, obstacles, frames)
+    legacy_rects = count_rect_allocations(collision_loop_legacy, legacy_player, legacy_obstacles)
+    cached_rects = count_rect_allocations(collision_loop_cached, player, obstacles)
+    print(f"  従来 (get_rect を毎回作成)       : {legacy_us:7.1f} us/frame  Rect 生成 {legacy_rects:.0f} 個/frame")
+    print(f"  使い回しの Rect                  : {cached_us:7.1f} us/frame  Rect 生成 {cached_rects:.0f} 個/frame")
+    print(f"  高速化                           : {legacy_us / cached_us:.2f}x")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,84 @@
+"""フレームペーシングの比較（方式ごとに、決まった処理時間のフレームを続けて待ち方の正確さと CPU 使用率を計測する）
+
+処理は --work ミリ秒の空回りで代わりにする（描画はしない）。マシンごとに結果を見て、
+main.py の PACING（または --pacing）を選ぶ。
+
+    python benchmarks/bench_pacing.py
+    python benchmarks/bench_pacing.py --frames 1200 --work 8 --out bench_pacing.json
+"""
+import os
+import sys
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import argparse
+import json
+import platform
+import time
+
+import pygame
+
+from pacing import FramePacer, PACING_NAMES
+
+
+def run_strategy(strategy, frames, fps, work_ms):
+    """strategy で frames フレーム待ち、FramePacer の集計を返す"""
+    pacer = FramePacer(fps, strategy)
+    perf_counter = time.perf_counter
+    for _ in range(frames):
+        end = perf_counter() + work_ms / 1000
+        while perf_counter() < end:
+            pass
+        pacer.wait()
+    return pacer
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="フレームペーシングの比較")
+    parser.add_argument('--strategies', default=','.join(PACING_NAMES), help="計測する方式（カンマ区切り）")
+    parser.add_argument('--frames', type=int, default=600, help="1方式あたりのフレーム数")
+    parser.add_argument('--fps', type=int, default=60)
+    parser.add_argument('--work', type=float, default=5.0, help="1フレームの処理時間（ms）")
+    parser.add_argument('--histogram', action='store_true', help="ずれのヒストグラムも表示する")
+    parser.add_argument('--out', help="結果の JSON の保存先（省略時は標準出力）")
+    args = parser.parse_args(argv)
+
+    names = [name.strip() for name in args.strategies.split(',') if name.strip()]
+    unknown = [name for name in names if name not in PACING_NAMES]
+    if unknown:
+        parser.error(f"不明な方式: {', '.join(unknown)}（{', '.join(PACING_NAMES)} から選択）")
+
+    pygame.init()
+    results = {}
+    for name in names:
+        pacer = run_strategy(name, args.frames, args.fps, args.work)
+        r = results[name] = pacer.summary()
+        print(f"{name:<7} {r['achieved_fps']:6.2f} FPS  ずれ p50 {r['jitter_p50_ms']:4.1f} ms  "
+              f"p99 {r['jitter_p99_ms']:4.1f} ms  CPU {r['cpu_percent']:5.1f}%", file=sys.stderr)
+        if args.histogram:
+            print(pacer.report(), file=sys.stderr)
+    pygame.quit()
+
+    report = {
+        'python': platform.python_version(),
+        'pygame': pygame.version.ver,
+        'platform': platform.platform(),
+        'frames': args.frames,
+        'fps': args.fps,
+        'work_ms': args.work,
+        'strategies': results,
+    }
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.out:
+        with open(args.out, 'w', encoding='utf-8') as f:
+            f.write(text + '\n')
+    else:
+        print(text)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,172 @@
+"""パイプライン描画のベンチマーク（更新と描画を同じスレッドで続けて行う場合と、別のスレッドで重ねる場合の比較）
+
+早送りで場面の時間まで進めたゲームを、待機なしでできるだけ速く更新・描画・表示し、
+1秒あたりのフレーム数（スループット）と、更新を終えてから画面に表示されるまでの遅れ（フレーム数・ms）を計測する。
+操作は 30 フレームごとに上下を切り替えるだけで、衝突は無効にする。
+
+    python benchmarks/bench_pipeline.py
+    python benchmarks/bench_pipeline.py --scenes late --frames 600 --out bench_pipeline.json
+
+スループットが上がるのは CPU が2つ以上ある場合だけ（1つなら更新と描画は交互にしか進まない）。
+"""
+import os
+import sys
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import argparse
+import contextlib
+import io
+import json
+import platform
+import time
+
+import pygame
+
+from bench_render import make_game, summarize
+from main import FPS, GameState, QUALITY_NAMES
+
+# 場面の名前 -> 早送りするゲーム時間（秒）
+SCENES = {
+    'early': 10,
+    'mid': 120,
+    'late': 300,
+}
+
+
+def prepare(name, seed, tier, render_scale, pipelined):
+    """場面の時間まで早送りしたゲーム（プレイ中、衝突なし）"""
+    game = make_game(seed, tier, render_scale, pipelined=pipelined)
+    with contextlib.redirect_stdout(io.StringIO()):
+        game.fast_forward(target_frames=SCENES[name] * FPS)
+    game.state = GameState.PLAYING
+    game.invincible = True
+    return game
+
+
+def step(game, frame):
+    """1フレーム分の更新"""
+    up = frame // 30 % 2 == 0
+    game.update_game({pygame.K_UP: up, pygame.K_DOWN: not up})
+
+
+def run_serial(game, warmup, frames):
+    """更新と描画を続けて行う（Game.run() の通常の順序）
+
+    (計測の時間, 表示までの遅れ（ms）のリスト, 表示までの遅れ（フレーム数）のリスト) を返す（warmup の分は除く）
+    """
+    perf_counter = time.perf_counter
+    latencies = []
+    for frame in range(warmup + frames):
+        if frame == warmup:
+            started = perf_counter()
+            latencies.clear()
+        step(game, frame)
+        updated = perf_counter()
+        game.draw_playing_screen()
+        game.present()
+        latencies.append((perf_counter() - updated) * 1000)
+    return perf_counter() - started, latencies, [0] * frames
+
+
+def run_pipelined(game, warmup, frames):
+    """更新したフレームを描画スレッドに渡し、前のフレームの描画が終わったら表示する（Game.run() と同じ順序）"""
+    pipeline = game.pipeline
+    perf_counter = time.perf_counter
+    updated_at = {}
+    latencies = []
+    lag_frames = []
+    for frame in range(warmup + frames):
+        if frame == warmup:
+            started = perf_counter()
+            latencies.clear()
+            lag_frames.clear()
+        step(game, frame)
+        snapshot = pipeline.capture(game)
+        updated_at[snapshot.tick] = perf_counter()
+        pipeline.wait()
+        if pipeline.drawn_tick != snapshot.tick - 1:
+            pipeline.submit(snapshot)
+            pipeline.wait()
+            snapshot = None
+        game.present()
+        shown = pipeline.drawn_tick
+        # プレイ中になった直後は、同じフレームを2回表示する（2回目は遅れに数える）
+        latencies.append((perf_counter() - updated_at[shown]) * 1000)
+        updated_at.pop(shown - 1, None)
+        lag_frames.append(pipeline.captured - 1 - shown)
+        if snapshot is not None:
+            pipeline.submit(snapshot)
+    elapsed = perf_counter() - started
+    pipeline.wait()
+    return elapsed, latencies, lag_frames
+
+
+def run_scene(name, frames, warmup, seed=0, tier=0, render_scale=1.0, pipelined=False):
+    game = prepare(name, seed, tier, render_scale, pipelined)
+    run = run_pipelined if pipelined else run_serial
+    elapsed, latencies, lag_frames = run(game, warmup, frames)
+    if game.pipeline:
+        game.pipeline.close()
+    game.score_manager.close()
+    latency = summarize(latencies)
+    return {
+        'fps': round(frames / elapsed, 2),
+        'frame_ms': round(elapsed / frames * 1000, 3),
+        'latency_mean_ms': latency['mean_ms'],
+        'latency_p95_ms': latency['p95_ms'],
+        'latency_frames': round(sum(lag_frames) / len(lag_frames), 3),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="パイプライン描画のベンチマーク")
+    parser.add_argument('--scenes', default=','.join(SCENES), help="計測する場面（カンマ区切り）")
+    parser.add_argument('--frames', type=int, default=300, help="1場面あたりの計測フレーム数")
+    parser.add_argument('--warmup', type=int, default=30, help="計測前に進めるフレーム数")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--quality', choices=QUALITY_NAMES[:-1], default='high', help="描画品質")
+    parser.add_argument('--render-scale', type=float, default=1.0, help="ゲーム画面を描く解像度の倍率")
+    parser.add_argument('--out', help="結果の JSON の保存先（省略時は標準出力）")
+    args = parser.parse_args(argv)
+
+    names = [name.strip() for name in args.scenes.split(',') if name.strip()]
+    unknown = [name for name in names if name not in SCENES]
+    if unknown:
+        parser.error(f"不明な場面: {', '.join(unknown)}（{', '.join(SCENES)} から選択）")
+
+    tier = QUALITY_NAMES.index(args.quality)
+    results = {}
+    for name in names:
+        serial = run_scene(name, args.frames, args.warmup, args.seed, tier, args.render_scale, pipelined=False)
+        pipelined = run_scene(name, args.frames, args.warmup, args.seed, tier, args.render_scale, pipelined=True)
+        gain = pipelined['fps'] / serial['fps'] - 1
+        results[name] = {'serial': serial, 'pipelined': pipelined, 'throughput_gain': round(gain, 3)}
+        print(f"{name:<6} 直列 {serial['fps']:7.1f} FPS 遅れ {serial['latency_mean_ms']:5.2f} ms  "
+              f"パイプライン {pipelined['fps']:7.1f} FPS 遅れ {pipelined['latency_mean_ms']:5.2f} ms "
+              f"({pipelined['latency_frames']:.2f} フレーム)  {gain:+.0%}", file=sys.stderr)
+
+    report = {
+        'python': platform.python_version(),
+        'pygame': pygame.version.ver,
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+        'frames': args.frames,
+        'quality': args.quality,
+        'render_scale': args.render_scale,
+        'scenes': results,
+    }
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.out:
+        with open(args.out, 'w', encoding='utf-8') as f:
+            f.write(text + '\n')
+    else:
+        print(text)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,326 @@
+"""描画のベンチマーク（決まった場面を実際の描画処理で描き、1フレームあたりの時間を計測する）
+
+画面は SDL_VIDEODRIVER=dummy で作るので、ウインドウは開かない。
+
+    python benchmarks/bench_render.py --out bench_render.json
+    python benchmarks/bench_render.py --save-baseline benchmarks/baseline_render.json
+    python benchmarks/bench_render.py --baseline benchmarks/baseline_render.json
+
+--baseline を指定すると、平均または p95 が基準より threshold 以上遅くなった場面を
+「悪化」として表示し、終了コード 1 を返す。
+
+--renderer sdl2 を指定すると、ゲーム画面を SDL2 の Renderer で描く（dummy ではソフトウェアレンダラー）。
+
+--alloc を指定すると、時間の計測とは別に alloc_debug で Surface の作成・Python のメモリ・GC を計測して
+結果に加える（基準にも alloc があれば、threshold 以上増えた場面を同様に報告する）。
+"""
+import os
+import sys
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import argparse
+import json
+import platform
+import random
+import time
+
+import pygame
+
+from alloc_debug import AllocationTracker
+from main import (Game, GameState, QUALITY_NAMES, RENDERER_NAMES, ScoreManager, SCREEN_HEIGHT, SCREEN_WIDTH, YELLOW)
+
+# 比較するメモリ確保の指標と、無視する差（小さい値の揺れで報告しないように）
+ALLOC_METRICS = {'surfaces_per_frame': 1.0, 'surface_kib_per_frame': 16.0, 'py_peak_kib_mean': 4.0}
+
+
+def make_game(seed=0, tier=0, render_scale=1.0, renderer='software', pipelined=False):
+    """ベンチマーク用のゲーム（素材は作り終えた状態、スコアはファイルに書かない、描画品質は tier に固定）"""
+    random.seed(seed)
+    game = Game(score_manager=ScoreManager(None, None), render_scale=render_scale, renderer=renderer,
+                pipelined=pipelined)
+    game.quality_governor.pin(tier)
+    game.record_replays = False
+    game.asset_baker.finish()
+    game.asset_baker = None
+    game.reseed(seed)
+    return game
+
+
+def start_field(game):
+    """プレイ中の状態にする（衝突しない）"""
+    game.state = GameState.PLAYING
+    game.reset_game()
+    game.game_started = True
+    game.invincible = True
+
+
+def fill_obstacles(game, count):
+    """障害物を画面全体に count 個並べる"""
+    rng = game.rng
+    while len(game.obstacles) < count:
+        x = rng.randint(0, SCREEN_WIDTH)
+        y = rng.randint(0, SCREEN_HEIGHT - 100)
+        width = rng.choice([30, 40, 50, 60, 80])
+        height = rng.randint(40, 200)
+        game.obstacles.append(game.obstacle_pool.acquire(x, y, width, height, game.obstacle_speed))
+
+
+def wrap_obstacles(game):
+    """画面の左外に出た障害物を右端に戻して数を保つ"""
+    for obstacle in game.obstacles:
+        obstacle.update()
+        if obstacle.x + obstacle.width < 0:
+            obstacle.x += SCREEN_WIDTH + obstacle.width
+            obstacle.rect.x = int(obstacle.x)
+
+
+def upload_screen(game):
+    """Surface に描く画面を Renderer に転送する（Game.run() と同じ）"""
+    if game.window is not None:
+        game.canvas.upload_screen(game.screen)
+
+
+# --- 場面（game を受け取って準備し、1フレーム分の処理を返す） ---
+
+def scene_title(game):
+    """タイトル画面"""
+    game.state = GameState.START
+
+    def frame():
+        game.title_background.update()
+        game.draw_start_screen()
+        upload_screen(game)
+    return frame
+
+
+def scene_late_game(game):
+    """終盤の画面（障害物 60 個、速度上昇済み）"""
+    start_field(game)
+    game.obstacle_speed = 6
+    fill_obstacles(game, 60)
+
+    def frame():
+        wrap_obstacles(game)
+        game.player.update(game.keys)
+        game.particle_system.update()
+        game.draw_playing_screen()
+    return frame
+
+
+def scene_explosion(game):
+    """ハイスコア更新時の爆発とキラキラ（30 フレームごとに発生）"""
+    start_field(game)
+    counter = [0]
+
+    def frame():
+        if counter[0] % 30 == 0:
+            game.particle_system.add_explosion(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2, YELLOW, count=60, speed=12)
+            game.particle_system.add_sparkle(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2, YELLOW, count=30)
+        counter[0] += 1
+        game.particle_system.update()
+        game.screen_shake.update()
+        game.draw_playing_screen()
+    return frame
+
+
+def scene_wind(game):
+    """速度上昇時の風（密度 2.0）"""
+    start_field(game)
+    fill_obstacles(game, 20)
+
+    def frame():
+        if not game.wind_effect.active:
+            game.wind_effect.start(duration=120, density=2.0)
+        game.wind_effect.update()
+        wrap_obstacles(game)
+        game.draw_playing_screen()
+    return frame
+
+
+def scene_paused(game):
+    """一時停止画面"""
+    start_field(game)
+    fill_obstacles(game, 30)
+    game.state = GameState.PAUSED
+
+    def frame():
+        game.draw_playing_screen()
+        game.draw_paused_screen()
+    return frame
+
+
+def scene_result(game):
+    """リザルト画面（NEW HIGH SCORE の演出つき）"""
+    start_field(game)
+    game.score = 999999
+    game.end_game()
+
+    def frame():
+        game.draw_result_screen()
+        upload_screen(game)
+    return frame
+
+
+SCENES = {
+    'title': scene_title,
+    'late_game': scene_late_game,
+    'explosion': scene_explosion,
+    'wind': scene_wind,
+    'paused': scene_paused,
+    'result': scene_result,
+}
+
+
+def percentile(sorted_values, p):
+    """ソート済みの値の p パーセンタイル（線形補間）"""
+    if not sorted_values:
+        return 0.0
+    k = (len(sorted_values) - 1) * p / 100
+    lower = int(k)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (k - lower)
+
+
+def summarize(times_ms):
+    values = sorted(times_ms)
+    return {
+        'frames': len(values),
+        'mean_ms': round(sum(values) / len(values), 3),
+        'p50_ms': round(percentile(values, 50), 3),
+        'p95_ms': round(percentile(values, 95), 3),
+        'p99_ms': round(percentile(values, 99), 3),
+        'max_ms': round(values[-1], 3),
+    }
+
+
+def run_scene(name, frames, warmup, seed=0, tier=0, render_scale=1.0, renderer='software'):
+    """場面を描画して1フレームあたりの時間（描画 + 表示）を計測する"""
+    game = make_game(seed, tier, render_scale, renderer)
+    frame = SCENES[name](game)
+    for _ in range(warmup):
+        frame()
+        game.present()
+    times = []
+    perf_counter = time.perf_counter
+    for _ in range(frames):
+        started = perf_counter()
+        frame()
+        game.present()
+        times.append((perf_counter() - started) * 1000)
+    game.score_manager.close()
+    return summarize(times)
+
+
+def run_scene_alloc(name, frames, warmup, seed=0, tier=0, render_scale=1.0, renderer='software'):
+    """場面を描画してフレームごとのメモリ確保と GC を計測する（計測中は遅くなるので時間とは別に行う）"""
+    game = make_game(seed, tier, render_scale, renderer)
+    frame = SCENES[name](game)
+    for _ in range(warmup):
+        frame()
+        game.present()
+    tracker = AllocationTracker(snapshot_interval=0)
+    tracker.start()
+    try:
+        for _ in range(frames):
+            tracker.begin_frame(name)
+            frame()
+            game.present()
+            tracker.end_frame()
+    finally:
+        tracker.stop()
+    game.score_manager.close()
+    return tracker.summary()[name]
+
+
+def compare(results, baseline, threshold):
+    """基準と比べて悪化した場面の一覧 [(場面, 指標, 基準, 今回), ...]"""
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get('scenes', {}).get(name)
+        if not base:
+            continue
+        for key in ('mean_ms', 'p95_ms'):
+            if result[key] > base[key] * (1 + threshold):
+                regressions.append((name, key, base[key], result[key]))
+        if 'alloc' in result and 'alloc' in base:
+            for key, tolerance in ALLOC_METRICS.items():
+                now, before = result['alloc'][key], base['alloc'][key]
+                if now > before * (1 + threshold) and now - before > tolerance:
+                    regressions.append((name, key, before, now))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="描画のベンチマーク")
+    parser.add_argument('--scenes', default=','.join(SCENES), help="計測する場面（カンマ区切り）")
+    parser.add_argument('--frames', type=int, default=300, help="1場面あたりの計測フレーム数")
+    parser.add_argument('--warmup', type=int, default=30, help="計測前に描画するフレーム数")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--out', help="結果の JSON の保存先（省略時は標準出力）")
+    parser.add_argument('--baseline', help="比較する基準の JSON")
+    parser.add_argument('--save-baseline', metavar='PATH', help="結果を基準として保存")
+    parser.add_argument('--threshold', type=float, default=0.10, help="悪化とみなす割合（0.10 = 10%%）")
+    parser.add_argument('--alloc', action='store_true', help="メモリ確保と GC も計測する")
+    parser.add_argument('--quality', choices=QUALITY_NAMES[:-1], default='high', help="描画品質")
+    parser.add_argument('--render-scale', type=float, default=1.0, help="ゲーム画面を描く解像度の倍率")
+    parser.add_argument('--renderer', choices=RENDERER_NAMES, default='software', help="描画先")
+    args = parser.parse_args(argv)
+
+    names = [name.strip() for name in args.scenes.split(',') if name.strip()]
+    unknown = [name for name in names if name not in SCENES]
+    if unknown:
+        parser.error(f"不明な場面: {', '.join(unknown)}（{', '.join(SCENES)} から選択）")
+
+    tier = QUALITY_NAMES.index(args.quality)
+    results = {}
+    for name in names:
+        results[name] = run_scene(name, args.frames, args.warmup, args.seed, tier, args.render_scale, args.renderer)
+        r = results[name]
+        print(f"{name:<10} 平均 {r['mean_ms']:7.2f} ms  p95 {r['p95_ms']:7.2f} ms  p99 {r['p99_ms']:7.2f} ms",
+              file=sys.stderr)
+        if args.alloc:
+            a = r['alloc'] = run_scene_alloc(name, args.frames, args.warmup, args.seed, tier, args.render_scale,
+                                             args.renderer)
+            print(f"{'':<10} Surface {a['surfaces_per_frame']:6.1f} 個/フレーム {a['surface_kib_per_frame']:8.1f} KiB/フレーム  "
+                  f"GC {a['gc_collections']}回 最大 {a['gc_pause_ms_max']:.2f} ms", file=sys.stderr)
+
+    report = {
+        'python': platform.python_version(),
+        'pygame': pygame.version.ver,
+        'platform': platform.platform(),
+        'frames': args.frames,
+        'quality': args.quality,
+        'render_scale': args.render_scale,
+        'renderer': args.renderer,
+        'scenes': results,
+    }
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.out:
+        with open(args.out, 'w', encoding='utf-8') as f:
+            f.write(text + '\n')
+    else:
+        print(text)
+    if args.save_baseline:
+        with open(args.save_baseline, 'w', encoding='utf-8') as f:
+            f.write(text + '\n')
+
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold)
+        for name, key, base, now in regressions:
+            unit = ' ms' if key.endswith('_ms') else ''
+            change = f"{now / base - 1:+.0%}" if base else "new"
+            print(f"悪化: {name} {key} {base:.2f}{unit} -> {now:.2f}{unit} ({change})", file=sys.stderr)
+        if regressions:
+            return 1
+        print("基準と比べて悪化した場面はありません", file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,46 @@
+"""yokero ボット（ヘッドレス実行用のプレイヤー）
+
+ポリシー（policies.py）は game を受け取り、(上キー, 下キー) を返す呼び出し可能オブジェクト。
+"""
+import pygame
+
+from main import Game, GameState, SCREEN_HEIGHT
+from policies import POLICIES, RandomPolicy
+
+
+def make_policy(name, seed=None):
+    """名前からポリシーを作成"""
+    policy_class = POLICIES[name]
+    if policy_class is RandomPolicy:
+        return RandomPolicy(seed=seed)
+    return policy_class(SCREEN_HEIGHT)
+
+
+def play_headless(game, policy, seed=None, max_frames=None):
+    """描画なしで1ゲームをプレイし、結果を返す"""
+    game.state = GameState.PLAYING
+    # base_obstacle_speed は速度上昇でゲームをまたいで増えるので、毎回初期値に戻す
+    game.base_obstacle_speed = game.tunables['base_obstacle_speed']
+    game.reset_game()
+    if seed is not None:
+        game.reseed(seed)
+    game.start_play()
+
+    keys = {pygame.K_UP: False, pygame.K_DOWN: False}
+    while game.state == GameState.PLAYING:
+        if max_frames is not None and game.game_time >= max_frames:
+            break
+        keys[pygame.K_UP], keys[pygame.K_DOWN] = policy(game)
+        game.update_game(keys)
+
+    return {
+        'score': game.score,
+        'frames': game.game_time,
+        'items': game.items_collected,
+        'survived': game.state == GameState.PLAYING,
+    }
+
+
+def make_headless_game(tunables=None):
+    """ヘッドレス用のゲームを作成"""
+    return Game(tunables=tunables, headless=True)
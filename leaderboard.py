@@ -0,0 +1,329 @@
+"""yokero の共有ランキング（複数の端末でスコアを集計する）クライアント
+
+スコアはまずローカルの送信待ちキュー（SQLite）に保存し、バックグラウンドスレッドが
+まとめてサーバーへ送る。接続は keep-alive で使い回し、失敗したら間隔を空けて再送する。
+サーバーが 4xx で拒否した記録は再送しても通らないので、送信キューから outbox_rejected に移す
+（まとめて送って拒否されたときは1件ずつ送り直し、拒否された記録だけを移す）。
+ランキングは定期的に取得してキャッシュしておくので、ゲームループがネットワークで止まることはない。
+
+サーバーの API（leaderboard_server.py が参照実装）:
+    POST /scores        {"scores": [{"id", "kiosk", "score", "played_at", ...}, ...]}
+                        -> {"accepted": 件数}  （同じ id は1回だけ登録される）
+    GET  /top?limit=N   -> {"scores": [{"score", "kiosk", "played_at"}, ...]}
+"""
+import http.client
+import json
+import random
+import socket
+import sqlite3
+import sys
+import threading
+import time
+import uuid
+from urllib.parse import urlsplit
+
+OUTBOX_SCHEMA = """
+CREATE TABLE IF NOT EXISTS outbox (
+    id TEXT PRIMARY KEY,        -- 送信の重複を防ぐための一意な ID
+    payload TEXT NOT NULL,      -- 送信する JSON
+    created_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS outbox_rejected (
+    id TEXT PRIMARY KEY,
+    payload TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    rejected_at REAL NOT NULL,
+    reason TEXT NOT NULL        -- サーバーの応答（HTTP のステータスなど）
+);
+"""
+
+# 4xx でも、時間をおけば受け付けられるかもしれないステータス（Request Timeout・Too Many Requests）
+RETRYABLE_STATUSES = (408, 429)
+
+
+class LeaderboardError(Exception):
+    """サーバーとの通信に失敗した"""
+
+
+class LeaderboardRejected(LeaderboardError):
+    """サーバーがリクエストを拒否した（4xx、再送しても通らない）"""
+
+    def __init__(self, message, status):
+        super().__init__(message)
+        self.status = status
+
+
+class LeaderboardConnection:
+    """keep-alive で使い回す HTTP 接続（バックグラウンドスレッド専用）"""
+
+    def __init__(self, base_url, timeout=5.0):
+        parts = urlsplit(base_url)
+        if parts.scheme not in ('http', 'https'):
+            raise ValueError(f"ランキングサーバーの URL が不正です: {base_url}")
+        self.scheme = parts.scheme
+        self.host = parts.hostname
+        self.port = parts.port
+        self.prefix = parts.path.rstrip('/')
+        self.timeout = timeout
+        self._conn = None
+
+    def _connect(self):
+        cls = http.client.HTTPSConnection if self.scheme == 'https' else http.client.HTTPConnection
+        return cls(self.host, self.port, timeout=self.timeout)
+
+    def request(self, method, path, data=None):
+        """リクエストを送り、JSON の応答を返す（接続が切れていたら1回だけつなぎ直す）"""
+        body = None
+        headers = {'Accept': 'application/json'}
+        if data is not None:
+            body = json.dumps(data, ensure_ascii=False).encode('utf-8')
+            headers['Content-Type'] = 'application/json'
+        for attempt in range(2):
+            if self._conn is None:
+                self._conn = self._connect()
+            try:
+                self._conn.request(method, self.prefix + path, body=body, headers=headers)
+                response = self._conn.getresponse()
+                payload = response.read()
+            except (http.client.HTTPException, OSError) as e:
+                # サーバー側で keep-alive が切られていた場合などはつなぎ直す
+                self.close()
+                if attempt:
+                    raise LeaderboardError(str(e)) from e
+                continue
+            if response.will_close:
+                self.close()
+            if 400 <= response.status < 500 and response.status not in RETRYABLE_STATUSES:
+                raise LeaderboardRejected(f"HTTP {response.status} {response.reason}", response.status)
+            if not 200 <= response.status < 300:
+                raise LeaderboardError(f"HTTP {response.status} {response.reason}")
+            try:
+                return json.loads(payload.decode('utf-8')) if payload else {}
+            except ValueError as e:
+                raise LeaderboardError(f"応答が JSON ではありません: {e}") from e
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+
+class LeaderboardClient:
+    """共有ランキングへの送信とランキングの取得を行う"""
+
+    def __init__(self, base_url, kiosk_id=None, outbox_path='leaderboard_outbox.db',
+                 batch_size=50, refresh_interval=60.0, min_backoff=2.0, max_backoff=300.0,
+                 timeout=5.0):
+        self.base_url = base_url
+        self.kiosk_id = kiosk_id or socket.gethostname()
+        self.outbox_path = outbox_path
+        self.batch_size = batch_size
+        self.refresh_interval = refresh_interval
+        self.min_backoff = min_backoff
+        self.max_backoff = max_backoff
+        self.timeout = timeout
+        # URL の誤りはここで ValueError にする（通信はバックグラウンドスレッドだけが行う）
+        self._connection = LeaderboardConnection(base_url, timeout)
+        self.last_error = None
+        self.last_refresh = None  # 最後にランキングを取得できた時刻
+
+        self._condition = threading.Condition()
+        self._incoming = []  # まだ送信待ちキューに書いていない記録
+        self._top = None
+        self._outbox_size = 0  # 送信キュー（SQLite）に残っている件数
+        self._refresh_requested = True
+        self._sending = False
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name='leaderboard', daemon=True)
+        self._thread.start()
+
+    # --- ゲームスレッドから呼ぶ ---
+
+    def submit(self, score, duration_frames=None, items_collected=None, seed=None, played_at=None):
+        """スコアを送信キューに積む（すぐに戻る）"""
+        entry = {
+            'id': uuid.uuid4().hex,
+            'kiosk': self.kiosk_id,
+            'score': score,
+            'played_at': played_at if played_at is not None else time.time(),
+            'duration_frames': duration_frames,
+            'items_collected': items_collected,
+            'seed': seed,
+        }
+        with self._condition:
+            if self._closed:
+                return
+            self._incoming.append(entry)
+            self._condition.notify()
+
+    def top_scores(self):
+        """キャッシュしているランキング（まだ取得できていなければ None）"""
+        with self._condition:
+            return self._top
+
+    def request_refresh(self):
+        """次の機会にランキングを取り直す"""
+        with self._condition:
+            self._refresh_requested = True
+            self._condition.notify()
+
+    def flush(self, timeout=None):
+        """送信キューが空になるまで待つ（サーバーに届かない間は空にならないので timeout を指定する）"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._condition:
+                if not self._incoming and not self._sending and self._outbox_size == 0:
+                    return True
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._condition.wait(0.05 if remaining is None else min(0.05, remaining))
+
+    def close(self, timeout=5.0):
+        """送信キューを保存してスレッドを終了する（未送信分は次回起動時に送る）"""
+        with self._condition:
+            if self._closed:
+                return
+            self._closed = True
+            self._condition.notify_all()
+        self._thread.join(timeout)
+
+    # --- バックグラウンドスレッド ---
+
+    def _run(self):
+        try:
+            outbox = sqlite3.connect(self.outbox_path, timeout=5.0)
+            outbox.executescript(OUTBOX_SCHEMA)
+            self._update_outbox_size(outbox)
+        except sqlite3.Error as e:
+            print(f"ランキングの送信キューを開けませんでした: {e}", file=sys.stderr)
+            return
+        connection = self._connection
+        failures = 0
+        next_send = 0.0
+        next_refresh = 0.0
+        try:
+            while True:
+                with self._condition:
+                    incoming = self._incoming
+                    self._incoming = []
+                    closed = self._closed
+                    refresh = self._refresh_requested
+                    self._refresh_requested = False
+                    self._sending = True
+                try:
+                    if incoming:
+                        self._store(outbox, incoming)
+                    now = time.monotonic()
+                    if now >= next_send or closed:
+                        if self._send_batches(outbox, connection):
+                            failures = 0
+                            next_send = 0.0
+                        else:
+                            # 失敗が続くほど間隔を空ける（複数端末が同時に再送しないよう揺らぎを入れる）
+                            failures += 1
+                            delay = min(self.max_backoff, self.min_backoff * 2 ** (failures - 1))
+                            next_send = now + delay * random.uniform(0.5, 1.0)
+                    if closed:
+                        return
+                    if refresh or now >= next_refresh:
+                        self._refresh(connection)
+                        next_refresh = time.monotonic() + self.refresh_interval
+                finally:
+                    with self._condition:
+                        self._sending = False
+                        self._condition.notify_all()
+
+                with self._condition:
+                    wake_at = next_refresh if next_send == 0.0 else min(next_send, next_refresh)
+                    self._condition.wait_for(
+                        lambda: self._incoming or self._closed or self._refresh_requested,
+                        max(0.0, wake_at - time.monotonic()))
+        finally:
+            connection.close()
+            outbox.close()
+
+    def _store(self, outbox, entries):
+        with outbox:
+            outbox.executemany(
+                "INSERT OR IGNORE INTO outbox (id, payload, created_at) VALUES (?, ?, ?)",
+                [(entry['id'], json.dumps(entry, ensure_ascii=False), entry['played_at']) for entry in entries])
+        self._update_outbox_size(outbox)
+
+    def _update_outbox_size(self, outbox):
+        size = outbox.execute("SELECT COUNT(*) FROM outbox").fetchone()[0]
+        with self._condition:
+            self._outbox_size = size
+
+    def _send_batches(self, outbox, connection):
+        """送信キューの記録を batch_size 件ずつ送る（すべて送れたら True）"""
+        while True:
+            rows = outbox.execute(
+                "SELECT id, payload, created_at FROM outbox ORDER BY created_at LIMIT ?",
+                (self.batch_size,)).fetchall()
+            if not rows:
+                return True
+            try:
+                self._post_scores(connection, rows)
+            except LeaderboardRejected as e:
+                if len(rows) == 1:
+                    self._reject(outbox, rows, e)
+                    continue
+                # どの記録が拒否されたのかわからないので、1件ずつ送り直す
+                for row in rows:
+                    try:
+                        self._post_scores(connection, [row])
+                    except LeaderboardRejected as e:
+                        self._reject(outbox, [row], e)
+                        continue
+                    except LeaderboardError as e:
+                        self._set_error(e)
+                        return False
+                    self._delete(outbox, [row])
+                continue
+            except LeaderboardError as e:
+                self._set_error(e)
+                return False
+            self._delete(outbox, rows)
+            self._set_error(None)
+
+    @staticmethod
+    def _post_scores(connection, rows):
+        connection.request('POST', '/scores', {'scores': [json.loads(row[1]) for row in rows]})
+
+    def _delete(self, outbox, rows):
+        with outbox:
+            outbox.executemany("DELETE FROM outbox WHERE id = ?", [(row[0],) for row in rows])
+        self._update_outbox_size(outbox)
+
+    def _reject(self, outbox, rows, error):
+        """拒否された記録を送信キューから outbox_rejected に移す（後ろの記録が送れなくならないように）"""
+        now = time.time()
+        with outbox:
+            outbox.executemany(
+                "INSERT OR REPLACE INTO outbox_rejected (id, payload, created_at, rejected_at, reason) "
+                "VALUES (?, ?, ?, ?, ?)",
+                [(row_id, payload, created_at, now, str(error)) for row_id, payload, created_at in rows])
+            outbox.executemany("DELETE FROM outbox WHERE id = ?", [(row[0],) for row in rows])
+        self._update_outbox_size(outbox)
+        print(f"ランキングサーバーが記録を拒否しました（{len(rows)}件を outbox_rejected に移しました）: {error}",
+              file=sys.stderr)
+
+    def _refresh(self, connection):
+        try:
+            data = connection.request('GET', '/top?limit=10')
+        except LeaderboardError as e:
+            self._set_error(e)
+            return
+        scores = data.get('scores')
+        if isinstance(scores, list):
+            with self._condition:
+                self._top = scores
+            self.last_refresh = time.time()
+        self._set_error(None)
+
+    def _set_error(self, error):
+        message = None if error is None else str(error)
+        if message and message != self.last_error:
+            print(f"ランキングサーバーと通信できません: {message}", file=sys.stderr)
+        self.last_error = message
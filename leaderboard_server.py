@@ -0,0 +1,154 @@
+"""共有ランキングの参照サーバー（動作確認・社内 LAN 用）
+
+    python leaderboard_server.py --port 8765 --data leaderboard.json
+
+API は leaderboard.py を参照。記録は JSON ファイルに保存し、同じ id の記録は1回だけ登録する。
+"""
+import argparse
+import json
+import os
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+MAX_BODY = 1024 * 1024
+MAX_LIMIT = 100
+
+
+class LeaderboardData:
+    """登録された記録（スレッドセーフ）"""
+
+    def __init__(self, path=None):
+        self.path = path
+        self._lock = threading.Lock()
+        self.entries = []
+        self.ids = set()
+        if path and os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                self.entries = json.load(f)
+            self.ids = {entry['id'] for entry in self.entries}
+
+    def add(self, entries):
+        """記録を登録し、新しく登録した件数を返す"""
+        added = 0
+        with self._lock:
+            for entry in entries:
+                if not isinstance(entry, dict) or not isinstance(entry.get('score'), int):
+                    continue
+                entry_id = str(entry.get('id', ''))
+                if not entry_id or entry_id in self.ids:
+                    continue  # 再送された記録
+                self.ids.add(entry_id)
+                self.entries.append({
+                    'id': entry_id,
+                    'kiosk': str(entry.get('kiosk', '')),
+                    'score': entry['score'],
+                    'played_at': entry.get('played_at'),
+                    'duration_frames': entry.get('duration_frames'),
+                    'items_collected': entry.get('items_collected'),
+                })
+                added += 1
+            if added:
+                self._save()
+        return added
+
+    def top(self, limit):
+        with self._lock:
+            ranked = sorted(self.entries, key=lambda entry: entry['score'], reverse=True)[:limit]
+        return [{'score': entry['score'], 'kiosk': entry['kiosk'], 'played_at': entry['played_at']}
+                for entry in ranked]
+
+    def _save(self):
+        if not self.path:
+            return
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.entries, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+
+
+class LeaderboardHandler(BaseHTTPRequestHandler):
+    # keep-alive を有効にする
+    protocol_version = 'HTTP/1.1'
+    data: LeaderboardData = None
+    quiet = False
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        if url.path != '/top':
+            self._send_json(404, {'error': 'not found'})
+            return
+        try:
+            limit = int(parse_qs(url.query).get('limit', ['10'])[0])
+        except ValueError:
+            self._send_json(400, {'error': 'invalid limit'})
+            return
+        limit = max(1, min(MAX_LIMIT, limit))
+        self._send_json(200, {'scores': self.data.top(limit)})
+
+    def do_POST(self):
+        if urlsplit(self.path).path != '/scores':
+            self._send_json(404, {'error': 'not found'})
+            return
+        try:
+            length = int(self.headers.get('Content-Length') or 0)
+        except ValueError:
+            length = -1
+        if length <= 0 or length > MAX_BODY:
+            # 本体を読まずに返すので、残りがストリームに残らないように接続を閉じる
+            self._send_json(413 if length > MAX_BODY else 400, {'error': 'invalid body'}, close=True)
+            return
+        try:
+            payload = json.loads(self.rfile.read(length).decode('utf-8'))
+            entries = payload['scores']
+            if not isinstance(entries, list):
+                raise TypeError('scores must be a list')
+        except (ValueError, KeyError, TypeError) as e:
+            self._send_json(400, {'error': str(e)})
+            return
+        self._send_json(200, {'accepted': self.data.add(entries)})
+
+    def _send_json(self, status, data, close=False):
+        body = json.dumps(data, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        if close:
+            # close_connection も立つ（応答のあと接続を閉じる）
+            self.send_header('Connection', 'close')
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        if not self.quiet:
+            super().log_message(format, *args)
+
+
+def make_server(host='127.0.0.1', port=8765, data_path=None, quiet=False):
+    """サーバーを作成（serve_forever() で起動）"""
+    handler = type('Handler', (LeaderboardHandler,), {'data': LeaderboardData(data_path), 'quiet': quiet})
+    return ThreadingHTTPServer((host, port), handler)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="yokero 共有ランキングの参照サーバー")
+    parser.add_argument('--host', default='127.0.0.1', help="待ち受けるアドレス（LAN に公開する場合は 0.0.0.0）")
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--data', default='leaderboard.json', help="記録の保存先（空文字列で保存しない）")
+    parser.add_argument('--quiet', action='store_true', help="アクセスログを出さない")
+    args = parser.parse_args(argv)
+
+    server = make_server(args.host, args.port, args.data or None, args.quiet)
+    print(f"ランキングサーバーを起動しました: http://{args.host}:{server.server_address[1]}/")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
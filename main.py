@@ -1,18 +1,90 @@
+import time
+_PROCESS_START = time.perf_counter()  # 起動時間の計測用（--startup-trace）
+
 import pygame
+import argparse
+import atexit
 import random
 import json
 import os
 import math
+import sqlite3
+import sys
+import inspect
+import threading
+from collections import deque
 from enum import Enum
 from typing import List, Optional, Tuple
 
-# 初期化
-pygame.init()
-pygame.mixer.init(frequency=22050, size=-16, channels=2, buffer=512)
+from leaderboard import LeaderboardClient
+from pacing import FramePacer, PACING_NAMES
+from pipeline import RenderPipeline, copy_list, copy_slots
+from policies import DodgePolicy
+from render_backend import Canvas, SurfaceCanvas, TextureCanvas, create_renderer, draw_sprite, draw_sprites, renderer_available
+from replay import ReplayWriter, REPLAY_EXTENSION
+from savestate import StateRing, STATE_EXTENSION, load_state, save_state
+from score_store import ScoreStore
+from telemetry import TelemetryRecorder
+from ui import Button, WidgetTree
+
+# 起動時間の内訳
+class StartupTrace:
+    """起動の各段階にかかった時間を記録する（--startup-trace で表示）"""
+    def __init__(self):
+        self.enabled = False
+        self.last = _PROCESS_START
+        self.marks = []
+        self.finished = False
+        
+    def mark(self, label):
+        if self.finished:
+            return
+        now = time.perf_counter()
+        self.marks.append((label, now - self.last))
+        self.last = now
+        
+    def finish(self):
+        """記録を終えて、有効なら内訳を表示"""
+        if self.finished:
+            return
+        self.finished = True
+        if not self.enabled:
+            return
+        print("起動時間の内訳:")
+        for label, seconds in self.marks:
+            print(f"  {seconds * 1000:8.1f} ms  {label}")
+        print(f"  {(self.last - _PROCESS_START) * 1000:8.1f} ms  合計")
+
+startup_trace = StartupTrace()
+startup_trace.mark("import pygame")
+
+# 初期化（画面・フォント・イベントだけ。音声は使うときに init_audio() で初期化する）
+def init_pygame():
+    pygame.display.init()
+    pygame.font.init()
+
+def init_audio():
+    """ミキサーを初期化（初回だけ）。音声デバイスがなければ False"""
+    if pygame.mixer.get_init():
+        return True
+    try:
+        pygame.mixer.init(frequency=22050, size=-16, channels=2, buffer=512)
+    except pygame.error:
+        return False
+    return True
 
 # 日本語フォントを取得する関数
+_font_cache = {}
+
 def get_japanese_font(size, bold=False):
-    """日本語対応フォントを取得"""
+    """日本語対応フォントを取得（一度探したフォントはキャッシュする）"""
+    key = (size, bold)
+    font = _font_cache.get(key)
+    if font is None:
+        font = _font_cache[key] = _find_japanese_font(size, bold)
+    return font
+
+def _find_japanese_font(size, bold):
     # Windowsで利用可能な日本語フォントを順に試す
     font_names = ['meiryo', 'msgothic', 'ms pgothic', 'yugothic', 'yu gothic']
     for font_name in font_names:
@@ -31,6 +103,100 @@ def get_japanese_font(size, bold=False):
 SCREEN_WIDTH = 1200
 SCREEN_HEIGHT = 800
 FPS = 60
+# 一時停止・リザルト画面で動くものがないときは、入力があるまで最長この時間（ミリ秒）待つ（約10FPS）
+IDLE_WAIT_MS = 100
+
+# 難易度・出現ルールのチューニング値（フレーム単位）
+DEFAULT_TUNABLES = {
+    'obstacle_spawn_interval': 120,  # 障害物の初期生成間隔
+    'min_obstacle_spawn_interval': 60,  # 障害物の最短生成間隔
+    'obstacle_count_interval': 300,  # 障害物の追加処理の間隔
+    'obstacle_count_step': 3,  # 追加処理を何回行うと追加数を+1するか
+    'item_spawn_interval': 300,  # アイテムの生成判定の間隔
+    'item_spawn_chance': 0.4,  # アイテムの生成確率
+    'item_effect_duration': 600,  # アイテム効果の持続時間（10秒）
+    'base_obstacle_speed': 3,  # 障害物の初期速度
+    'speed_up_interval': 1200,  # 速度上昇の間隔（20秒）
+    'speed_up_step': 0.5,  # 速度上昇量
+}
+
+# リプレイの保存先
+REPLAY_DIR = 'replays'
+
+# ゲーム状態の保存先（プレイ中・一時停止中に F5 で保存し、--load-state で読み込む）
+STATE_DIR = 'states'
+# 巻き戻し（プレイ中・一時停止中に Backspace）: 状態を取る間隔と持つ数（フレーム、0.5秒ごとに10秒分）、1回で戻る時間
+REWIND_INTERVAL = 30
+REWIND_CAPACITY = 20
+REWIND_FRAMES = 180
+
+# 起動後の素材作成に1フレームあたり使う時間（秒）
+ASSET_BAKE_BUDGET = 0.006
+
+# 描画品質の段階（0 が最高）。見た目だけを変え、ゲームの進行（当たり判定・self.rng）には影響しない
+QUALITY_TIERS = (
+    {
+        'name': '高',
+        'glow_layers': 3,  # グローの層数の上限
+        'particle_scale': 1.0,  # 爆発・キラキラのパーティクル数の倍率
+        'wind_density': 1.0,  # 風の筋の数の倍率
+        'wind_segments': 5,  # 風の筋1本の最小分割数
+        'wind_segment_length': 10,  # 風の筋の1分割あたりの長さ（ピクセル）
+        'gradient_step': 2,  # タイトル背景のグラデーションの輪の間隔（作成時に使う）
+        'title_glow_layers': 8,  # タイトル文字のグローの層数
+        'energy_waves': 3,  # タイトル背景のエネルギー波の数（中心点ごと）
+    },
+    {
+        'name': '中',
+        'glow_layers': 1,
+        'particle_scale': 0.6,
+        'wind_density': 0.7,
+        'wind_segments': 3,
+        'wind_segment_length': 20,
+        'gradient_step': 3,
+        'title_glow_layers': 4,
+        'energy_waves': 2,
+    },
+    {
+        'name': '低',
+        'glow_layers': 0,
+        'particle_scale': 0.3,
+        'wind_density': 0.4,
+        'wind_segments': 2,
+        'wind_segment_length': 40,
+        'gradient_step': 4,
+        'title_glow_layers': 2,
+        'energy_waves': 1,
+    },
+)
+# コマンドライン（--quality）での段階の名前
+QUALITY_NAMES = ('high', 'medium', 'low', 'auto')
+# 描画品質を固定する場合の段階（None なら処理の重さに合わせて自動で切り替える。--quality でも指定できる）
+QUALITY_TIER = None
+# 現在の描画品質（QualityGovernor が書き換える）
+quality = dict(QUALITY_TIERS[0])
+
+# ゲーム画面（背景・風・パーティクル・グロー・障害物など）を描く解像度の倍率（1.0 で等倍、--render-scale でも指定できる）
+# 小さくすると縮小したバッファに描いて1回で拡大する。スコアなどの文字は等倍のまま描く
+RENDER_SCALE = 1.0
+
+# 描画先（'software' は Surface、'sdl2' は pygame._sdl2 の Renderer。--renderer でも指定できる）
+# sdl2 ではゲーム画面を Renderer に直接描き、キャッシュした素材はテクスチャにして使い回す（render_backend.py）
+RENDERER = 'software'
+RENDERER_NAMES = ('software', 'sdl2')
+
+# フレームの時刻の待ち方（'tick' / 'busy' / 'hybrid'、--pacing でも指定できる。pacing.py を参照）
+PACING = 'tick'
+
+# プレイ中の画面を別のスレッドで描く（--pipelined でも指定できる。表示は1フレーム遅れる。pipeline.py を参照）
+# 描画スレッドで描けるのは Surface だけなので、RENDERER が 'software' のときだけ使える
+PIPELINED = False
+
+def scale_rect(rect, scale):
+    """論理座標の矩形を描画倍率 scale の座標に変換（隣り合う矩形に隙間ができないよう端の位置で丸める）"""
+    x, y, w, h = rect
+    left, top = int(x * scale), int(y * scale)
+    return pygame.Rect(left, top, max(1, int((x + w) * scale) - left), max(1, int((y + h) * scale) - top))
 
 # 色
 WHITE = (255, 255, 255)
@@ -72,50 +238,86 @@ INSTRUCTIONS_TEXT = [
 
 # テキストレンダラークラス（かっこいいUI用）
 class TextRenderer:
+    # 影・グロー込みで描画したテキストのキャッシュ {(種類, テキスト, サイズ, 色, グローの層数): (Surface, 本体のサイズ)}
+    _sprites = {}
+    MAX_SPRITES = 256
+    # 演出用テキスト（Effect）のアニメーションのコマ {(テキスト, 色): {サイズ: (Surface, 本体のサイズ)}}
+    # 演出の文字は決まっているので上限はなく、スコア表示などで入れ替わる _sprites とは分けておく
+    _effect_frames = {}
+    EFFECT_SIZE_STEP = 2  # コマのサイズの刻み（大きさが毎フレーム変わっても、この刻みのコマを使い回す）
+    
+    @classmethod
+    def get_sprite(cls, kind, text, size, color):
+        """kind（'title' / 'normal'）のテキストを描画した Surface を返す（初回だけ描画する）"""
+        layers = quality['title_glow_layers'] if kind == 'title' else 0
+        key = (kind, text, size, color, layers)
+        sprite = cls._sprites.get(key)
+        if sprite is None:
+            if len(cls._sprites) >= cls.MAX_SPRITES:
+                # スコア表示などで毎回違うテキストが来るので、上限を超えたら作り直す
+                cls._sprites.clear()
+            if kind == 'title':
+                sprite = cls._render_title(text, size, color, layers)
+            else:
+                sprite = cls._render_normal(text, size, color)
+            cls._sprites[key] = sprite
+        return sprite
+    
+    @classmethod
+    def get_effect_frame(cls, text, size, color):
+        """演出用テキストの size のコマを返す（size は EFFECT_SIZE_STEP 刻みに丸め、初回だけ描画する）"""
+        step = cls.EFFECT_SIZE_STEP
+        size = max(step, round(size / step) * step)
+        frames = cls._effect_frames.get((text, color))
+        if frames is None:
+            frames = cls._effect_frames[(text, color)] = {}
+        sprite = frames.get(size)
+        if sprite is None:
+            sprite = frames[size] = cls._render_effect(text, size, color)
+        return sprite
+    
     @staticmethod
-    def draw_title(screen, text, x, y, size=80, color=TEXT_LIGHT, center=True):
-        """タイトル用テキスト（グロー効果、影付き）"""
+    def _blit_sprite(screen, sprite, x, y, center):
+        surface, (width, height) = sprite
+        text_rect = pygame.Rect(0, 0, width, height)
+        if center:
+            text_rect.center = (x, y)
+        else:
+            text_rect.topleft = (x, y)
+        draw_sprite(screen, surface, text_rect)
+        return text_rect
+    
+    @staticmethod
+    def _render_title(text, size, color, layers=8):
         font = get_japanese_font(size, bold=True)
+        text_surface = font.render(text, True, color)
+        width, height = text_surface.get_size()
+        # 層数が少ないときも、グローの広がりは同じにする
+        offsets = [int(i * 12 / layers + 0.5) for i in range(layers)]
+        pad = max(offsets[-1], 3)
+        sprite = pygame.Surface((width + pad, height + pad), pygame.SRCALPHA)
         
         # グロー効果（複数層の影で表現）
         glow_color = (96, 165, 250)  # 青系のグロー
-        for i in range(8):
-            offset = i * 1.5
-            alpha = int(200 * (1 - i / 8))
+        for i, offset in enumerate(offsets):
+            alpha = int(200 * (1 - i / layers))
             # 透明度は色の明度で表現
             glow_rgb = tuple(int(c * (alpha / 255)) for c in glow_color[:3])
-            glow_surf = font.render(text, True, glow_rgb)
-            glow_rect = glow_surf.get_rect()
-            if center:
-                glow_rect.center = (x + offset, y + offset)
-            else:
-                glow_rect.topleft = (x + offset, y + offset)
-            screen.blit(glow_surf, glow_rect)
+            sprite.blit(font.render(text, True, glow_rgb), (offset, offset))
         
         # 影（黒）
-        shadow = font.render(text, True, (0, 0, 0))
-        shadow_rect = shadow.get_rect()
-        if center:
-            shadow_rect.center = (x + 3, y + 3)
-        else:
-            shadow_rect.topleft = (x + 3, y + 3)
-        screen.blit(shadow, shadow_rect)
+        sprite.blit(font.render(text, True, (0, 0, 0)), (3, 3))
         
         # メインテキスト
-        text_surface = font.render(text, True, color)
-        text_rect = text_surface.get_rect()
-        if center:
-            text_rect.center = (x, y)
-        else:
-            text_rect.topleft = (x, y)
-        screen.blit(text_surface, text_rect)
-        
-        return text_rect
+        sprite.blit(text_surface, (0, 0))
+        return sprite, (width, height)
     
     @staticmethod
-    def draw_effect(screen, text, x, y, size=60, color=YELLOW, center=True):
-        """演出用テキスト（派手なグロー効果）"""
+    def _render_effect(text, size, color):
         font = get_japanese_font(size, bold=True)
+        text_surface = font.render(text, True, color)
+        width, height = text_surface.get_size()
+        sprite = pygame.Surface((width + 18, height + 18), pygame.SRCALPHA)
         
         # 強いグロー効果
         for i in range(10):
@@ -124,58 +326,43 @@ class TextRenderer:
             glow_color = tuple(min(255, c + i * 15) for c in color[:3])
             # 透明度は色の明度で表現
             glow_rgb = tuple(int(c * (alpha / 255)) for c in glow_color[:3])
-            glow_surf = font.render(text, True, glow_rgb)
-            glow_rect = glow_surf.get_rect()
-            if center:
-                glow_rect.center = (x + offset, y + offset)
-            else:
-                glow_rect.topleft = (x + offset, y + offset)
-            screen.blit(glow_surf, glow_rect)
+            sprite.blit(font.render(text, True, glow_rgb), (offset, offset))
         
         # 影
-        shadow = font.render(text, True, (0, 0, 0))
-        shadow_rect = shadow.get_rect()
-        if center:
-            shadow_rect.center = (x + 4, y + 4)
-        else:
-            shadow_rect.topleft = (x + 4, y + 4)
-        screen.blit(shadow, shadow_rect)
+        sprite.blit(font.render(text, True, (0, 0, 0)), (4, 4))
         
         # メインテキスト
+        sprite.blit(text_surface, (0, 0))
+        return sprite, (width, height)
+    
+    @staticmethod
+    def _render_normal(text, size, color):
+        font = get_japanese_font(size)
         text_surface = font.render(text, True, color)
-        text_rect = text_surface.get_rect()
-        if center:
-            text_rect.center = (x, y)
-        else:
-            text_rect.topleft = (x, y)
-        screen.blit(text_surface, text_rect)
-        
-        return text_rect
+        width, height = text_surface.get_size()
+        sprite = pygame.Surface((width + 2, height + 2), pygame.SRCALPHA)
+        # シンプルな影（見やすさ重視）
+        sprite.blit(font.render(text, True, (0, 0, 0)), (2, 2))
+        sprite.blit(text_surface, (0, 0))
+        return sprite, (width, height)
+    
+    @staticmethod
+    def draw_title(screen, text, x, y, size=80, color=TEXT_LIGHT, center=True):
+        """タイトル用テキスト（グロー効果、影付き）"""
+        sprite = TextRenderer.get_sprite('title', text, size, color)
+        return TextRenderer._blit_sprite(screen, sprite, x, y, center)
+    
+    @staticmethod
+    def draw_effect(screen, text, x, y, size=60, color=YELLOW, center=True):
+        """演出用テキスト（派手なグロー効果、size は EFFECT_SIZE_STEP 刻みに丸める）"""
+        sprite = TextRenderer.get_effect_frame(text, size, color)
+        return TextRenderer._blit_sprite(screen, sprite, x, y, center)
     
     @staticmethod
     def draw_normal(screen, text, x, y, size=32, color=TEXT_LIGHT, center=False):
         """通常テキスト（見やすく、シンプルな影）"""
-        font = get_japanese_font(size)
-        
-        # シンプルな影（見やすさ重視）
-        shadow = font.render(text, True, (0, 0, 0))
-        shadow_rect = shadow.get_rect()
-        if center:
-            shadow_rect.center = (x + 2, y + 2)
-        else:
-            shadow_rect.topleft = (x + 2, y + 2)
-        screen.blit(shadow, shadow_rect)
-        
-        # メインテキスト
-        text_surface = font.render(text, True, color)
-        text_rect = text_surface.get_rect()
-        if center:
-            text_rect.center = (x, y)
-        else:
-            text_rect.topleft = (x, y)
-        screen.blit(text_surface, text_rect)
-        
-        return text_rect
+        sprite = TextRenderer.get_sprite('normal', text, size, color)
+        return TextRenderer._blit_sprite(screen, sprite, x, y, center)
     
     @staticmethod
     def draw_subtitle(screen, text, x, y, size=16, color=TEXT_GRAY, center=True):
@@ -199,9 +386,62 @@ class GameState(Enum):
     PAUSED = 3
     RESULT = 4
 
+# オブジェクトプール（フリーリスト）
+class ObjectPool:
+    """使い終わったオブジェクトを再利用するプール
+
+    acquire() は空きがあれば reset() で初期化し直して返し、なければ新しく作る。
+    生成・破棄の繰り返し（GCの負荷）を減らすために使う。
+    """
+    def __init__(self, cls):
+        self.cls = cls
+        self.free = []
+        self.in_use = 0
+        self.high_water = 0  # 同時使用数の最大値
+        self.created = 0
+        
+    def acquire(self, *args, **kwargs):
+        if self.free:
+            obj = self.free.pop()
+            obj.reset(*args, **kwargs)
+        else:
+            obj = self.cls(*args, **kwargs)
+            self.created += 1
+        self.in_use += 1
+        if self.in_use > self.high_water:
+            self.high_water = self.in_use
+        return obj
+    
+    def release(self, obj):
+        self.in_use -= 1
+        self.free.append(obj)
+        
+    def release_all(self, objects):
+        """リストの中身をすべて返却してリストを空にする"""
+        self.in_use -= len(objects)
+        self.free.extend(objects)
+        objects.clear()
+        
+    def stats(self):
+        return {
+            'in_use': self.in_use,
+            'free': len(self.free),
+            'high_water': self.high_water,
+            'created': self.created,
+        }
+
 # プレイヤークラス
+# Player / Obstacle / Item は当たり判定用の Rect を1つだけ持ち、位置やサイズを変えた時に更新する。
+# Rect の座標は pygame.Rect(x, y, ...) と同じく整数に切り捨てる（属性への代入は四捨五入になるため int() を使う）。
 class Player:
+    __slots__ = ('width', 'height', 'x', 'y', 'speed', 'base_speed', 'base_width', 'base_height',
+                 'color', 'rect')
+    
     def __init__(self):
+        self.rect = pygame.Rect(0, 0, 0, 0)
+        self.reset()
+        
+    def reset(self):
         self.width = 40
         self.height = 60
         self.x = 50
@@ -211,6 +451,7 @@ class Player:
         self.base_width = 40
         self.base_height = 60
         self.color = BLUE
+        self.rect.update(self.x, self.y, self.width, self.height)
         
     def update(self, keys):
         # 滑らかな移動（キーが押されている間、毎フレーム移動）
@@ -226,25 +467,28 @@ class Player:
             # 下端を超えたら上端から下に移動
             if self.y > SCREEN_HEIGHT - self.height:
                 self.y = 0
+        self.rect.y = int(self.y)
             
-    def draw(self, screen):
+    def draw(self, canvas):
+        """canvas（render_backend.Canvas）に描く。座標と大きさには canvas.scale（描画倍率）を掛ける"""
+        scale = canvas.scale
+        x, y = self.x * scale, self.y * scale
+        width, height = self.width * scale, int(self.height * scale)
         # グラデーション効果（簡易版）
-        for i in range(self.height):
-            ratio = i / self.height
+        for i in range(height):
+            ratio = i / height
             r = int(self.color[0] * (1 - ratio) + (self.color[0] * 0.7) * ratio)
             g = int(self.color[1] * (1 - ratio) + (self.color[1] * 0.7) * ratio)
             b = int(self.color[2] * (1 - ratio) + (self.color[2] * 0.7) * ratio)
-            pygame.draw.line(screen, (r, g, b), 
-                           (self.x, self.y + i), 
-                           (self.x + self.width, self.y + i))
+            canvas.line((r, g, b), 
+                        (x, y + i), 
+                        (x + width, y + i))
         # ハイライト
-        highlight_surf = pygame.Surface((self.width, self.height // 3))
-        highlight_surf.set_alpha(50)
-        highlight_surf.fill(WHITE)
-        screen.blit(highlight_surf, (self.x, self.y))
+        canvas.overlay(WHITE, 50, (x, y, width, height // 3))
         
     def get_rect(self):
-        return pygame.Rect(self.x, self.y, self.width, self.height)
+        """当たり判定用の Rect（共有しているので書き換えないこと）"""
+        return self.rect
         
     def apply_speed_boost(self, multiplier):
         self.speed = self.base_speed * multiplier
@@ -252,15 +496,25 @@ class Player:
     def apply_size_reduction(self, multiplier):
         self.width = int(self.base_width * multiplier)
         self.height = int(self.base_height * multiplier)
+        self.rect.size = (self.width, self.height)
         
     def reset_effects(self):
         self.speed = self.base_speed
         self.width = self.base_width
         self.height = self.base_height
+        self.rect.size = (self.width, self.height)
 
 # 障害物クラス
 class Obstacle:
+    __slots__ = ('x', 'y', 'width', 'height', 'base_width', 'base_height', 'speed', 'base_speed', 'rect')
+    
+    color = WHITE
+    
     def __init__(self, x, y, width, height, speed):
+        self.rect = pygame.Rect(0, 0, 0, 0)
+        self.reset(x, y, width, height, speed)
+        
+    def reset(self, x, y, width, height, speed):
         self.x = x
         self.y = y
         self.width = width
@@ -269,27 +523,88 @@ class Obstacle:
         self.base_height = height
         self.speed = speed
         self.base_speed = speed
-        self.color = WHITE
+        self.rect.update(int(x), int(y), width, height)
         
     def update(self):
         self.x -= self.speed
+        self.rect.x = int(self.x)
         
-    def draw(self, screen):
-        pygame.draw.rect(screen, self.color, (self.x, self.y, self.width, self.height))
+    def draw(self, canvas):
+        scale = canvas.scale
+        canvas.rect(self.color, self.rect if scale == 1 else scale_rect(self.rect, scale))
         
     def get_rect(self):
-        return pygame.Rect(self.x, self.y, self.width, self.height)
+        """当たり判定用の Rect（共有しているので書き換えないこと）"""
+        return self.rect
         
     def apply_size_reduction(self, multiplier):
         self.width = int(self.base_width * multiplier)
         self.height = int(self.base_height * multiplier)
+        self.rect.size = (self.width, self.height)
         
     def apply_speed_reduction(self, multiplier):
         self.speed = self.base_speed * multiplier
 
 # アイテムクラス
 class Item:
+    __slots__ = ('x', 'y', 'width', 'height', 'type', 'speed', 'collected', 'color', 'rect')
+    
+    # アイテムタイプに応じた色
+    COLORS = {
+        'speed': BLUE,
+        'shrink': RED,
+        'obstacle_shrink': GREEN,
+        'slow': YELLOW
+    }
+    # アイテムタイプを示す記号
+    SYMBOLS = {
+        'speed': '↑',
+        'shrink': '↓',
+        'obstacle_shrink': '●',
+        'slow': '←'
+    }
+    # 種類ごとの見た目（bake_atlas() で作る。作る前は毎回描画する）
+    ATLAS = None
+    SPRITES = {}
+    SIZE = 30
+    # 描画倍率ごとに縮小した見た目 {倍率: {種類: Surface}}
+    SCALED_SPRITES = {}
+    
+    @classmethod
+    def bake_atlas(cls):
+        """全種類の見た目を1枚の Surface にまとめて描画しておく"""
+        size = cls.SIZE
+        atlas = pygame.Surface((size * len(cls.COLORS), size), pygame.SRCALPHA)
+        font = get_japanese_font(20)
+        sprites = {}
+        for i, (item_type, color) in enumerate(cls.COLORS.items()):
+            area = pygame.Rect(i * size, 0, size, size)
+            pygame.draw.circle(atlas, color, area.center, size // 2)
+            text = font.render(cls.SYMBOLS.get(item_type, '?'), True, WHITE)
+            atlas.blit(text, text.get_rect(center=area.center))
+            sprites[item_type] = atlas.subsurface(area)
+        cls.ATLAS = atlas
+        cls.SPRITES = sprites
+        cls.SCALED_SPRITES = {}
+        
+    @classmethod
+    def sprites_for_scale(cls, scale):
+        """描画倍率 scale 用の見た目（初回だけ縮小する）"""
+        if scale == 1:
+            return cls.SPRITES
+        sprites = cls.SCALED_SPRITES.get(scale)
+        if sprites is None:
+            size = max(1, round(cls.SIZE * scale))
+            sprites = cls.SCALED_SPRITES[scale] = {
+                item_type: pygame.transform.smoothscale(sprite, (size, size))
+                for item_type, sprite in cls.SPRITES.items()}
+        return sprites
+    
     def __init__(self, x, y, item_type):
+        self.rect = pygame.Rect(0, 0, 0, 0)
+        self.reset(x, y, item_type)
+        
+    def reset(self, x, y, item_type):
         self.x = x
         self.y = y
         self.width = 30
@@ -297,73 +612,249 @@ class Item:
         self.type = item_type  # 'speed', 'shrink', 'obstacle_shrink', 'slow'
         self.speed = 3
         self.collected = False
-        
-        # アイテムタイプに応じた色
-        self.colors = {
-            'speed': BLUE,
-            'shrink': RED,
-            'obstacle_shrink': GREEN,
-            'slow': YELLOW
-        }
-        self.color = self.colors.get(item_type, WHITE)
+        self.color = self.COLORS.get(item_type, WHITE)
+        self.rect.update(int(x), int(y), self.width, self.height)
         
     def update(self):
         self.x -= self.speed
+        self.rect.x = int(self.x)
         
-    def draw(self, screen):
-        if not self.collected:
-            pygame.draw.circle(screen, self.color, 
-                             (self.x + self.width // 2, self.y + self.height // 2), 
-                             self.width // 2)
+    def draw(self, canvas):
+        if self.collected:
+            return
+        scale = canvas.scale
+        sprite = self.sprites_for_scale(scale).get(self.type)
+        if sprite is not None:
+            canvas.sprite(sprite, self.rect if scale == 1 else (int(self.x * scale), int(self.y * scale)))
+        else:
+            center = ((self.x + self.width // 2) * scale, (self.y + self.height // 2) * scale)
+            canvas.circle(self.color, center, max(1, int(self.width // 2 * scale)))
             # アイテムタイプを示す記号を描画
             font = get_japanese_font(20)
-            symbols = {
-                'speed': '↑',
-                'shrink': '↓',
-                'obstacle_shrink': '●',
-                'slow': '←'
-            }
-            text = font.render(symbols.get(self.type, '?'), True, WHITE)
-            text_rect = text.get_rect(center=(self.x + self.width // 2, self.y + self.height // 2))
-            screen.blit(text, text_rect)
+            text = font.render(self.SYMBOLS.get(self.type, '?'), True, WHITE)
+            text_rect = text.get_rect(center=center)
+            canvas.blit(text, text_rect)
             
     def get_rect(self):
-        return pygame.Rect(self.x, self.y, self.width, self.height)
+        """当たり判定用の Rect（共有しているので書き換えないこと）"""
+        return self.rect
+
+# ファイル書き込みスレッド
+class BackgroundFileWriter:
+    """JSON ファイルをバックグラウンドスレッドで書き出す
+
+    submit() はデータを預けるだけですぐに戻る。書き込み前に何度も submit() された場合は
+    最新のデータだけを書く。書き込みは一時ファイルに書いてから置き換えるので、
+    途中でクラッシュしても元のファイルは壊れない。
+    """
+    def __init__(self, path):
+        self.path = path
+        self._condition = threading.Condition()
+        self._pending = None
+        self._has_pending = False
+        self._writing = False
+        self._closed = False
+        self._thread = None
+        
+    def submit(self, data):
+        with self._condition:
+            if self._closed:
+                return
+            self._pending = data
+            self._has_pending = True
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='score-writer', daemon=True)
+                self._thread.start()
+                # 終了時に書き残しがないようにする
+                atexit.register(self.close)
+            self._condition.notify()
+            
+    def flush(self, timeout=None):
+        """書き込み待ちのデータがすべて書かれるまで待つ"""
+        with self._condition:
+            return self._condition.wait_for(lambda: not self._has_pending and not self._writing, timeout)
+            
+    def close(self, timeout=5.0):
+        """書き残しを書いてからスレッドを終了する"""
+        with self._condition:
+            if self._closed:
+                return
+            self._closed = True
+            self._condition.notify_all()
+        if self._thread:
+            self._thread.join(timeout)
+            
+    def _run(self):
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda: self._has_pending or self._closed)
+                if not self._has_pending:
+                    return
+                data = self._pending
+                self._pending = None
+                self._has_pending = False
+                self._writing = True
+            try:
+                self._write_atomic(data)
+            except (OSError, TypeError, ValueError) as e:
+                print(f"スコアの保存に失敗しました: {e}", file=sys.stderr)
+            finally:
+                with self._condition:
+                    self._writing = False
+                    self._condition.notify_all()
+                    
+    def _write_atomic(self, data):
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
 
 # スコアマネージャー
 class ScoreManager:
-    def __init__(self):
-        self.score_file = 'scores.json'
-        self.scores = self.load_scores()
+    def __init__(self, score_file='scores.json', db_file='scores.db', leaderboard=None):
+        # score_file / db_file が None の場合はメモリ上だけで管理（ヘッドレス用）
+        self.score_file = score_file
+        # 共有ランキング（LeaderboardClient）。None ならこの端末だけで管理
+        self.leaderboard = leaderboard
+        # すべてのプレイの履歴（SQLite）。初回起動時に scores.json を取り込む
+        self.store = None
+        # scores.json が壊れていて取り込めなかった（退避したので、最初に書き出すときに取り込み済みにする）
+        self._json_import_pending = False
+        if db_file:
+            try:
+                self.store = ScoreStore(db_file)
+                if score_file and not self.store.json_imported():
+                    # 壊れたファイルは load_scores() が .corrupt に退避する。読めなかったので取り込み済みにはしない
+                    scores = self.load_scores()
+                    if scores is None:
+                        self._json_import_pending = True
+                    else:
+                        self.store.import_scores(scores)
+            except sqlite3.Error as e:
+                print(f"スコア履歴を開けませんでした: {e}", file=sys.stderr)
+                self.store = None
+        self.scores = self.store.top_scores(10) if self.store else (self.load_scores() or [])
+        # ハイスコアはキャッシュし、保存時に更新する（リザルト画面で毎フレーム参照するため）
+        self.high_score = max(self.scores) if self.scores else 0
+        self.writer = BackgroundFileWriter(score_file) if score_file else None
         
     def load_scores(self):
-        if os.path.exists(self.score_file):
+        """scores.json のスコア（ファイルがなければ []、壊れていれば退避して None）"""
+        if self.score_file and os.path.exists(self.score_file):
             try:
                 with open(self.score_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-            except:
-                return []
+                    return [int(score) for score in json.load(f)]
+            except (OSError, ValueError, TypeError) as e:
+                # 壊れたファイルは上書きせずに退避しておく
+                corrupt_path = self.score_file + '.corrupt'
+                print(f"スコアファイルを読み込めませんでした（{corrupt_path} に退避します）: {e}", file=sys.stderr)
+                try:
+                    os.replace(self.score_file, corrupt_path)
+                except OSError:
+                    pass
+                return None
         return []
         
-    def save_score(self, score):
+    def save_score(self, score, duration_frames=None, items_collected=None, seed=None):
         self.scores.append(score)
         self.scores.sort(reverse=True)
         self.scores = self.scores[:10]  # トップ10のみ保持
-        
-        with open(self.score_file, 'w', encoding='utf-8') as f:
-            json.dump(self.scores, f, ensure_ascii=False, indent=2)
+        if score > self.high_score:
+            self.high_score = score
+        
+        if self._json_import_pending:
+            # これから書く scores.json は履歴の上位なので、次回の起動で取り込まないようにする
+            self.store.import_scores([])
+            self._json_import_pending = False
+        # ファイルへの書き込みはバックグラウンドで行う（ゲームループを止めない）
+        if self.writer:
+            self.writer.submit(list(self.scores))
+        if self.store:
+            self.store.add_run(score, duration_frames, items_collected, seed)
+        if self.leaderboard:
+            self.leaderboard.submit(score, duration_frames, items_collected, seed)
+            
+    def flush(self, timeout=None):
+        """保存待ちのスコアがファイルに書かれるまで待つ"""
+        if self.writer:
+            self.writer.flush(timeout)
+        if self.store:
+            self.store.flush()
+            
+    def close(self):
+        if self.writer:
+            self.writer.close()
+        if self.store:
+            self.store.close()
+        if self.leaderboard:
+            self.leaderboard.close()
             
     def get_high_score(self):
-        if self.scores:
-            return max(self.scores)
-        return 0
+        return self.high_score
+        
+    def ranking(self):
+        """ランキング画面に出す (順位, スコア, 端末名) の一覧と、共有ランキングかどうか
+
+        共有ランキングはバックグラウンドで取得したキャッシュを使う。まだ取得できていなければ
+        この端末の記録を返す。
+        """
+        if self.leaderboard:
+            top = self.leaderboard.top_scores()
+            if top is not None:
+                return [(i + 1, entry.get('score', 0), entry.get('kiosk', '')) for i, entry in enumerate(top)], True
+        return [(i + 1, score, None) for i, score in enumerate(self.scores[:10])], False
         
     def is_new_high_score(self, score):
         return score > self.get_high_score()
 
+# パーティクルの点のスプライト（色・半径・透明度ごとに最初の1回だけ描いて使い回す）
+class DotSprites:
+    # {(色, 半径, 透明度, グロー): (Surface, 中心から左上までのずれ)}
+    _sprites = {}
+    ALPHA_STEP = 16  # 透明度の刻み（フェードアウトで毎フレーム変わっても、この刻みのスプライトを使い回す）
+    GLOW_SPREAD = 2  # グローが広がる半径（点の半径の倍数）
+    GLOW_ALPHA = 0.35  # グローの内側の濃さ（点の透明度に対する割合、外側に向かって 0 になる）
+    # 不透明でグローなしの点 {(色, 半径): (Surface, ずれ)}（ParticleSystem.draw() が直接引く）
+    solid = {}
+    
+    @classmethod
+    def get(cls, color, radius, alpha=255, glow=False):
+        """半径 radius の点の (Surface, ずれ) を返す（左上 = 中心 - ずれ に描くと pygame.draw.circle と同じ位置になる）
+        
+        glow=True はまわりにぼんやりしたグローを付けたもの。alpha は ALPHA_STEP 刻みに丸める。
+        """
+        step = cls.ALPHA_STEP
+        alpha = min(255, (alpha + step // 2) // step * step)
+        key = (color, radius, alpha, glow)
+        sprite = cls._sprites.get(key)
+        if sprite is None:
+            sprite = cls._sprites[key] = cls._render(color[:3], radius, alpha, glow)
+        return sprite
+    
+    @classmethod
+    def _render(cls, color, radius, alpha, glow):
+        offset = radius * cls.GLOW_SPREAD if glow else radius
+        surface = pygame.Surface((offset * 2, offset * 2), pygame.SRCALPHA)
+        center = (offset, offset)
+        if glow:
+            # 外側の輪から順に、内側ほど濃い円を重ねて描く（円は下の円を上書きする）
+            for r in range(offset, radius, -1):
+                fade = 1 - (r - radius) / (offset - radius + 1)
+                pygame.draw.circle(surface, (*color, int(alpha * cls.GLOW_ALPHA * fade * fade)), center, r)
+        pygame.draw.circle(surface, (*color, alpha), center, radius)
+        return surface, offset
+
 # パーティクルクラス
 class Particle:
+    __slots__ = ('x', 'y', 'color', 'velocity_x', 'velocity_y', 'size', 'lifetime', 'max_lifetime',
+                 'gravity', 'active')
+    
     def __init__(self, x, y, color, velocity_x=0, velocity_y=0, size=3, lifetime=30, gravity=0.1):
+        self.reset(x, y, color, velocity_x, velocity_y, size, lifetime, gravity)
+        
+    def reset(self, x, y, color, velocity_x=0, velocity_y=0, size=3, lifetime=30, gravity=0.1):
         self.x = x
         self.y = y
         self.color = color
@@ -382,28 +873,25 @@ class Particle:
         self.lifetime -= 1
         if self.lifetime <= 0:
             self.active = False
-            
-    def draw(self, screen):
-        if self.active:
-            alpha = int(255 * (self.lifetime / self.max_lifetime))
-            color_with_alpha = (*self.color[:3], alpha) if len(self.color) > 3 else self.color
-            size = int(self.size * (self.lifetime / self.max_lifetime))
-            if size > 0:
-                pygame.draw.circle(screen, self.color, (int(self.x), int(self.y)), size)
 
 # パーティクルシステムクラス
 class ParticleSystem:
     def __init__(self):
         self.particles: List[Particle] = []
+        self.pool = ObjectPool(Particle)
+        
+    def clear(self):
+        """すべてのパーティクルをプールに戻す"""
+        self.pool.release_all(self.particles)
         
     def add_explosion(self, x, y, color, count=20, speed=5):
-        """爆発エフェクトを追加"""
-        for _ in range(count):
+        """爆発エフェクトを追加（数は描画品質に合わせて減らす）"""
+        for _ in range(max(1, int(count * quality['particle_scale']))):
             angle = random.uniform(0, 2 * math.pi)
             speed_variation = random.uniform(0.5, speed)
             vx = math.cos(angle) * speed_variation
             vy = math.sin(angle) * speed_variation
-            particle = Particle(
+            particle = self.pool.acquire(
                 x, y, color,
                 velocity_x=vx,
                 velocity_y=vy,
@@ -414,13 +902,13 @@ class ParticleSystem:
             self.particles.append(particle)
     
     def add_sparkle(self, x, y, color, count=10):
-        """キラキラエフェクトを追加"""
-        for _ in range(count):
+        """キラキラエフェクトを追加（数は描画品質に合わせて減らす）"""
+        for _ in range(max(1, int(count * quality['particle_scale']))):
             angle = random.uniform(0, 2 * math.pi)
             speed = random.uniform(1, 3)
             vx = math.cos(angle) * speed
             vy = math.sin(angle) * speed
-            particle = Particle(
+            particle = self.pool.acquire(
                 x, y, color,
                 velocity_x=vx,
                 velocity_y=vy,
@@ -433,7 +921,7 @@ class ParticleSystem:
     def add_trail(self, x, y, color):
         """軌跡エフェクトを追加"""
         for _ in range(3):
-            particle = Particle(
+            particle = self.pool.acquire(
                 x + random.randint(-5, 5),
                 y + random.randint(-5, 5),
                 color,
@@ -446,18 +934,46 @@ class ParticleSystem:
             self.particles.append(particle)
     
     def update(self):
-        for particle in self.particles[:]:
+        # 消えたパーティクルはプールに戻し、リストはその場で詰める
+        particles = self.particles
+        kept = 0
+        for particle in particles:
             particle.update()
-            if not particle.active:
-                self.particles.remove(particle)
+            if particle.active:
+                particles[kept] = particle
+                kept += 1
+            else:
+                self.pool.release(particle)
+        del particles[kept:]
     
-    def draw(self, screen):
+    def draw(self, canvas):
+        """すべてのパーティクルを点のスプライトにして、まとめて描く（小さくなるほど点の半径が小さくなる）"""
+        scale = canvas.scale
+        sprites = DotSprites.solid
+        batch = []
+        append = batch.append
         for particle in self.particles:
-            particle.draw(screen)
+            if not particle.active:
+                continue
+            size = int(particle.size * (particle.lifetime / particle.max_lifetime))
+            if size > 0:
+                radius = int(size * scale) or 1
+                key = (particle.color, radius)
+                sprite = sprites.get(key)
+                if sprite is None:
+                    sprite = sprites[key] = DotSprites.get(particle.color, radius)
+                surface, offset = sprite
+                append((surface, (int(particle.x * scale) - offset, int(particle.y * scale) - offset)))
+        draw_sprites(canvas, batch)
 
 # 風パーティクルクラス
 class WindParticle:
+    __slots__ = ('x', 'y', 'length', 'speed', 'color', 'layer', 'width', 'max_x', 'active')
+    
     def __init__(self, x, y, length, speed, color, layer=0):
+        self.reset(x, y, length, speed, color, layer)
+        
+    def reset(self, x, y, length, speed, color, layer=0):
         self.x = x
         self.y = y
         self.length = length  # 線の長さ
@@ -474,10 +990,13 @@ class WindParticle:
         if self.x + self.length < 0:
             self.active = False
             
-    def draw(self, screen):
+    def draw(self, canvas):
         if self.active:
+            scale = canvas.scale
             # グラデーション計算（右側が濃く、左側が薄く）
             start_x = int(self.x)
+            line_height = max(1, int((self.width + 2) * scale))
+            top = int((int(self.y) - self.width // 2) * scale)
             end_x = int(self.x + self.length)
             
             # 右側（開始位置からの距離に基づく透明度）
@@ -489,24 +1008,23 @@ class WindParticle:
             alpha_left = max(0, alpha_right - 100)
             
             # グラデーション線を描画（複数の線で表現）
-            segments = max(5, self.length // 10)
+            segments = max(quality['wind_segments'], self.length // quality['wind_segment_length'])
             for i in range(segments):
                 seg_start_x = start_x + (i * self.length // segments)
                 seg_end_x = start_x + ((i + 1) * self.length // segments)
                 progress = i / segments
                 alpha = int(alpha_right * (1 - progress) + alpha_left * progress)
+                left, right = int(seg_start_x * scale), int(seg_end_x * scale)
                 
-                # 透明度を適用したSurfaceを作成
-                if alpha > 0 and seg_end_x > seg_start_x:
-                    line_surf = pygame.Surface((seg_end_x - seg_start_x, self.width + 2), pygame.SRCALPHA)
-                    color_with_alpha = (*self.color[:3], min(255, alpha))
-                    line_surf.fill(color_with_alpha)
-                    screen.blit(line_surf, (seg_start_x, int(self.y) - self.width // 2))
+                # 透明度を適用して描く
+                if alpha > 0 and right > left:
+                    canvas.alpha_rect((*self.color[:3], min(255, alpha)), (left, top, right - left, line_height))
 
 # 風エフェクトクラス
 class WindEffect:
     def __init__(self):
         self.particles: List[WindParticle] = []
+        self.pool = ObjectPool(WindParticle)
         self.active = False
         self.duration = 0
         self.timer = 0
@@ -528,11 +1046,19 @@ class WindEffect:
     def stop(self):
         """風エフェクトを停止"""
         self.active = False
-        self.particles.clear()
+        self.pool.release_all(self.particles)
+        
+    def reset(self):
+        """初期状態に戻す（パーティクルはプールに戻す）"""
+        self.stop()
+        self.duration = 0
+        self.timer = 0
+        self.spawn_timer = 0
+        self.density = 1.0
         
     def burst_spawn(self):
         """バースト生成（一度に大量生成）"""
-        count = int(30 * self.density)  # 密度に応じた数
+        count = int(30 * self.density * quality['wind_density'])  # 密度と描画品質に応じた数
         for _ in range(count):
             self.spawn_particle(use_random=True)
             
@@ -563,7 +1089,7 @@ class WindEffect:
             color = (150, 170, 200)  # グレー
             speed *= 1.0  # 速度倍率を上げる（0.8 → 1.0）
             
-        particle = WindParticle(SCREEN_WIDTH, y, length, speed, color, layer)
+        particle = self.pool.acquire(SCREEN_WIDTH, y, length, speed, color, layer)
         self.particles.append(particle)
         
     def update(self):
@@ -574,8 +1100,8 @@ class WindEffect:
         if self.active:
             self.spawn_timer += 1
             
-            # 連続生成（一定間隔で右端に生成）
-            if self.spawn_timer >= self.spawn_interval:
+            # 連続生成（一定間隔で右端に生成、描画品質が低いときは間隔を空ける）
+            if self.spawn_timer >= self.spawn_interval / quality['wind_density']:
                 # ランダム配置とグリッド配置を混在
                 if random.random() < 0.7:  # 70%がランダム
                     self.spawn_particle(use_random=True)
@@ -589,24 +1115,33 @@ class WindEffect:
                 # パーティクルは自然に消えるまで残す（削除しない）
             
         # パーティクルの更新（activeがFalseでも既存のパーティクルは更新し続ける）
-        for particle in self.particles[:]:
+        particles = self.particles
+        kept = 0
+        for particle in particles:
             particle.update()
             # 画面左端に消えたら削除（フェードアウト完了）
-            if not particle.active:
-                self.particles.remove(particle)
+            if particle.active:
+                particles[kept] = particle
+                kept += 1
+            else:
+                self.pool.release(particle)
+        del particles[kept:]
             
-    def draw(self, screen):
+    def draw(self, canvas):
         """風エフェクトを描画（レイヤー順に）"""
         # パーティクルが存在する限り描画（activeがFalseでも既存のパーティクルは表示）
         # レイヤーごとに描画（背景から前景へ）
         for layer in range(self.layers):
             for particle in self.particles:
                 if particle.layer == layer:
-                    particle.draw(screen)
+                    particle.draw(canvas)
 
 # 画面シェイクエフェクト
 class ScreenShake:
     def __init__(self):
+        self.reset()
+        
+    def reset(self):
         self.shake_intensity = 0
         self.shake_duration = 0
         self.offset_x = 0
@@ -631,36 +1166,31 @@ class ScreenShake:
 # グロー効果クラス
 class GlowEffect:
     @staticmethod
-    def draw_glow_circle(screen, x, y, radius, color, intensity=3):
-        """グロー効果付き円を描画"""
-        for i in range(intensity):
+    def draw_glow_circle(canvas, x, y, radius, color, intensity=3):
+        """グロー効果付き円を描画（層数は描画品質の上限まで、座標と大きさには canvas.scale を掛ける）"""
+        scale = canvas.scale
+        x, y = x * scale, y * scale
+        for i in range(min(intensity, quality['glow_layers'])):
             alpha = max(0, 50 - i * 15)
-            size = radius + i * 3
-            glow_surf = pygame.Surface((size * 2, size * 2), pygame.SRCALPHA)
+            size = max(1, int((radius + i * 3) * scale))
             glow_color = (*color[:3], alpha) if len(color) > 3 else color
-            pygame.draw.circle(glow_surf, glow_color, (size, size), size)
-            try:
-                screen.blit(glow_surf, (x - size, y - size), special_flags=pygame.BLEND_ALPHA_SDL2)
-            except:
-                screen.blit(glow_surf, (x - size, y - size))
-        pygame.draw.circle(screen, color, (int(x), int(y)), radius)
+            canvas.glow_circle(glow_color, (x, y), size)
+        canvas.circle(color, (int(x), int(y)), max(1, int(radius * scale)))
     
     @staticmethod
-    def draw_glow_rect(screen, rect, color, intensity=3):
-        """グロー効果付き矩形を描画"""
+    def draw_glow_rect(canvas, rect, color, intensity=3):
+        """グロー効果付き矩形を描画（層数は描画品質の上限まで、座標と大きさには canvas.scale を掛ける）"""
+        scale = canvas.scale
+        if scale != 1:
+            rect = scale_rect(rect, scale)
         x, y, w, h = rect
-        for i in range(intensity):
+        for i in range(min(intensity, quality['glow_layers'])):
             alpha = max(0, 50 - i * 15)
-            offset = i * 2
+            offset = int(i * 2 * scale)
             glow_rect = pygame.Rect(x - offset, y - offset, w + offset * 2, h + offset * 2)
-            glow_surf = pygame.Surface((glow_rect.width, glow_rect.height), pygame.SRCALPHA)
             glow_color = (*color[:3], alpha) if len(color) > 3 else color
-            pygame.draw.rect(glow_surf, glow_color, (0, 0, glow_rect.width, glow_rect.height))
-            try:
-                screen.blit(glow_surf, glow_rect.topleft, special_flags=pygame.BLEND_ALPHA_SDL2)
-            except:
-                screen.blit(glow_surf, glow_rect.topleft)
-        pygame.draw.rect(screen, color, rect)
+            canvas.glow_rect(glow_color, glow_rect)
+        canvas.rect(color, rect)
 
 # エネルギーパーティクルクラス（背景用）
 class EnergyParticle:
@@ -686,18 +1216,26 @@ class EnergyParticle:
         self.x = self.center_x + math.cos(self.angle) * self.radius
         self.y = self.center_y + math.sin(self.angle) * self.radius
         
-    def draw(self, screen):
+    def dot(self):
+        """描く点の (Surface, 左上)（消えていれば None）"""
         if self.lifetime > 0:
             alpha = int(255 * (self.lifetime / self.max_lifetime))
-            color_with_alpha = (*self.color[:3], alpha)
-            particle_surf = pygame.Surface((self.size * 2, self.size * 2), pygame.SRCALPHA)
-            pygame.draw.circle(particle_surf, color_with_alpha, (self.size, self.size), self.size)
-            screen.blit(particle_surf, (int(self.x - self.size), int(self.y - self.size)))
+            surface, offset = DotSprites.get(self.color, self.size, alpha, glow=True)
+            return surface, (int(self.x) - offset, int(self.y) - offset)
+        return None
 
 # タイトル画面背景クラス
 class TitleBackground:
+    GRADIENT_RADIUS = int(SCREEN_WIDTH * 0.8)
+    GRADIENT_MOTION = 50  # 中心点が動く幅
+    
     def __init__(self):
         self.time = 0
+        # 放射状グラデーションのテクスチャ（bake_gradient() で作る）
+        self.gradient_texture = None
+        self.gradient_weight = None
+        self._tinted_key = None
+        self._tinted_texture = None
         self.energy_particles: List[EnergyParticle] = []
         self.gradient_centers = [
             (SCREEN_WIDTH * 0.3, SCREEN_HEIGHT * 0.3),
@@ -763,46 +1301,101 @@ class TitleBackground:
         # 放射状グラデーションを描画（間隔を空けてパフォーマンス向上）
         step = 2  # 2ピクセルごとに描画（滑らかさとパフォーマンスのバランス）
         for i in range(0, radius, step):
-            ratio = i / radius
-            # 複数色のグラデーション（3色以上）
-            if ratio < 0.33:
-                # 最初の色から中間色へ
-                local_ratio = ratio / 0.33
-                r = int(animated_colors[0][0] * (1 - local_ratio) + animated_colors[1][0] * local_ratio)
-                g = int(animated_colors[0][1] * (1 - local_ratio) + animated_colors[1][1] * local_ratio)
-                b = int(animated_colors[0][2] * (1 - local_ratio) + animated_colors[1][2] * local_ratio)
-            elif ratio < 0.66:
-                # 中間色から最後の色へ
-                local_ratio = (ratio - 0.33) / 0.33
-                r = int(animated_colors[1][0] * (1 - local_ratio) + animated_colors[2][0] * local_ratio)
-                g = int(animated_colors[1][1] * (1 - local_ratio) + animated_colors[2][1] * local_ratio)
-                b = int(animated_colors[1][2] * (1 - local_ratio) + animated_colors[2][2] * local_ratio)
-            else:
-                # 最後の色から外側へ（暗く）
-                local_ratio = (ratio - 0.66) / 0.34
-                r = int(animated_colors[2][0] * (1 - local_ratio) + BG_DARK[0] * local_ratio)
-                g = int(animated_colors[2][1] * (1 - local_ratio) + BG_DARK[1] * local_ratio)
-                b = int(animated_colors[2][2] * (1 - local_ratio) + BG_DARK[2] * local_ratio)
-            
-            # ノイズを追加（テクスチャ感、ただし固定シードでちらつきを減らす）
-            # ノイズを位置ベースにして、毎フレーム同じ位置で同じノイズを生成
-            noise_seed = int(center_x + center_y + i) % 11 - 5
-            r = max(0, min(255, r + noise_seed))
-            g = max(0, min(255, g + noise_seed))
-            b = max(0, min(255, b + noise_seed))
-            
-            color = (r, g, b)
+            color = self._gradient_ring_color(animated_colors, i / radius, center_x + center_y + i)
             # 円を描画（間隔を空けてパフォーマンス向上、でも見た目は滑らか）
             pygame.draw.circle(screen, color, (int(center_x), int(center_y)), radius - i)
     
+    @staticmethod
+    def _gradient_ring_color(colors, ratio, noise_base):
+        """放射状グラデーションの ratio の位置（0 が外周、1 が中心）の色"""
+        # 複数色のグラデーション（3色以上）
+        if ratio < 0.33:
+            # 最初の色から中間色へ
+            local_ratio = ratio / 0.33
+            r = int(colors[0][0] * (1 - local_ratio) + colors[1][0] * local_ratio)
+            g = int(colors[0][1] * (1 - local_ratio) + colors[1][1] * local_ratio)
+            b = int(colors[0][2] * (1 - local_ratio) + colors[1][2] * local_ratio)
+        elif ratio < 0.66:
+            # 中間色から最後の色へ
+            local_ratio = (ratio - 0.33) / 0.33
+            r = int(colors[1][0] * (1 - local_ratio) + colors[2][0] * local_ratio)
+            g = int(colors[1][1] * (1 - local_ratio) + colors[2][1] * local_ratio)
+            b = int(colors[1][2] * (1 - local_ratio) + colors[2][2] * local_ratio)
+        else:
+            # 最後の色から外側へ（暗く）
+            local_ratio = (ratio - 0.66) / 0.34
+            r = int(colors[2][0] * (1 - local_ratio) + BG_DARK[0] * local_ratio)
+            g = int(colors[2][1] * (1 - local_ratio) + BG_DARK[1] * local_ratio)
+            b = int(colors[2][2] * (1 - local_ratio) + BG_DARK[2] * local_ratio)
+        
+        # ノイズを追加（テクスチャ感、ただし固定シードでちらつきを減らす）
+        # ノイズを位置ベースにして、毎フレーム同じ位置で同じノイズを生成
+        noise_seed = int(noise_base) % 11 - 5
+        r = max(0, min(255, r + noise_seed))
+        g = max(0, min(255, g + noise_seed))
+        b = max(0, min(255, b + noise_seed))
+        return (r, g, b)
+    
+    @staticmethod
+    def _gradient_ring_weight(ratio):
+        """色のアニメーションが ratio の位置の色にどれだけ効くか（中心付近は背景色と混ざるので弱い）"""
+        if ratio < 0.66:
+            return 1.0
+        return 1 - (ratio - 0.66) / 0.34
+    
+    def bake_gradient(self, rings_per_step=4):
+        """放射状グラデーションをテクスチャに描いておく（rings_per_step 本ごとに中断するジェネレーター）
+        
+        3つのグラデーションのうち、最後の1枚（画面中央）が画面全体を覆うので、それだけを作る。
+        色のアニメーションは、位置ごとの効き具合（gradient_weight）を使って後から加える。
+        """
+        index = len(self.gradient_centers) - 1
+        colors = self.gradient_colors[index % len(self.gradient_colors)]
+        base_x, base_y = self.gradient_centers[index]
+        margin = self.GRADIENT_MOTION
+        radius = self.GRADIENT_RADIUS
+        texture = pygame.Surface((SCREEN_WIDTH + margin * 2, SCREEN_HEIGHT + margin * 2))
+        weight = pygame.Surface(texture.get_size())
+        texture.fill(BG_DARK)
+        center = (int(base_x) + margin, int(base_y) + margin)
+        step = quality['gradient_step']
+        for n, i in enumerate(range(0, radius, step)):
+            ratio = i / radius
+            pygame.draw.circle(texture, self._gradient_ring_color(colors, ratio, base_x + base_y + i), center, radius - i)
+            level = int(255 * self._gradient_ring_weight(ratio))
+            pygame.draw.circle(weight, (level, level, level), center, radius - i)
+            if n % rings_per_step == rings_per_step - 1:
+                yield
+        self.gradient_texture = texture
+        self.gradient_weight = weight
+    
+    def _animated_gradient(self, time_offset):
+        """色のアニメーションを加えたテクスチャ（色が変わったときだけ作り直す）"""
+        t = self.time + time_offset
+        key = (int(math.sin(t * 0.003) * 15), int(math.sin(t * 0.004) * 15), int(math.sin(t * 0.0035) * 15))
+        if key != self._tinted_key:
+            texture = self.gradient_texture.copy()
+            tint = pygame.Surface(texture.get_size())
+            for color, flag in ((tuple(max(c, 0) for c in key), pygame.BLEND_RGB_ADD),
+                                (tuple(max(-c, 0) for c in key), pygame.BLEND_RGB_SUB)):
+                if any(color):
+                    tint.fill(color)
+                    tint.blit(self.gradient_weight, (0, 0), special_flags=pygame.BLEND_RGB_MULT)
+                    texture.blit(tint, (0, 0), special_flags=flag)
+            self._tinted_key = key
+            self._tinted_texture = texture
+        return self._tinted_texture
+    
     def draw_energy_wave(self, screen, center_x, center_y, time_offset=0):
-        """エネルギー波を描画（より滑らかに）"""
-        wave_count = 3
-        for i in range(wave_count):
+        """エネルギー波を描画（より滑らかに、数は描画品質に合わせる）"""
+        # 画面の角より外に広がった波は見えないので描かない（半径は増え続けるので、放っておくと Surface が巨大になる）
+        visible_radius = max(math.hypot(corner_x - center_x, corner_y - center_y)
+                             for corner_x in (0, SCREEN_WIDTH) for corner_y in (0, SCREEN_HEIGHT))
+        for i in range(quality['energy_waves']):
             # 波の速度を遅くして滑らかに
             wave_radius = 100 + (self.time + time_offset) * 1.5 + i * 50  # 2 → 1.5
             wave_alpha = int(100 * (1 - (wave_radius % 200) / 200))
-            if wave_alpha > 0:
+            if wave_alpha > 0 and wave_radius - 2 < visible_radius:
                 wave_surf = pygame.Surface((wave_radius * 2, wave_radius * 2), pygame.SRCALPHA)
                 wave_color = (96, 165, 250, wave_alpha)
                 pygame.draw.circle(wave_surf, wave_color, (wave_radius, wave_radius), wave_radius, 2)
@@ -810,23 +1403,26 @@ class TitleBackground:
     
     def draw(self, screen):
         """タイトル画面背景を描画"""
-        # ベース背景（暗い色）
-        screen.fill(BG_DARK)
-        
-        # 複数の中心点から放射状グラデーションを描画
-        for i, (center_x, center_y) in enumerate(self.gradient_centers):
-            # 中心点をアニメーション（移動、より滑らかに）
-            animated_x = center_x + math.sin(self.time * 0.005 + i) * 50  # 0.02 → 0.005
-            animated_y = center_y + math.cos(self.time * 0.005 + i) * 50  # 0.02 → 0.005
-            
-            # 放射状グラデーションを描画
-            colors = self.gradient_colors[i % len(self.gradient_colors)]
-            self.draw_radial_gradient(screen, animated_x, animated_y, colors, 
-                                     int(SCREEN_WIDTH * 0.8), time_offset=i * 100)
-        
-        # エネルギーパーティクルを描画
+        if self.gradient_texture is None:
+            # テクスチャができるまでは背景色だけ（毎フレーム円を描くと重すぎる）
+            screen.fill(BG_DARK)
+        else:
+            # 画面全体を覆う最後のグラデーションを、中心点のアニメーションに合わせてずらして貼る
+            i = len(self.gradient_centers) - 1
+            center_x, center_y = self.gradient_centers[i]
+            animated_x = center_x + math.sin(self.time * 0.005 + i) * self.GRADIENT_MOTION
+            animated_y = center_y + math.cos(self.time * 0.005 + i) * self.GRADIENT_MOTION
+            screen.blit(self._animated_gradient(time_offset=i * 100),
+                        (int(animated_x) - int(center_x) - self.GRADIENT_MOTION,
+                         int(animated_y) - int(center_y) - self.GRADIENT_MOTION))
+        
+        # エネルギーパーティクルを描画（まとめて1回で）
+        batch = []
         for particle in self.energy_particles:
-            particle.draw(screen)
+            dot = particle.dot()
+            if dot is not None:
+                batch.append(dot)
+        draw_sprites(screen, batch)
         
         # エネルギー波を描画（各中心点から）
         for i, (center_x, center_y) in enumerate(self.gradient_centers):
@@ -836,7 +1432,12 @@ class TitleBackground:
 
 # エフェクトクラス（演出用、改良版）
 class Effect:
+    __slots__ = ('text', 'x', 'y', 'duration', 'timer', 'active', 'color', 'scale_effect', 'rotation')
+    
     def __init__(self, text, x, y, duration=60, color=YELLOW, scale_effect=True):
+        self.reset(text, x, y, duration, color, scale_effect)
+        
+    def reset(self, text, x, y, duration=60, color=YELLOW, scale_effect=True):
         self.text = text
         self.x = x
         self.y = y
@@ -870,25 +1471,404 @@ class Effect:
             TextRenderer.draw_effect(screen, self.text, self.x, self.y, 
                                    size=size, color=self.color, center=False)
 
+# フレームの時間の内訳
+class FrameProfiler:
+    """1フレームの時間を処理ごとに計測する（F3 でオーバーレイ表示）
+    
+    lap(name) を呼ぶと、前回の lap() からの時間を name に加算する。無効なときは何もしない。
+    """
+    SECTIONS = ('イベント', '生成・更新', '衝突判定', 'アイテム効果', 'パーティクル', '風', 'グロー',
+                'テキスト', '描画その他', 'オーバーレイ', 'flip', '待機 (tick)')
+    HISTORY = 120  # グラフに出すフレーム数
+    SMOOTHING = 0.1  # 平均の更新率（指数移動平均）
+    TEXT_INTERVAL = 15  # 数値の表示を更新する間隔（フレーム）
+    GRAPH_SCALE = 3  # 1ms あたりのグラフの高さ（ピクセル）
+    
+    def __init__(self):
+        self.enabled = False
+        self.frame_times = deque(maxlen=self.HISTORY)  # ミリ秒
+        self.averages = dict.fromkeys(self.SECTIONS, 0.0)  # ミリ秒
+        self._current = dict.fromkeys(self.SECTIONS, 0.0)  # 秒
+        self._frame_start = None
+        self._last = 0.0
+        self._frame_count = 0
+        # オーバーレイ用（作るのは最初に表示したとき）
+        self._panel = None
+        self._graph = None
+        self._text = None
+        self._labels = {}  # 項目名の描画結果（変わらないので使い回す）
+        
+    def toggle(self):
+        self.enabled = not self.enabled
+        # フレームの途中で有効にしても、そこから先の lap() が正しい時間になるようにする
+        # （最初の start_frame() までの分は平均に入れずに捨てる）
+        self._frame_start = None
+        self._last = time.perf_counter()
+        for name in self.SECTIONS:
+            self._current[name] = 0.0
+        self.frame_times.clear()
+        if self._graph:
+            self._graph.fill((0, 0, 0, 0))
+        
+    def start_frame(self):
+        """フレームの開始（メインループの先頭で呼ぶ）"""
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        current = self._current
+        if self._frame_start is not None:
+            frame_ms = (now - self._frame_start) * 1000
+            self.frame_times.append(frame_ms)
+            averages = self.averages
+            for name in self.SECTIONS:
+                averages[name] += (current[name] * 1000 - averages[name]) * self.SMOOTHING
+                current[name] = 0.0
+            self._push_graph(frame_ms)
+        else:
+            for name in self.SECTIONS:
+                current[name] = 0.0
+        self._frame_count += 1
+        self._frame_start = self._last = now
+        
+    def lap(self, name):
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        self._current[name] += now - self._last
+        self._last = now
+        
+    def _push_graph(self, frame_ms):
+        """グラフを1列ずらして、最新のフレーム時間を右端に描く"""
+        if self._graph is None:
+            return
+        graph = self._graph
+        width, height = graph.get_size()
+        graph.scroll(-2, 0)
+        graph.fill((0, 0, 0, 0), (width - 2, 0, 2, height))
+        bar = min(height, int(frame_ms * self.GRAPH_SCALE))
+        if frame_ms <= 1000 / FPS + 0.5:
+            color = GREEN
+        elif frame_ms <= 2000 / FPS:
+            color = YELLOW
+        else:
+            color = RED
+        graph.fill(color, (width - 2, height - bar, 2, bar))
+        # 16.7ms と 33.3ms の目安の線
+        for target in (1000 / FPS, 2000 / FPS):
+            graph.fill(GRAY, (width - 2, height - int(target * self.GRAPH_SCALE), 2, 1))
+            
+    def draw(self, screen, counts):
+        """オーバーレイを描画（数値の描画は TEXT_INTERVAL フレームごと）
+        
+        counts は (名前, 数) のリスト（表示するオブジェクトの数）
+        """
+        if self._graph is None:
+            self._graph = pygame.Surface((self.HISTORY * 2, int(2000 / FPS * self.GRAPH_SCALE) + 20), pygame.SRCALPHA)
+        if self._text is None or self._frame_count % self.TEXT_INTERVAL == 0:
+            self._text = self._render_text(counts)
+        graph_height = self._graph.get_height()
+        panel_size = (max(self._graph.get_width(), self._text.get_width()) + 20,
+                      graph_height + self._text.get_height() + 30)
+        if self._panel is None or self._panel.get_size() != panel_size:
+            self._panel = pygame.Surface(panel_size, pygame.SRCALPHA)
+            self._panel.fill((0, 0, 0, 170))
+        x, y = screen.get_width() - panel_size[0] - 10, 10
+        screen.blit(self._panel, (x, y))
+        screen.blit(self._graph, (x + 10, y + 10))
+        screen.blit(self._text, (x + 10, y + 20 + graph_height))
+        
+    def _render_text(self, counts):
+        frame_times = self.frame_times
+        if frame_times:
+            mean = sum(frame_times) / len(frame_times)
+            rows = [("フレーム", f"平均 {mean:.1f} ms / 最大 {max(frame_times):.1f} ms"),
+                    ("FPS", f"{1000 / mean:.0f}")]
+        else:
+            rows = [("フレーム", "-")]
+        rows += [(name, f"{self.averages[name]:6.2f} ms") for name in self.SECTIONS]
+        rows += [(name, str(count)) for name, count in counts]
+        
+        font = get_japanese_font(16)
+        line_height = font.get_linesize()
+        value_x = 110
+        text = pygame.Surface((value_x + 170, line_height * len(rows)), pygame.SRCALPHA)
+        for i, (name, value) in enumerate(rows):
+            label = self._labels.get(name)
+            if label is None:
+                label = self._labels[name] = font.render(name, True, TEXT_GRAY)
+            text.blit(label, (0, i * line_height))
+            text.blit(font.render(value, True, TEXT_LIGHT), (value_x, i * line_height))
+        return text
+
+def _no_lap(name):
+    """FrameProfiler.lap() の代わり（プロファイラーを使わないスレッド用）"""
+
+# 描画品質の自動調整
+class QualityGovernor:
+    """処理時間（tick の待ち時間を除く）の移動平均を見て、描画品質の段階（QUALITY_TIERS）を上げ下げする
+    
+    重いときはすぐに下げ、余裕があるときはしばらく様子を見てから上げる。
+    上げた直後にまた下げることになった場合は、次に上げるまでの待ち時間を倍にする（行ったり来たりしないように）。
+    """
+    WINDOW = 30  # 移動平均のフレーム数
+    DOWNGRADE_RATIO = 0.9  # 処理時間が1フレームの予算のこの割合を超えたら下げる
+    UPGRADE_RATIO = 0.5  # この割合を下回る状態が続いたら上げる
+    UPGRADE_HOLD = 300  # 上げるまでに待つフレーム数
+    MAX_UPGRADE_HOLD = 3600
+    
+    def __init__(self, pinned=None):
+        self.tier = 0
+        self.pinned = None
+        self.samples = deque(maxlen=self.WINDOW)
+        self.upgrade_hold = self.UPGRADE_HOLD
+        self._good_frames = 0
+        self._frames_since_upgrade = None
+        self.pin(pinned)
+        
+    def pin(self, tier):
+        """段階を固定する（None で自動に戻す）"""
+        self.pinned = tier
+        self.set_tier(tier if tier is not None else self.tier)
+        
+    def set_tier(self, tier):
+        self.tier = max(0, min(len(QUALITY_TIERS) - 1, tier))
+        quality.update(QUALITY_TIERS[self.tier])
+        self.samples.clear()
+        self._good_frames = 0
+        
+    def observe(self, busy_ms):
+        """1フレームの処理時間を渡す"""
+        if self.pinned is not None:
+            return
+        samples = self.samples
+        samples.append(busy_ms)
+        if self._frames_since_upgrade is not None:
+            self._frames_since_upgrade += 1
+        if len(samples) < self.WINDOW:
+            return
+        average = sum(samples) / len(samples)
+        budget = 1000 / FPS
+        if average > budget * self.DOWNGRADE_RATIO:
+            if self.tier < len(QUALITY_TIERS) - 1:
+                if self._frames_since_upgrade is not None and self._frames_since_upgrade < self.upgrade_hold:
+                    self.upgrade_hold = min(self.upgrade_hold * 2, self.MAX_UPGRADE_HOLD)
+                self._frames_since_upgrade = None
+                self.set_tier(self.tier + 1)
+        elif average < budget * self.UPGRADE_RATIO and self.tier > 0:
+            self._good_frames += 1
+            if self._good_frames >= self.upgrade_hold:
+                self._frames_since_upgrade = 0
+                self.set_tier(self.tier - 1)
+        else:
+            self._good_frames = 0
+            
+    def label(self):
+        return f"{quality['name']}（{'固定' if self.pinned is not None else '自動'}）"
+
+# 素材の事前作成
+class AssetBaker:
+    """素材を少しずつ作る（1フレームあたり budget 秒まで使い、入力や描画を止めない）
+    
+    jobs は (名前, 関数) のリスト。関数がジェネレーターを返す場合は yield ごとに中断できる。
+    """
+    def __init__(self, jobs):
+        self.jobs = list(jobs)
+        self.done = 0  # 終わったジョブの数
+        self.frames = 0  # step() を呼んだ回数
+        self._current = None
+        
+    @property
+    def finished(self):
+        return self.done >= len(self.jobs)
+    
+    @property
+    def progress(self):
+        return self.done / len(self.jobs) if self.jobs else 1.0
+    
+    def step(self, budget):
+        """budget 秒を超えるまでジョブを進める"""
+        deadline = time.perf_counter() + budget
+        self.frames += 1
+        while not self.finished:
+            if self._current is None:
+                _, job = self.jobs[self.done]
+                result = job()
+                if inspect.isgenerator(result):
+                    self._current = result
+                else:
+                    self.done += 1
+            else:
+                try:
+                    next(self._current)
+                except StopIteration:
+                    self._current = None
+                    self.done += 1
+            if time.perf_counter() >= deadline:
+                break
+    
+    def finish(self):
+        """残りのジョブをすべて終わらせる"""
+        while not self.finished:
+            self.step(1.0)
+
+# ウインドウへの表示
+class Viewport:
+    """論理解像度（SCREEN_WIDTH×SCREEN_HEIGHT）の画面を、縦横比を保ってウインドウに拡大縮小して表示する
+    
+    余白は黒。ウインドウが論理解像度と同じ大きさなら、画面を直接ウインドウに描くので何もしない。
+    マウスの座標は to_logical() で論理座標に戻す（ボタンの当たり判定はすべて論理座標）。
+    display が None（SDL2 の Renderer を使う場合）は拡大縮小を Renderer が行うので、座標の変換だけに使う。
+    """
+    def __init__(self, display, window_size=None):
+        self.resize(display, window_size)
+        
+    def resize(self, display, window_size=None):
+        self.display = display
+        window_width, window_height = window_size or display.get_size()
+        self.identity = (window_width, window_height) == (SCREEN_WIDTH, SCREEN_HEIGHT)
+        self.scale = min(window_width / SCREEN_WIDTH, window_height / SCREEN_HEIGHT)
+        width = max(1, round(SCREEN_WIDTH * self.scale))
+        height = max(1, round(SCREEN_HEIGHT * self.scale))
+        self.rect = pygame.Rect((window_width - width) // 2, (window_height - height) // 2, width, height)
+        self._target = None
+        if not self.identity and display is not None:
+            display.fill(BLACK)
+            # 拡大縮小の結果をウインドウの該当部分に直接書き込む
+            self._target = display.subsurface(self.rect)
+            
+    def present(self, screen):
+        """画面をウインドウに表示する（flip の前に呼ぶ）"""
+        if self._target is not None:
+            pygame.transform.scale(screen, self.rect.size, self._target)
+            
+    def to_logical(self, pos):
+        """ウインドウ上の座標を論理座標に変換"""
+        if self.identity:
+            return pos
+        x, y = pos
+        return (int((x - self.rect.x) / self.scale), int((y - self.rect.y) / self.scale))
+
+class FrameSnapshot:
+    """描画用に写し取った1フレーム分のゲームの状態（パイプライン描画で描画スレッドに渡す）
+    
+    draw_playing_screen() に Game の代わりに渡せるよう、描画が読む属性を Game と同じ名前で持つ。
+    中のオブジェクトはシミュレーションと共有しないコピーで、capture() のたびに上書きして使い回す。
+    """
+    def __init__(self):
+        self.tick = -1
+        self.player = Player()
+        self.obstacles: List[Obstacle] = []
+        self.items: List[Item] = []
+        self.effects: List[Effect] = []
+        self.particle_system = ParticleSystem()
+        self.wind_effect = WindEffect()
+        self.screen_shake = ScreenShake()
+        self.flash_alpha = 0
+        self.score = 0
+        self.game_started = False
+        self.game_over_effect_timer = 0
+        
+    def capture(self, game):
+        copy_slots(game.player, self.player)
+        copy_list(game.obstacles, self.obstacles)
+        copy_list(game.items, self.items)
+        copy_list(game.effects, self.effects)
+        copy_list(game.particle_system.particles, self.particle_system.particles)
+        copy_list(game.wind_effect.particles, self.wind_effect.particles)
+        self.screen_shake.offset_x = game.screen_shake.offset_x
+        self.screen_shake.offset_y = game.screen_shake.offset_y
+        self.flash_alpha = game.flash_alpha
+        self.score = game.score
+        self.game_started = game.game_started
+        self.game_over_effect_timer = game.game_over_effect_timer
+
 # ゲームクラス
 class Game:
-    def __init__(self):
-        self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
-        pygame.display.set_caption("yokero")
-        self.clock = pygame.time.Clock()
+    def __init__(self, tunables=None, headless=False, leaderboard=None, score_manager=None, telemetry=None,
+                 alloc_tracker=None, window_size=None, fullscreen=False, render_scale=RENDER_SCALE,
+                 renderer=RENDERER, pacing=PACING, pipelined=PIPELINED):
+        # headless=True の場合は画面を作らず、シミュレーションだけを行う（バランス調整・ボット用）
+        # score_manager を渡すとスコアの保存先を差し替えられる（ベンチマークなど、ファイルに書きたくない場合）
+        # telemetry（TelemetryRecorder）を渡すとフレームごとの記録をファイルに書き出す
+        # alloc_tracker（alloc_debug.AllocationTracker）を渡すとフレームごとのメモリ確保と GC を集計する
+        # window_size・fullscreen はウインドウの大きさ（描画は常に SCREEN_WIDTH×SCREEN_HEIGHT で行い、拡大縮小して表示する）
+        # render_scale はゲーム画面を描く解像度の倍率（RENDER_SCALE を参照）
+        # renderer は描画先（RENDERER を参照）
+        # pacing はフレームの時刻の待ち方（PACING を参照）
+        # pipelined はプレイ中の画面を別のスレッドで描くか（PIPELINED を参照）
+        self.headless = headless
+        self.render_scale = render_scale
+        self.renderer_name = renderer
+        self.display = None
+        self.window = None  # SDL2 の Renderer を使う場合のウインドウ
+        self.viewport: Optional[Viewport] = None
+        self.screen = None  # タイトル・リザルト画面などを描く Surface（論理解像度）
+        self.canvas: Optional[Canvas] = None  # ゲーム画面を描く先
+        if not headless:
+            init_pygame()
+            startup_trace.mark("pygame 初期化")
+            if renderer == 'sdl2':
+                self.window, sdl_renderer, _ = create_renderer(
+                    "yokero", window_size or (SCREEN_WIDTH, SCREEN_HEIGHT), fullscreen)
+                self.canvas = TextureCanvas(sdl_renderer, (SCREEN_WIDTH, SCREEN_HEIGHT))
+                self.screen = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
+            else:
+                if fullscreen:
+                    pygame.display.set_mode((0, 0), pygame.FULLSCREEN)
+                else:
+                    pygame.display.set_mode(window_size or (SCREEN_WIDTH, SCREEN_HEIGHT), pygame.RESIZABLE)
+                pygame.display.set_caption("yokero")
+            self.on_window_resized()
+            startup_trace.mark("ウインドウ作成")
+        self.pacer = FramePacer(FPS, pacing)
+        self.pacing_report = False  # True なら終了時にフレームの時刻のずれの集計を表示する（--pacing-report）
+        self.pipeline = None
+        if pipelined and not headless:
+            if self.window is not None:
+                raise ValueError("パイプライン描画は renderer='software' のときだけ使えます")
+            self.pipeline = RenderPipeline(self.draw_playing_screen, FrameSnapshot)
         self.state = GameState.START
         self.player = Player()
         self.obstacles: List[Obstacle] = []
         self.items: List[Item] = []
         self.effects: List[Effect] = []
-        self.score_manager = ScoreManager()
+        # 生成・破棄が多いオブジェクトはプールから取り出して再利用する
+        self.obstacle_pool = ObjectPool(Obstacle)
+        self.item_pool = ObjectPool(Item)
+        self.effect_pool = ObjectPool(Effect)
+        if score_manager is not None:
+            self.score_manager = score_manager
+        elif headless:
+            self.score_manager = ScoreManager(None, None)
+        else:
+            self.score_manager = ScoreManager(leaderboard=leaderboard)
+        if not headless:
+            startup_trace.mark("スコア読み込み")
+        
+        # チューニング値とゲーム進行用の乱数（演出用の乱数とは分ける）
+        self.tunables = dict(DEFAULT_TUNABLES, **(tunables or {}))
+        self.rng = random.Random()
+        self.seed = 0
+        self.replay_writer: Optional[ReplayWriter] = None
+        self.record_replays = not headless
+        self.invincible = False  # 早送り中は衝突判定を無効にする
+        self.rewind_buffer = StateRing(REWIND_CAPACITY)
+        # 途中の状態に戻したプレイ（巻き戻し・状態の読み込み・早送り）。スコアを履歴・ランキングに残さない
+        self.unranked = False
         
         # パーティクルシステムと画面エフェクト
         self.particle_system = ParticleSystem()
         self.screen_shake = ScreenShake()
+        self.wind_effect = WindEffect()
         self.flash_alpha = 0  # フラッシュエフェクト用
         self.game_over_effect_timer = 0  # ゲームオーバー演出のタイマー
         
+        # フレームの時間の内訳（F3 で表示）とフレームごとの記録
+        self.profiler = FrameProfiler()
+        self.quality_governor = QualityGovernor(pinned=QUALITY_TIER)
+        self.telemetry: Optional[TelemetryRecorder] = telemetry
+        self.alloc_tracker = alloc_tracker
+        
         # キー状態を保持
         self.keys = {
             pygame.K_UP: False,
@@ -896,6 +1876,7 @@ class Game:
         }
         
         self.score = 0
+        self.items_collected = 0
         self.game_started = False
         self.game_time = 0
         self.last_obstacle_spawn = 0
@@ -903,15 +1884,15 @@ class Game:
         self.last_speed_up = 0
         self.last_obstacle_count_increase = 0  # 最後に障害物の数を増やした時間
         self.obstacle_increase_counter = 0  # 追加処理の回数カウント
-        self.obstacle_spawn_interval = 120  # フレーム
-        self.item_spawn_interval = 300  # フレーム
-        self.base_obstacle_speed = 3
+        self.obstacle_spawn_interval = self.tunables['obstacle_spawn_interval']  # フレーム
+        self.item_spawn_interval = self.tunables['item_spawn_interval']  # フレーム
+        self.base_obstacle_speed = self.tunables['base_obstacle_speed']
         self.obstacle_speed = self.base_obstacle_speed
         self.obstacle_count = 0
         self.obstacle_spawn_count = 1  # 一度に生成する障害物の数
         
         # アイテム効果（10秒 = 60FPS * 10 = 600フレーム）
-        item_effect_duration = 600  # 10秒
+        item_effect_duration = self.tunables['item_effect_duration']
         self.item_effects = {
             'speed': {'active': False, 'timer': 0, 'duration': item_effect_duration},
             'shrink': {'active': False, 'timer': 0, 'duration': item_effect_duration},
@@ -922,68 +1903,205 @@ class Game:
         # スコアタイマー
         self.score_timer = 0
         
-        # 背景Surfaceをキャッシュ（パフォーマンス向上）
+        # 背景Surfaceなどの素材は、最初のフレームを表示してから少しずつ作る（AssetBaker）
         self.bg_surface = None
-        self._create_bg_surface()
+        self._scaled_bg = None  # (倍率, 描画倍率に合わせて縮小した背景)
+        self.button_skins = {}
+        self.window_overlay = None
+        self.window_frame = None
         
         # タイトル画面専用の背景
-        self.title_background = TitleBackground()
+        self.title_background = None if headless else TitleBackground()
+        self.asset_baker = None if headless else AssetBaker(self._asset_jobs())
         
         # タイトル画面のウインドウ表示状態
         self.show_window = None  # None, 'scores', 'instructions'
+        
+        # 画面ごとのボタン（位置は固定、ホバー・押下の状態を持つ）
+        self._build_ui()
+        self._pointer_ui = None  # マウスの状態を反映している部品の木
+        # 背景が動かない画面（一時停止・リザルト）の、ボタンを描く前の画面（ボタンだけを描き直すのに使う）
+        self.static_background = None
+        self.static_state = None
+        
+        self.reseed()
+    
+    def reseed(self, seed=None):
+        """ゲーム進行用の乱数を初期化（リプレイ再現用にシードを保持）"""
+        if seed is None:
+            seed = random.getrandbits(63)
+        self.seed = seed
+        self.rng.seed(seed)
     
+    def start_replay_recording(self):
+        """リプレイの記録を開始"""
+        self.stop_replay_recording()
+        if not self.record_replays:
+            return
+        # 速度上昇で base_obstacle_speed が変わるので、実際の開始値を記録する
+        tunables = dict(self.tunables, base_obstacle_speed=self.base_obstacle_speed)
+        filename = time.strftime('%Y%m%d-%H%M%S') + f"-{self.seed:016x}" + REPLAY_EXTENSION
+        try:
+            os.makedirs(REPLAY_DIR, exist_ok=True)
+            self.replay_writer = ReplayWriter(os.path.join(REPLAY_DIR, filename), self.seed, tunables)
+        except OSError:
+            # 記録できなくてもゲームは続行
+            self.replay_writer = None
+    
+    def stop_replay_recording(self):
+        """リプレイの記録を終了"""
+        if self.replay_writer:
+            try:
+                self.replay_writer.close()
+            except OSError:
+                pass
+            self.replay_writer = None
+    
+    def _asset_jobs(self):
+        """起動後に作る素材（最初のフレームの表示を遅らせないよう、少しずつ作る）"""
+        return [
+            ("フォント", self._bake_fonts),
+            ("ゲーム背景", self._create_bg_surface),
+            ("タイトル背景", self.title_background.bake_gradient),
+            ("アイテム", Item.bake_atlas),
+            ("テキスト", self._bake_text_sprites),
+            ("演出の文字", self._bake_effect_frames),
+            ("ボタン", self._bake_button_skins),
+            ("ウインドウ", self._bake_window),
+        ]
+        
+    def _bake_fonts(self):
+        for size, bold in ((20, False), (28, False), (32, False), (42, False), (44, False), (72, False),
+                           (48, True), (52, True), (80, True)):
+            get_japanese_font(size, bold)
+            yield
+            
+    def _bake_text_sprites(self):
+        TextRenderer.get_sprite('title', "yokero", 80, TEXT_LIGHT)
+        for title in ("スコアランキング", "説明", "一時停止"):
+            TextRenderer.get_sprite('title', title, 48, TEXT_LIGHT)
+            yield
+        for line in INSTRUCTIONS_TEXT:
+            if line:
+                TextRenderer.get_sprite('normal', line, 28, TEXT_LIGHT)
+                yield
+                
+    def _bake_effect_frames(self):
+        # Effect の大きさは 60〜80（Effect.draw を参照）
+        texts = [("Go!!!", YELLOW), ("Speed UP!!!", YELLOW), ("NEW HIGH SCORE!!!", YELLOW)]
+        texts += [("+100", color) for color in Item.COLORS.values()]
+        for text, color in texts:
+            for size in range(60, 81, TextRenderer.EFFECT_SIZE_STEP):
+                TextRenderer.get_effect_frame(text, size, color)
+                yield
+        TextRenderer.get_effect_frame("スペースキーでスタート", 52, YELLOW)
+                
+    def _bake_button_skins(self):
+        layouts = [
+            (300, 50, 32, ("ゲームスタート", "スコア", "説明", "終了", "もう一度遊ぶ", "タイトルに戻る", "ゲーム終了")),
+            (300, 45, 32, ("再開", "ゲーム終了")),
+            (200, 45, 28, ("閉じる",)),
+        ]
+        for width, height, font_size, texts in layouts:
+            font = get_japanese_font(font_size)
+            for text in texts:
+                for hover, clicked in ((False, False), (True, False), (True, True)):
+                    self._button_skin(width, height, text, font, hover, clicked)
+                    yield
+                    
+    def _bake_window(self):
+        self.window_overlay = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.SRCALPHA)
+        self.window_overlay.fill((0, 0, 0, 180))
+        m = self.WINDOW_FRAME_MARGIN
+        frame = pygame.Surface((self.WINDOW_WIDTH + m * 2, self.WINDOW_HEIGHT + m * 2), pygame.SRCALPHA)
+        yield
+        yield from self._draw_window_frame(frame, self.WINDOW_WIDTH, self.WINDOW_HEIGHT, self.WINDOW_RADIUS)
+        self.window_frame = frame
+        
+    def on_window_resized(self):
+        """ウインドウの大きさが変わったとき（作成時も）に表示先を作り直す"""
+        if self.window is not None:
+            # 拡大縮小は Renderer が行うので、マウスの座標の変換だけ更新する
+            if self.viewport is None:
+                self.viewport = Viewport(None, self.window.size)
+            else:
+                self.viewport.resize(None, self.window.size)
+            return
+        self.display = pygame.display.get_surface()
+        if self.viewport is None:
+            self.viewport = Viewport(self.display)
+        else:
+            self.viewport.resize(self.display)
+        if self.viewport.identity:
+            self.screen = self.display
+        elif self.screen is None or self.screen is self.display:
+            self.screen = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
+        if self.canvas is None or self.canvas.surface is not self.screen:
+            self.canvas = SurfaceCanvas(self.screen)
+        self.invalidate_static_screen()
+            
+    def mouse_pos(self):
+        """マウスの位置（論理座標）"""
+        return self.viewport.to_logical(pygame.mouse.get_pos())
+        
+    def present(self, dirty=None):
+        """描いた画面をウインドウに表示する（dirty は描き直した範囲のリスト、None なら画面全体）"""
+        if self.window is not None:
+            self.canvas.present()
+        elif dirty is None or (dirty and not self.viewport.identity):
+            self.viewport.present(self.screen)
+            pygame.display.flip()
+        elif dirty:
+            pygame.display.update(dirty)
+        
+    def _background_for_scale(self, scale, size):
+        """描画倍率に合わせた背景（縮小するのは倍率が変わったときだけ）"""
+        if scale == 1:
+            return self.bg_surface
+        if self._scaled_bg is None or self._scaled_bg[0] != scale:
+            self._scaled_bg = (scale, pygame.transform.smoothscale(self.bg_surface, size))
+        return self._scaled_bg[1]
+        
     def _create_bg_surface(self):
         """背景Surfaceを作成（一度だけ）"""
-        self.bg_surface = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
+        # 縦方向だけのグラデーションなので、幅1ピクセルで描いてから横に引き伸ばす
+        column = pygame.Surface((1, SCREEN_HEIGHT))
         for i in range(SCREEN_HEIGHT):
             ratio = i / SCREEN_HEIGHT
             r = int(BG_DARK[0] * (1 - ratio) + BG_DARKEST[0] * ratio)
             g = int(BG_DARK[1] * (1 - ratio) + BG_DARKEST[1] * ratio)
             b = int(BG_DARK[2] * (1 - ratio) + BG_DARKEST[2] * ratio)
-            pygame.draw.line(self.bg_surface, (r, g, b), (0, i), (SCREEN_WIDTH, i))
+            column.set_at((0, i), (r, g, b))
+        self.bg_surface = pygame.transform.scale(column, (SCREEN_WIDTH, SCREEN_HEIGHT))
         
     def handle_start_screen(self, event):
         # ウインドウが開いている場合の処理
         if self.show_window:
             if event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE:
                 self.show_window = None
-                return True
             elif event.type == pygame.MOUSEBUTTONDOWN:
-                mouse_x, mouse_y = pygame.mouse.get_pos()
-                window_width = int(600)
-                window_height = int(600)
-                window_x = (SCREEN_WIDTH - window_width) // 2
-                window_y = (SCREEN_HEIGHT - window_height) // 2
-                close_button_rect = pygame.Rect(SCREEN_WIDTH // 2 - 100, window_y + window_height - 70, 200, 45)
-                # 閉じるボタンをクリックした場合
-                if close_button_rect.collidepoint(mouse_x, mouse_y):
-                    self.show_window = None
-                    return True
-                # ウインドウ外をクリックしたら閉じる
-                elif not (window_x <= mouse_x <= window_x + window_width and window_y <= mouse_y <= window_y + window_height):
+                # 閉じるボタンかウインドウの外をクリックしたら閉じる
+                if self.window_ui.click(self.mouse_pos()) == 'close':
                     self.show_window = None
-                    return True
             return True
         
         # 通常のボタン処理
         if event.type == pygame.MOUSEBUTTONDOWN:
-            mouse_x, mouse_y = pygame.mouse.get_pos()
+            action = self.ui[GameState.START].click(self.mouse_pos())
             
-            # ゲームスタートボタン
-            if 450 <= mouse_x <= 750 and 280 <= mouse_y <= 330:
+            if action == 'start':
                 self.state = GameState.PLAYING
                 self.reset_game()
                 
-            # スコアボタン
-            elif 450 <= mouse_x <= 750 and 360 <= mouse_y <= 410:
+            elif action == 'scores':
                 self.show_window = 'scores'
+                if self.score_manager.leaderboard:
+                    self.score_manager.leaderboard.request_refresh()
                 
-            # 説明ボタン
-            elif 450 <= mouse_x <= 750 and 440 <= mouse_y <= 490:
+            elif action == 'instructions':
                 self.show_window = 'instructions'
                 
-            # 終了ボタン
-            elif 450 <= mouse_x <= 750 and 520 <= mouse_y <= 570:
+            elif action == 'quit':
                 return False
                 
         return True
@@ -991,12 +2109,14 @@ class Game:
     def handle_playing_screen(self, event):
         if event.type == pygame.KEYDOWN:
             if event.key == pygame.K_SPACE and not self.game_started:
-                self.game_started = True
-                self.effects.append(Effect("Go!!!", SCREEN_WIDTH // 2 - 100, SCREEN_HEIGHT // 2, 90, color=YELLOW))
-                # 開始時のパーティクルエフェクト
-                self.particle_system.add_explosion(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2, YELLOW, count=50, speed=10)
+                self.start_play()
             elif event.key == pygame.K_ESCAPE and self.game_started:
                 self.state = GameState.PAUSED
+            elif event.key == pygame.K_BACKSPACE and (self.game_started or self.game_over_effect_timer > 0):
+                # ゲームオーバー演出中（リザルト画面の前）でも戻れる
+                self.rewind()
+            elif event.key == pygame.K_F5 and self.game_started:
+                self.save_state_file()
             # キー状態を更新
             if event.key in self.keys:
                 self.keys[event.key] = True
@@ -1011,19 +2131,19 @@ class Game:
             elif event.key == pygame.K_RETURN:
                 self.state = GameState.START
                 self.reset_game()
+            elif event.key == pygame.K_BACKSPACE:
+                self.rewind()
+            elif event.key == pygame.K_F5:
+                self.save_state_file()
         elif event.type == pygame.MOUSEBUTTONDOWN:
-            mouse_x, mouse_y = pygame.mouse.get_pos()
-            
-            box_width, box_height = 400, 250
-            box_x = (SCREEN_WIDTH - box_width) // 2
-            box_y = (SCREEN_HEIGHT - box_height) // 2
+            action = self.ui[GameState.PAUSED].click(self.mouse_pos())
             
             # 再開ボタン
-            if box_x + 50 <= mouse_x <= box_x + box_width - 50 and box_y + 120 <= mouse_y <= box_y + 165:
+            if action == 'resume':
                 self.state = GameState.PLAYING
                 
             # ゲーム終了ボタン
-            elif box_x + 50 <= mouse_x <= box_x + box_width - 50 and box_y + 180 <= mouse_y <= box_y + 225:
+            elif action == 'title':
                 self.state = GameState.START
                 self.reset_game()
                 
@@ -1036,35 +2156,49 @@ class Game:
                 self.state = GameState.START
                 self.reset_game()
         elif event.type == pygame.MOUSEBUTTONDOWN:
-            mouse_x, mouse_y = pygame.mouse.get_pos()
+            action = self.ui[GameState.RESULT].click(self.mouse_pos())
             
             # もう一度遊ぶ
-            if 450 <= mouse_x <= 750 and 380 <= mouse_y <= 430:
+            if action == 'retry':
                 self.state = GameState.PLAYING
                 self.reset_game()
                 
             # タイトルに戻る
-            elif 450 <= mouse_x <= 750 and 450 <= mouse_y <= 500:
+            elif action == 'title':
                 self.state = GameState.START
                 self.reset_game()
                 
             # ゲーム終了
-            elif 450 <= mouse_x <= 750 and 520 <= mouse_y <= 570:
+            elif action == 'quit':
                 return False
                 
         return True
         
+    def start_play(self):
+        """スペースキーでのゲーム開始"""
+        self.game_started = True
+        self.start_replay_recording()
+        self.effects.append(self.effect_pool.acquire("Go!!!", SCREEN_WIDTH // 2 - 100, SCREEN_HEIGHT // 2, 90, color=YELLOW))
+        # 開始時のパーティクルエフェクト
+        self.particle_system.add_explosion(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2, YELLOW, count=50, speed=10)
+        
     def reset_game(self):
-        self.player = Player()
-        self.obstacles = []
-        self.items = []
-        self.effects = []
-        self.particle_system = ParticleSystem()
-        self.screen_shake = ScreenShake()
-        self.wind_effect = WindEffect()
+        self.stop_replay_recording()
+        self.rewind_buffer.clear()
+        self.unranked = False
+        self.reseed()
+        # 作り直さずに初期状態へ戻して再利用する
+        self.player.reset()
+        self.obstacle_pool.release_all(self.obstacles)
+        self.item_pool.release_all(self.items)
+        self.effect_pool.release_all(self.effects)
+        self.particle_system.clear()
+        self.screen_shake.reset()
+        self.wind_effect.reset()
         self.flash_alpha = 0
         self.game_over_effect_timer = 0
         self.score = 0
+        self.items_collected = 0
         self.game_started = False
         self.game_time = 0
         self.last_obstacle_spawn = 0
@@ -1072,8 +2206,8 @@ class Game:
         self.last_speed_up = 0
         self.last_obstacle_count_increase = 0
         self.obstacle_increase_counter = 0
-        self.obstacle_spawn_interval = 120
-        self.item_spawn_interval = 300
+        self.obstacle_spawn_interval = self.tunables['obstacle_spawn_interval']
+        self.item_spawn_interval = self.tunables['item_spawn_interval']
         self.obstacle_speed = self.base_obstacle_speed
         self.obstacle_count = 0
         self.obstacle_spawn_count = 1
@@ -1084,6 +2218,106 @@ class Game:
             self.item_effects[effect]['active'] = False
             self.item_effects[effect]['timer'] = 0
             
+    # ゲームの進行に関わる値（capture_state() で保存する。プレイヤー・障害物・アイテム・アイテム効果・乱数は別に保存する）
+    STATE_COUNTERS = ('score', 'items_collected', 'game_started', 'game_time', 'score_timer',
+                      'game_over_effect_timer', 'last_obstacle_spawn', 'last_item_spawn', 'last_speed_up',
+                      'last_obstacle_count_increase', 'obstacle_increase_counter', 'obstacle_spawn_interval',
+                      'item_spawn_interval', 'base_obstacle_speed', 'obstacle_speed', 'obstacle_count',
+                      'obstacle_spawn_count')
+    
+    def capture_state(self):
+        """ゲームの進行の状態（savestate.py の形式）。演出（パーティクル・風・エフェクトなど）は含めない"""
+        player = self.player
+        return {
+            'seed': self.seed,
+            'rng': self.rng.getstate(),
+            'tunables': dict(self.tunables),
+            'counters': {name: getattr(self, name) for name in self.STATE_COUNTERS},
+            'player': (player.x, player.y, player.width, player.height, player.speed),
+            'obstacles': [(o.x, o.y, o.width, o.height, o.base_width, o.base_height, o.speed, o.base_speed)
+                          for o in self.obstacles],
+            'items': [(item.x, item.y, item.type, item.speed, item.collected) for item in self.items],
+            'item_effects': {name: (effect['active'], effect['timer']) for name, effect in self.item_effects.items()},
+        }
+        
+    def restore_state(self, state):
+        """capture_state() の状態に戻す（演出は消す。途中からはリプレイで再現できないので記録も止める）
+
+        やり直したプレイのスコアは、履歴・ランキングに残さない（unranked）。
+        """
+        self.stop_replay_recording()
+        self.unranked = True
+        self.seed = state['seed']
+        version, internal, gauss_next = state['rng']
+        self.rng.setstate((version, tuple(internal), gauss_next))
+        self.tunables = dict(DEFAULT_TUNABLES, **state['tunables'])
+        for name, value in state['counters'].items():
+            setattr(self, name, value)
+        
+        player = self.player
+        player.reset_effects()
+        player.x, player.y, player.width, player.height, player.speed = state['player']
+        player.rect.update(int(player.x), int(player.y), player.width, player.height)
+        self.obstacle_pool.release_all(self.obstacles)
+        for x, y, width, height, base_width, base_height, speed, base_speed in state['obstacles']:
+            obstacle = self.obstacle_pool.acquire(x, y, base_width, base_height, base_speed)
+            obstacle.width, obstacle.height, obstacle.speed = width, height, speed
+            obstacle.rect.size = (width, height)
+            self.obstacles.append(obstacle)
+        self.item_pool.release_all(self.items)
+        for x, y, item_type, speed, collected in state['items']:
+            item = self.item_pool.acquire(x, y, item_type)
+            item.speed, item.collected = speed, collected
+            self.items.append(item)
+        for name, (active, timer) in state['item_effects'].items():
+            effect = self.item_effects[name]
+            effect['active'], effect['timer'] = active, timer
+            effect['duration'] = self.tunables['item_effect_duration']
+            
+        self.effect_pool.release_all(self.effects)
+        self.particle_system.clear()
+        self.wind_effect.reset()
+        self.screen_shake.reset()
+        self.flash_alpha = 0
+        self.invalidate_static_screen()
+        
+    def record_rewind_point(self):
+        """REWIND_INTERVAL フレームごとに巻き戻し用の状態を取る（プレイ中の更新のあとで呼ぶ）"""
+        if self.game_started and self.game_time % REWIND_INTERVAL == 0 and (
+                not self.rewind_buffer.states or self.rewind_buffer.states[-1][0] != self.game_time):
+            self.rewind_buffer.push(self.game_time, self.capture_state())
+            
+    def rewind(self):
+        """REWIND_FRAMES 前（なければ取ってある最も古い時点）に戻る。戻れたら True"""
+        state = self.rewind_buffer.rewind(self.game_time - REWIND_FRAMES)
+        if state is None:
+            return False
+        self.restore_state(state)
+        if self.telemetry:
+            self.telemetry.event('rewind', game_time=self.game_time)
+        return True
+        
+    def save_state_file(self, directory=STATE_DIR):
+        """今の状態をファイルに保存してパスを返す（保存できなければ None）"""
+        filename = time.strftime('%Y%m%d-%H%M%S') + f"-{self.game_time:06d}" + STATE_EXTENSION
+        path = os.path.join(directory, filename)
+        try:
+            os.makedirs(directory, exist_ok=True)
+            save_state(path, self.capture_state())
+        except OSError as e:
+            print(f"状態を保存できませんでした: {e}")
+            return None
+        print(f"状態を保存しました: {path}")
+        return path
+        
+    def load_state_file(self, path):
+        """保存した状態を読み込み、すぐにプレイ中にする（演出用の乱数も固定して、毎回同じ展開にする）"""
+        state = load_state(path)
+        self.restore_state(state)
+        self.rewind_buffer.clear()
+        random.seed(state['seed'] ^ state['counters']['game_time'])
+        self.state = GameState.PLAYING
+        
     def spawn_obstacle(self):
         """障害物を生成（複数生成可能、バリエーションあり）"""
         obstacle_types = [
@@ -1101,22 +2335,25 @@ class Game:
         
         for _ in range(self.obstacle_spawn_count):
             # ランダムにタイプを選択
-            obstacle_type = random.choice(obstacle_types)
+            obstacle_type = self.rng.choice(obstacle_types)
             width = obstacle_type['width']
             min_height, max_height = obstacle_type['height_range']
-            height = random.randint(min_height, max_height)
-            y = random.randint(0, SCREEN_HEIGHT - height)
-            obstacle = Obstacle(SCREEN_WIDTH, y, width, height, self.obstacle_speed)
+            height = self.rng.randint(min_height, max_height)
+            y = self.rng.randint(0, SCREEN_HEIGHT - height)
+            obstacle = self.obstacle_pool.acquire(SCREEN_WIDTH, y, width, height, self.obstacle_speed)
             self.obstacles.append(obstacle)
+        if self.telemetry:
+            self.telemetry.event('spawn', count=self.obstacle_spawn_count)
         
     def spawn_item(self):
         item_types = ['speed', 'shrink', 'obstacle_shrink', 'slow']
-        item_type = random.choice(item_types)
-        y = random.randint(50, SCREEN_HEIGHT - 50)
-        item = Item(SCREEN_WIDTH, y, item_type)
+        item_type = self.rng.choice(item_types)
+        y = self.rng.randint(50, SCREEN_HEIGHT - 50)
+        item = self.item_pool.acquire(SCREEN_WIDTH, y, item_type)
         self.items.append(item)
         
-    def update_game(self):
+    def update_game(self, keys_pressed=None):
+        """ゲームを1フレーム進める（keys_pressed を省略すると現在のキー状態を使う）"""
         # ゲームオーバー演出中は更新を続ける
         if not self.game_started and self.game_over_effect_timer == 0:
             return
@@ -1136,40 +2373,42 @@ class Game:
                 self.spawn_obstacle()
                 self.last_obstacle_spawn = self.game_time
                 # 時間経過で生成間隔を短く
-                if self.obstacle_spawn_interval > 60:
+                if self.obstacle_spawn_interval > self.tunables['min_obstacle_spawn_interval']:
                     self.obstacle_spawn_interval -= 1
             
             # 時間経過で障害物の数を増やす（15秒ごと = 900フレームごと）
             # 追加処理を3回行うと追加数を+1する
             # カウンターの増加量は現在の追加数に応じて変わる
-            if self.game_time - self.last_obstacle_count_increase >= 300:  # 15秒ごと
+            if self.game_time - self.last_obstacle_count_increase >= self.tunables['obstacle_count_interval']:
                 # カウンターの増加量 = 現在の追加数
                 increment = self.obstacle_spawn_count
                 self.obstacle_increase_counter += increment
                 self.last_obstacle_count_increase = self.game_time
                 
                 # 追加処理を3回行ったら（3の倍数の時）、追加数を+1する
-                if self.obstacle_increase_counter % 3 == 0:
+                if self.obstacle_increase_counter % self.tunables['obstacle_count_step'] == 0:
                     self.obstacle_spawn_count += 1  # 追加数を+1
                     
             # アイテムの生成（出現頻度を少し増やす）
             if self.game_time - self.last_item_spawn >= self.item_spawn_interval:
-                if random.random() < 0.4:  # 40%の確率
+                if self.rng.random() < self.tunables['item_spawn_chance']:  # 40%の確率
                     self.spawn_item()
                 self.last_item_spawn = self.game_time
                 
             # 速度上昇（20秒 = 1200フレームごと）
-            if self.game_time - self.last_speed_up >= 1200:
-                self.obstacle_speed += 0.5
-                self.base_obstacle_speed += 0.5
+            if self.game_time - self.last_speed_up >= self.tunables['speed_up_interval']:
+                self.obstacle_speed += self.tunables['speed_up_step']
+                self.base_obstacle_speed += self.tunables['speed_up_step']
                 self.last_speed_up = self.game_time
+                if self.telemetry:
+                    self.telemetry.event('speed_up', speed=self.obstacle_speed)
                 # すべての障害物の速度を更新
                 for obstacle in self.obstacles:
                     obstacle.base_speed = self.obstacle_speed
                     if not self.item_effects['slow']['active']:
                         obstacle.speed = self.obstacle_speed
                 # 演出
-                self.effects.append(Effect("Speed UP!!!", SCREEN_WIDTH // 2 - 150, SCREEN_HEIGHT // 2, 90, color=YELLOW))
+                self.effects.append(self.effect_pool.acquire("Speed UP!!!", SCREEN_WIDTH // 2 - 150, SCREEN_HEIGHT // 2, 90, color=YELLOW))
                 # パーティクルエフェクト
                 self.particle_system.add_explosion(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2, YELLOW, count=30, speed=8)
                 # 風エフェクトを開始（速度に応じた密度）
@@ -1177,11 +2416,16 @@ class Game:
                 self.wind_effect.start(duration=120, density=min(2.0, speed_factor))
                 
             # プレイヤーの更新（キー状態を使用）- ゲームオーバー演出中は停止
-            keys_pressed = pygame.key.get_pressed()
+            if keys_pressed is None:
+                keys_pressed = pygame.key.get_pressed()
             # キー状態を更新（毎フレーム最新の状態を取得）
             self.keys[pygame.K_UP] = keys_pressed[pygame.K_UP]
             self.keys[pygame.K_DOWN] = keys_pressed[pygame.K_DOWN]
+            if self.replay_writer:
+                self.replay_writer.record(self.keys[pygame.K_UP], self.keys[pygame.K_DOWN])
             self.player.update(self.keys)
+        profiler = self.profiler
+        profiler.lap('生成・更新')
         
         # アイテム効果の更新
         for effect_name, effect_data in self.item_effects.items():
@@ -1213,40 +2457,66 @@ class Game:
         if self.item_effects['slow']['active']:
             for obstacle in self.obstacles:
                 obstacle.apply_speed_reduction(0.7)
+        profiler.lap('アイテム効果')
                 
         # 障害物の更新（ゲームオーバー演出中は停止）
         if self.game_over_effect_timer == 0:
-            for obstacle in self.obstacles[:]:
+            # 画面外に出た障害物はプールに戻し、リストはその場で詰める
+            obstacles = self.obstacles
+            player_rect = self.player.rect
+            kept = 0
+            hit = None
+            for index, obstacle in enumerate(obstacles):
                 obstacle.update()
                 if obstacle.x + obstacle.width < 0:
-                    self.obstacles.remove(obstacle)
+                    # 画面の左外なのでプレイヤーとは衝突しない
+                    self.obstacle_pool.release(obstacle)
+                    continue
+                obstacles[kept] = obstacle
+                kept += 1
                 # 衝突判定
-                if self.player.get_rect().colliderect(obstacle.get_rect()):
-                    # 衝突時の派手な演出を開始
-                    collision_x = obstacle.x + obstacle.width // 2
-                    collision_y = obstacle.y + obstacle.height // 2
-                    self.particle_system.add_explosion(collision_x, collision_y, WHITE, count=40, speed=8)
-                    self.screen_shake.shake(intensity=15, duration=60)  # 長めのシェイク
-                    self.flash_alpha = 200  # 強いフラッシュ
-                    self.game_over_effect_timer = 90  # 1.5秒（90フレーム）の演出時間
-                    # ゲームを停止（プレイヤーと障害物の移動を停止）
-                    self.game_started = False
-                    return
+                if not self.invincible and player_rect.colliderect(obstacle.rect):
+                    hit = obstacle
+                    # 残りの障害物は更新せずにそのまま残す
+                    obstacles[kept:] = obstacles[index + 1:]
+                    break
+            else:
+                del obstacles[kept:]
+            profiler.lap('衝突判定')
+            
+            if hit:
+                # 衝突時の派手な演出を開始
+                collision_x = hit.x + hit.width // 2
+                collision_y = hit.y + hit.height // 2
+                self.particle_system.add_explosion(collision_x, collision_y, WHITE, count=40, speed=8)
+                self.screen_shake.shake(intensity=15, duration=60)  # 長めのシェイク
+                self.flash_alpha = 200  # 強いフラッシュ
+                self.game_over_effect_timer = 90  # 1.5秒（90フレーム）の演出時間
+                # ゲームを停止（プレイヤーと障害物の移動を停止）
+                self.game_started = False
+                return
                 
         # アイテムの更新（ゲームオーバー演出中は停止）
         if self.game_over_effect_timer == 0:
-            for item in self.items[:]:
+            items = self.items
+            player_rect = self.player.rect
+            kept = 0
+            for item in items:
                 if not item.collected:
                     item.update()
                     if item.x + item.width < 0:
-                        self.items.remove(item)
+                        self.item_pool.release(item)
+                        continue
                     # 取得判定
-                    elif self.player.get_rect().colliderect(item.get_rect()):
+                    elif player_rect.colliderect(item.rect):
                         item.collected = True
                         self.score += 100
+                        self.items_collected += 1
                         # 効果を適用
                         self.item_effects[item.type]['active'] = True
                         self.item_effects[item.type]['timer'] = 0
+                        if self.telemetry:
+                            self.telemetry.event('item', type=item.type)
                         
                         # 派手な演出
                         item_x = item.x + item.width // 2
@@ -1256,24 +2526,38 @@ class Game:
                         self.flash_alpha = 100  # フラッシュエフェクト
                         
                         # スコア加算エフェクト
-                        self.effects.append(Effect("+100", item_x, item_y, duration=40, color=item.color))
+                        self.effects.append(self.effect_pool.acquire("+100", item_x, item_y, duration=40, color=item.color))
                         
-                        self.items.remove(item)
+                        self.item_pool.release(item)
+                        continue
+                items[kept] = item
+                kept += 1
+            del items[kept:]
+            profiler.lap('アイテム効果')
                     
         # エフェクトの更新
-        for effect in self.effects[:]:
+        effects = self.effects
+        kept = 0
+        for effect in effects:
             effect.update()
-            if not effect.active:
-                self.effects.remove(effect)
-        
-        # パーティクルシステムの更新
-        self.particle_system.update()
+            if effect.active:
+                effects[kept] = effect
+                kept += 1
+            else:
+                self.effect_pool.release(effect)
+        del effects[kept:]
         
         # 画面シェイクの更新
         self.screen_shake.update()
+        profiler.lap('生成・更新')
+        
+        # パーティクルシステムの更新
+        self.particle_system.update()
+        profiler.lap('パーティクル')
         
         # 風エフェクトの更新
         self.wind_effect.update()
+        profiler.lap('風')
         
         # フラッシュエフェクトの減衰
         if self.flash_alpha > 0:
@@ -1286,16 +2570,68 @@ class Game:
             if self.game_over_effect_timer <= 0:
                 self.end_game()
                 
+    def fast_forward(self, target_frames=None, target_score=None):
+        """描画と clock.tick なしでゲームを指定の時間・スコアまで進め、一時停止状態で渡す（デバッグ用）
+
+        早送り中はボットが操作し、衝突判定は無効にする。ボットが進めたプレイなので、スコアは記録しない（unranked）。
+        """
+        self.state = GameState.PLAYING
+        self.reset_game()
+        self.unranked = True
+        # 衝突を無視して進めるので、リプレイとしては再現できない
+        record_replays = self.record_replays
+        self.record_replays = False
+        # 早送り中の出来事は記録しない
+        telemetry = self.telemetry
+        self.telemetry = None
+        self.invincible = True
+        self.start_play()
+        
+        policy = DodgePolicy(SCREEN_HEIGHT)
+        keys = {pygame.K_UP: False, pygame.K_DOWN: False}
+        started = time.perf_counter()
+        while True:
+            if target_frames is not None and self.game_time >= target_frames:
+                break
+            if target_score is not None and self.score >= target_score:
+                break
+            keys[pygame.K_UP], keys[pygame.K_DOWN] = policy(self)
+            self.update_game(keys)
+        elapsed = time.perf_counter() - started
+        
+        self.invincible = False
+        self.record_replays = record_replays
+        self.telemetry = telemetry
+        # すぐに操作できるとは限らないので一時停止で渡す（ESCで再開）
+        self.state = GameState.PAUSED
+        print(f"早送り: {self.game_time}フレーム（{self.game_time / FPS:.1f}秒）を{elapsed:.2f}秒で実行 "
+              f"スコア={self.score} 障害物={len(self.obstacles)} 生成数={self.obstacle_spawn_count} "
+              f"速度={self.obstacle_speed}")
+        
+    def pool_stats(self):
+        """オブジェクトプールの使用状況（最大同時使用数など）"""
+        return {
+            'obstacles': self.obstacle_pool.stats(),
+            'items': self.item_pool.stats(),
+            'effects': self.effect_pool.stats(),
+            'particles': self.particle_system.pool.stats(),
+            'wind': self.wind_effect.pool.stats(),
+        }
+        
     def end_game(self):
-        is_new_high = self.score_manager.is_new_high_score(self.score)
+        self.stop_replay_recording()
+        is_new_high = not self.unranked and self.score_manager.is_new_high_score(self.score)
+        run_info = {'duration_frames': self.game_time, 'items_collected': self.items_collected, 'seed': self.seed}
+        if self.telemetry:
+            self.telemetry.event('end_game', score=self.score, new_high=is_new_high, unranked=self.unranked)
+        if not self.unranked:
+            # やり直したプレイのスコアは保存・送信しない
+            self.score_manager.save_score(self.score, **run_info)
         if is_new_high:
-            self.score_manager.save_score(self.score)
-            self.effects.append(Effect("NEW HIGH SCORE!!!", SCREEN_WIDTH // 2 - 200, 200, 180, color=YELLOW))
+            self.effects.append(self.effect_pool.acquire("NEW HIGH SCORE!!!", SCREEN_WIDTH // 2 - 200, 200, 180, color=YELLOW))
             # ハイスコア更新時の派手な演出
             self.particle_system.add_explosion(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2, YELLOW, count=60, speed=12)
             self.particle_system.add_sparkle(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2, YELLOW, count=30)
-        else:
-            self.score_manager.save_score(self.score)
         self.state = GameState.RESULT
         
     def draw_gradient_background(self):
@@ -1367,8 +2703,73 @@ class Game:
                 pygame.draw.arc(surface, border_color, (x, y + h - radius * 2, radius * 2, radius * 2), math.pi, 3 * math.pi / 2, border_width)
                 pygame.draw.arc(surface, border_color, (x + w - radius * 2, y + h - radius * 2, radius * 2, radius * 2), 3 * math.pi / 2, 2 * math.pi, border_width)
     
-    def draw_button(self, x, y, width, height, text, font, hover=False, clicked=False):
-        """かっこいいボタンを描画（グラデーション、影、ニューモーフィズム、アニメーション）"""
+    # ボタンの影がはみ出す幅
+    BUTTON_SKIN_MARGIN = 10
+    
+    def _build_ui(self):
+        """画面ごとのボタンとウインドウの閉じるボタン（ui.WidgetTree）を作る"""
+        start_buttons = [("ゲームスタート", 'start', 280), ("スコア", 'scores', 360),
+                         ("説明", 'instructions', 440), ("終了", 'quit', 520)]
+        result_buttons = [("もう一度遊ぶ", 'retry', 380), ("タイトルに戻る", 'title', 450), ("ゲーム終了", 'quit', 520)]
+        box_x, box_y = self._paused_box()[:2]
+        paused_buttons = [("再開", 'resume', box_y + 120), ("ゲーム終了", 'title', box_y + 180)]
+        self.ui = {
+            GameState.START: WidgetTree([Button((450, y, 300, 50), text, action)
+                                         for text, action, y in start_buttons], self),
+            GameState.PAUSED: WidgetTree([Button((box_x + 50, y, 300, 45), text, action)
+                                          for text, action, y in paused_buttons], self),
+            GameState.RESULT: WidgetTree([Button((450, y, 300, 50), text, action)
+                                          for text, action, y in result_buttons], self),
+        }
+        window_rect = self._window_rect()
+        close_button = Button((SCREEN_WIDTH // 2 - 100, window_rect.bottom - 70, 200, 45), "閉じる", 'close', font_size=28)
+        self.window_ui = WidgetTree([close_button], self, bounds=window_rect, outside_action='close')
+        
+    def active_ui(self):
+        """今の画面で操作できる部品（ウインドウが開いていればウインドウの部品）"""
+        if self.state == GameState.START and self.show_window:
+            return self.window_ui
+        return self.ui.get(self.state)
+        
+    def update_ui_pointer(self):
+        """マウスの状態を部品に反映し、見た目が変わった範囲を返す（1フレームに1回）"""
+        ui = self.active_ui()
+        if ui is not self._pointer_ui:
+            if self._pointer_ui is not None:
+                self._pointer_ui.reset_pointer()
+            self._pointer_ui = ui
+        if ui is None:
+            return []
+        return ui.update_pointer(self.mouse_pos(), pygame.mouse.get_pressed()[0])
+        
+    def draw_widget(self, target, widget):
+        """部品（ui.Button）を描き、描いた範囲を返す"""
+        x, y, width, height = widget.rect
+        self.draw_button(x, y, width, height, widget.text, get_japanese_font(widget.font_size),
+                         widget.hover, widget.pressed, target=target)
+        return self.widget_bounds(widget)
+        
+    def widget_bounds(self, widget):
+        """部品を今の状態で描く範囲（影を含む）"""
+        x, y, width, height = widget.rect
+        scaled_x, scaled_y, scaled_width, scaled_height = self._button_geometry(
+            x, y, width, height, widget.hover, widget.pressed)
+        m = self.BUTTON_SKIN_MARGIN
+        return pygame.Rect(scaled_x - m, scaled_y - m, scaled_width + m * 2, scaled_height + m * 2)
+    
+    def draw_button(self, x, y, width, height, text, font, hover=False, clicked=False, target=None):
+        """かっこいいボタンを描画（グラデーション、影、ニューモーフィズム、アニメーション）
+        
+        target は描く先（省略時は self.screen、Canvas も可）
+        """
+        scaled_x, scaled_y, scaled_width, scaled_height = self._button_geometry(x, y, width, height, hover, clicked)
+        skin = self._button_skin(width, height, text, font, hover, clicked)
+        draw_sprite(target or self.screen, skin, (scaled_x - self.BUTTON_SKIN_MARGIN, scaled_y - self.BUTTON_SKIN_MARGIN))
+        return pygame.Rect(scaled_x, scaled_y, scaled_width, scaled_height)
+    
+    @staticmethod
+    def _button_geometry(x, y, width, height, hover, clicked):
+        """状態に応じたボタンの位置と大きさ"""
         # アニメーション効果
         scale = 1.05 if hover else 1.0
         if clicked:
@@ -1382,6 +2783,20 @@ class Game:
         scaled_height = int(height * scale)
         scaled_x = x + (width - scaled_width) // 2
         scaled_y = y + (height - scaled_height) // 2 + y_offset
+        return scaled_x, scaled_y, scaled_width, scaled_height
+    
+    def _button_skin(self, width, height, text, font, hover, clicked):
+        """ボタンの見た目（影を含む Surface）。大きさ・テキスト・状態ごとに一度だけ描画する"""
+        key = (width, height, text, font, hover, clicked)
+        skin = self.button_skins.get(key)
+        if skin is None:
+            _, _, scaled_width, scaled_height = self._button_geometry(0, 0, width, height, hover, clicked)
+            skin = self.button_skins[key] = self._render_button_skin(scaled_width, scaled_height, text, font, hover, clicked)
+        return skin
+    
+    def _render_button_skin(self, scaled_width, scaled_height, text, font, hover, clicked):
+        m = self.BUTTON_SKIN_MARGIN
+        skin = pygame.Surface((scaled_width + m * 2, scaled_height + m * 2), pygame.SRCALPHA)
         
         # 角丸の半径
         radius = 12
@@ -1392,30 +2807,30 @@ class Game:
         for i in range(shadow_layers):
             shadow_alpha = 30 - i * 5
             shadow_offset_i = shadow_offset + i
-            shadow_rect = (scaled_x + shadow_offset_i, scaled_y + shadow_offset_i, 
+            shadow_rect = (m + shadow_offset_i, m + shadow_offset_i, 
                           scaled_width, scaled_height)
             shadow_surf = pygame.Surface((scaled_width + shadow_offset_i * 2, 
                                          scaled_height + shadow_offset_i * 2), pygame.SRCALPHA)
             self.draw_rounded_rect(shadow_surf, 
                                  (shadow_offset_i, shadow_offset_i, scaled_width, scaled_height),
                                  (0, 0, 0, shadow_alpha), radius=radius)
-            self.screen.blit(shadow_surf, (scaled_x - shadow_offset_i, scaled_y - shadow_offset_i))
+            skin.blit(shadow_surf, (m - shadow_offset_i, m - shadow_offset_i))
         
         # 2. ニューモーフィズム効果（立体感のある影とハイライト）
         if not hover and not clicked:
             # 外側の影（暗い）
-            outer_shadow_rect = (scaled_x - 2, scaled_y - 2, scaled_width + 4, scaled_height + 4)
+            outer_shadow_rect = (m - 2, m - 2, scaled_width + 4, scaled_height + 4)
             shadow_surf = pygame.Surface((scaled_width + 4, scaled_height + 4), pygame.SRCALPHA)
             self.draw_rounded_rect(shadow_surf, (2, 2, scaled_width, scaled_height),
                                  (0, 0, 0, 40), radius=radius + 2)
-            self.screen.blit(shadow_surf, (scaled_x - 2, scaled_y - 2))
+            skin.blit(shadow_surf, (m - 2, m - 2))
             
             # 内側のハイライト（明るい）
-            highlight_rect = (scaled_x + 2, scaled_y + 2, scaled_width - 4, scaled_height - 4)
+            highlight_rect = (m + 2, m + 2, scaled_width - 4, scaled_height - 4)
             highlight_surf = pygame.Surface((scaled_width, scaled_height), pygame.SRCALPHA)
             self.draw_rounded_rect(highlight_surf, (0, 0, scaled_width - 4, scaled_height - 4),
                                   (255, 255, 255, 30), radius=radius - 2)
-            self.screen.blit(highlight_surf, (scaled_x + 2, scaled_y + 2))
+            skin.blit(highlight_surf, (m + 2, m + 2))
         
         # 3. グラデーション背景（垂直グラデーション、複数色）
         button_surf = pygame.Surface((scaled_width, scaled_height), pygame.SRCALPHA)
@@ -1465,7 +2880,7 @@ class Game:
         # マスクを適用（角丸以外を透明に）
         button_surf.blit(mask, (0, 0), special_flags=pygame.BLEND_RGBA_MULT)
         
-        self.screen.blit(button_surf, (scaled_x, scaled_y))
+        skin.blit(button_surf, (m, m))
         
         # 4. ボーダー（グラデーション、アニメーション）
         border_width = 2
@@ -1489,39 +2904,43 @@ class Game:
             pygame.draw.arc(border_surf, border_color, (scaled_width - radius * 2, 0, radius * 2, radius * 2), 0, math.pi / 2, border_width)
             pygame.draw.arc(border_surf, border_color, (0, scaled_height - radius * 2, radius * 2, radius * 2), math.pi, 3 * math.pi / 2, border_width)
             pygame.draw.arc(border_surf, border_color, (scaled_width - radius * 2, scaled_height - radius * 2, radius * 2, radius * 2), 3 * math.pi / 2, 2 * math.pi, border_width)
-        self.screen.blit(border_surf, (scaled_x, scaled_y))
+        skin.blit(border_surf, (m, m))
         
         # 5. 内側シャドウ（上部にハイライト、下部に影）
         if not clicked:
             # 上部のハイライト
             highlight_surf = pygame.Surface((scaled_width - 4, scaled_height // 3), pygame.SRCALPHA)
             highlight_surf.fill((255, 255, 255, 20))
-            self.screen.blit(highlight_surf, (scaled_x + 2, scaled_y + 2))
+            skin.blit(highlight_surf, (m + 2, m + 2))
         
         # 6. テキスト（影付き）
         text_surface = font.render(text, True, TEXT_LIGHT)
-        text_rect = text_surface.get_rect(center=(scaled_x + scaled_width // 2, 
-                                                  scaled_y + scaled_height // 2))
+        text_rect = text_surface.get_rect(center=(m + scaled_width // 2, 
+                                                  m + scaled_height // 2))
         # テキストの影
         shadow_text = font.render(text, True, (0, 0, 0))
-        self.screen.blit(shadow_text, (text_rect.x + 1, text_rect.y + 1))
-        self.screen.blit(text_surface, text_rect)
+        skin.blit(shadow_text, (text_rect.x + 1, text_rect.y + 1))
+        skin.blit(text_surface, text_rect)
         
-        return pygame.Rect(scaled_x, scaled_y, scaled_width, scaled_height)
+        return skin
     
-    def draw_window(self, title, content_lines, close_button_text="閉じる"):
-        """かっこいいウインドウを描画"""
-        window_width = int(600 * 1.3)  # 780
-        window_height = int(500 * 1.3)  # 650
-        window_x = (SCREEN_WIDTH - window_width) // 2
-        window_y = (SCREEN_HEIGHT - window_height) // 2
-        radius = 16
-        
-        # 1. 背景を半透明で覆う
-        overlay = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.SRCALPHA)
-        overlay.fill((0, 0, 0, 180))
-        self.screen.blit(overlay, (0, 0))
-        
+    # ウインドウの大きさ（780x650）と、影がはみ出す幅
+    WINDOW_WIDTH = int(600 * 1.3)
+    WINDOW_HEIGHT = int(500 * 1.3)
+    WINDOW_RADIUS = 16
+    WINDOW_FRAME_MARGIN = 16
+    
+    def _render_window_frame(self, window_width, window_height, radius):
+        """ウインドウの影・背景・ボーダーを描画した Surface"""
+        m = self.WINDOW_FRAME_MARGIN
+        frame = pygame.Surface((window_width + m * 2, window_height + m * 2), pygame.SRCALPHA)
+        for _ in self._draw_window_frame(frame, window_width, window_height, radius):
+            pass
+        return frame
+    
+    def _draw_window_frame(self, frame, window_width, window_height, radius):
+        """frame にウインドウの影・背景・ボーダーを描く（影を1枚描くごとに中断するジェネレーター）"""
+        m = self.WINDOW_FRAME_MARGIN
         # 2. ウインドウの影（複数層）
         shadow_layers = 8
         for i in range(shadow_layers):
@@ -1531,11 +2950,11 @@ class Game:
             self.draw_rounded_rect(shadow_surf, 
                                  (shadow_offset, shadow_offset, window_width, window_height),
                                  (0, 0, 0, shadow_alpha), radius=radius)
-            self.screen.blit(shadow_surf, (window_x - shadow_offset, window_y - shadow_offset))
+            frame.blit(shadow_surf, (m - shadow_offset, m - shadow_offset))
+            yield
         
-        # 3. ウインドウの背景（グラデーション）
-        window_surf = pygame.Surface((window_width, window_height), pygame.SRCALPHA)
-        # グラデーション背景
+        # 3. ウインドウの背景（グラデーション。幅1ピクセルで描いてから横に引き伸ばす）
+        column = pygame.Surface((1, window_height), pygame.SRCALPHA)
         color1 = (15, 23, 42)  # 暗い青
         color2 = (2, 6, 23)  # より暗い青
         for i in range(window_height):
@@ -1543,7 +2962,8 @@ class Game:
             r = int(color1[0] * (1 - ratio) + color2[0] * ratio)
             g = int(color1[1] * (1 - ratio) + color2[1] * ratio)
             b = int(color1[2] * (1 - ratio) + color2[2] * ratio)
-            pygame.draw.line(window_surf, (r, g, b), (0, i), (window_width, i))
+            column.set_at((0, i), (r, g, b))
+        window_surf = pygame.transform.scale(column, (window_width, window_height))
         
         # 角丸矩形のマスクを作成
         mask = pygame.Surface((window_width, window_height), pygame.SRCALPHA)
@@ -1555,7 +2975,7 @@ class Game:
             pygame.draw.circle(mask, (255, 255, 255, 255), (radius, window_height - radius), radius)
             pygame.draw.circle(mask, (255, 255, 255, 255), (window_width - radius, window_height - radius), radius)
         window_surf.blit(mask, (0, 0), special_flags=pygame.BLEND_RGBA_MULT)
-        self.screen.blit(window_surf, (window_x, window_y))
+        frame.blit(window_surf, (m, m))
         
         # 4. ボーダー（グラデーション）
         border_width = 2
@@ -1570,7 +2990,28 @@ class Game:
             pygame.draw.arc(border_surf, border_color, (window_width - radius * 2, 0, radius * 2, radius * 2), 0, math.pi / 2, border_width)
             pygame.draw.arc(border_surf, border_color, (0, window_height - radius * 2, radius * 2, radius * 2), math.pi, 3 * math.pi / 2, border_width)
             pygame.draw.arc(border_surf, border_color, (window_width - radius * 2, window_height - radius * 2, radius * 2, radius * 2), 3 * math.pi / 2, 2 * math.pi, border_width)
-        self.screen.blit(border_surf, (window_x, window_y))
+        frame.blit(border_surf, (m, m))
+    
+    def _window_rect(self):
+        """ウインドウの位置と大きさ"""
+        return pygame.Rect((SCREEN_WIDTH - self.WINDOW_WIDTH) // 2, (SCREEN_HEIGHT - self.WINDOW_HEIGHT) // 2,
+                           self.WINDOW_WIDTH, self.WINDOW_HEIGHT)
+        
+    def draw_window(self, title, content_lines):
+        """かっこいいウインドウを描画（閉じるボタンは self.window_ui）"""
+        window_x, window_y, window_width, window_height = self._window_rect()
+        radius = self.WINDOW_RADIUS
+        
+        # 1. 背景を半透明で覆う
+        if self.window_overlay is None:
+            self.window_overlay = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.SRCALPHA)
+            self.window_overlay.fill((0, 0, 0, 180))
+        self.screen.blit(self.window_overlay, (0, 0))
+        
+        # 2〜4. 影・背景・ボーダー（一度だけ描画しておく）
+        if self.window_frame is None:
+            self.window_frame = self._render_window_frame(window_width, window_height, radius)
+        self.screen.blit(self.window_frame, (window_x - self.WINDOW_FRAME_MARGIN, window_y - self.WINDOW_FRAME_MARGIN))
         
         # 5. タイトル
         title_y = window_y + 40
@@ -1591,153 +3032,197 @@ class Game:
                 line_index += 1
         
         # 7. 閉じるボタン
-        close_button_y = window_y + window_height - 70
-        close_button_font = get_japanese_font(28)
-        mouse_x, mouse_y = pygame.mouse.get_pos()
-        mouse_pressed = pygame.mouse.get_pressed()[0]
-        close_button_rect = pygame.Rect(SCREEN_WIDTH // 2 - 100, close_button_y, 200, 45)
-        hover = close_button_rect.collidepoint(mouse_x, mouse_y)
-        clicked = hover and mouse_pressed
-        self.draw_button(SCREEN_WIDTH // 2 - 100, close_button_y, 200, 45, 
-                        close_button_text, close_button_font, hover, clicked)
-        
-        return close_button_rect
+        self.window_ui.draw(self.screen)
     
     def draw_start_screen(self):
-        # タイトル画面専用の背景を描画
-        self.title_background.draw(self.screen)
+        # タイトル画面専用の背景を描画（作成前は背景色だけ）
+        if self.title_background:
+            self.title_background.draw(self.screen)
+        else:
+            self.screen.fill(BG_DARK)
         
         # タイトル（かっこよく）
         TextRenderer.draw_title(self.screen, "yokero", SCREEN_WIDTH // 2, 120, size=80, color=TEXT_LIGHT)
         
         # ボタン
-        button_font = get_japanese_font(32)
-        buttons = [
-            ("ゲームスタート", 280),
-            ("スコア", 360),
-            ("説明", 440),
-            ("終了", 520)
-        ]
-        
-        mouse_x, mouse_y = pygame.mouse.get_pos()
-        mouse_pressed = pygame.mouse.get_pressed()[0]  # 左クリック状態
-        for text, y in buttons:
-            hover = 450 <= mouse_x <= 750 and y <= mouse_y <= y + 50
-            clicked = hover and mouse_pressed
-            self.draw_button(450, y, 300, 50, text, button_font, hover, clicked)
+        self.ui[GameState.START].draw(self.screen)
         
         # ウインドウを表示
         if self.show_window == 'scores':
-            scores = self.score_manager.scores
-            if not scores:
+            ranking, shared = self.score_manager.ranking()
+            if not ranking:
                 content_lines = ["まだスコアが記録されていません"]
+            elif shared:
+                content_lines = [f"{rank}. {score}  ({kiosk})" for rank, score, kiosk in ranking]
             else:
-                content_lines = [f"{i+1}. {score}" for i, score in enumerate(scores[:10])]
+                content_lines = [f"{rank}. {score}" for rank, score, _ in ranking]
+            if self.score_manager.leaderboard and not shared:
+                content_lines.append("（サーバー未接続のため、この端末の記録を表示）")
             self.draw_window("スコアランキング", content_lines)
                 
         elif self.show_window == 'instructions':
             self.draw_window("説明", INSTRUCTIONS_TEXT)
             
-    def draw_playing_screen(self):
-        # 画面シェイクのオフセットを適用
-        offset_x = self.screen_shake.offset_x
-        offset_y = self.screen_shake.offset_y
+        # 素材の作成中は進み具合を表示（ボタンはその間も使える）
+        if self.asset_baker:
+            self.draw_loading_progress()
+            
+    def draw_loading_progress(self):
+        """素材作成の進み具合（画面下のバー）"""
+        bar_width, bar_height = 300, 6
+        bar_x = (SCREEN_WIDTH - bar_width) // 2
+        bar_y = SCREEN_HEIGHT - 60
+        progress = self.asset_baker.progress
+        pygame.draw.rect(self.screen, DARK_GRAY, (bar_x, bar_y, bar_width, bar_height), border_radius=3)
+        pygame.draw.rect(self.screen, BUTTON_HOVER_START, (bar_x, bar_y, int(bar_width * progress), bar_height), border_radius=3)
+        TextRenderer.draw_subtitle(self.screen, f"読み込み中… {int(progress * 100)}%", SCREEN_WIDTH // 2, bar_y - 16)
+            
+    def draw_playing_screen(self, view=None):
+        """プレイ中の画面を描く
+        
+        view には FrameSnapshot を渡せる（パイプライン描画の描画スレッド）。その場合は view の状態を描き、
+        プロファイラーの区間は計測しない（プロファイラーはメインスレッドだけが使う）。
+        """
+        canvas = self.canvas
+        if view is None:
+            view = self
+            lap = self.profiler.lap
+        else:
+            lap = _no_lap
         
-        # 一時的なサーフェスに描画（シェイク対応）
-        temp_screen = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
+        # ゲーム画面を描画倍率の解像度で描く（シェイクのオフセットは end_world() で適用）
+        world = canvas.begin_world(self.render_scale, (view.screen_shake.offset_x, view.screen_shake.offset_y))
         
         # 背景を描画
         if self.bg_surface:
-            temp_screen.blit(self.bg_surface, (0, 0))
+            world.sprite(self._background_for_scale(world.scale, world.get_size()), (0, 0))
         else:
-            temp_screen.fill(BG_DARK)
+            world.fill(BG_DARK)
+        lap('描画その他')
         
         # 風エフェクトを描画（背景の上、障害物の下）
-        self.wind_effect.draw(temp_screen)
+        view.wind_effect.draw(world)
+        lap('風')
         
         # パーティクルを描画
-        self.particle_system.draw(temp_screen)
+        view.particle_system.draw(world)
+        lap('パーティクル')
         
         # 障害物（グロー効果付き）
-        for obstacle in self.obstacles:
-            GlowEffect.draw_glow_rect(temp_screen, 
+        for obstacle in view.obstacles:
+            GlowEffect.draw_glow_rect(world, 
                                      (obstacle.x, obstacle.y, obstacle.width, obstacle.height),
                                      obstacle.color, intensity=2)
-            obstacle.draw(temp_screen)
+            lap('グロー')
+            obstacle.draw(world)
+            lap('描画その他')
         
         # アイテム（グロー効果付き）
-        for item in self.items:
+        for item in view.items:
             if not item.collected:
                 center_x = item.x + item.width // 2
                 center_y = item.y + item.height // 2
-                GlowEffect.draw_glow_circle(temp_screen, center_x, center_y, 
+                GlowEffect.draw_glow_circle(world, center_x, center_y, 
                                            item.width // 2, item.color, intensity=3)
-                item.draw(temp_screen)
+                lap('グロー')
+                item.draw(world)
+                lap('描画その他')
         
         # プレイヤー（グロー効果付き）
-        GlowEffect.draw_glow_rect(temp_screen,
-                                  (self.player.x, self.player.y, self.player.width, self.player.height),
-                                  self.player.color, intensity=3)
-        self.player.draw(temp_screen)
+        GlowEffect.draw_glow_rect(world,
+                                  (view.player.x, view.player.y, view.player.width, view.player.height),
+                                  view.player.color, intensity=3)
+        lap('グロー')
+        view.player.draw(world)
+        
+        # 縮小して描いた場合は等倍に拡大する（文字は拡大後に等倍で描く）
+        world = canvas.upscale_world()
+        lap('描画その他')
         
         # エフェクト
-        for effect in self.effects:
-            effect.draw(temp_screen)
+        for effect in view.effects:
+            effect.draw(world)
+        lap('テキスト')
         
-        # シェイクオフセットを適用してメインスクリーンに描画
-        self.screen.blit(temp_screen, (offset_x, offset_y))
+        # シェイクオフセットを適用して画面に合成
+        canvas.end_world()
         
         # フラッシュエフェクト
-        if self.flash_alpha > 0:
-            flash_surf = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
-            flash_surf.set_alpha(self.flash_alpha)
-            flash_surf.fill(WHITE)
-            self.screen.blit(flash_surf, (0, 0))
+        if view.flash_alpha > 0:
+            canvas.overlay(WHITE, view.flash_alpha)
+        lap('描画その他')
         
         # スコア表示（シェイクの影響を受けないように最後に描画、見やすく）
-        TextRenderer.draw_normal(self.screen, f"スコア: {self.score}", 30, 30, 
+        TextRenderer.draw_normal(canvas, f"スコア: {view.score}", 30, 30, 
                                size=42, color=TEXT_LIGHT, center=False)
         
         # ゲーム開始前のメッセージ（ゲームオーバー演出中は表示しない、演出用）
-        if not self.game_started and self.game_over_effect_timer == 0:
-            TextRenderer.draw_effect(self.screen, "スペースキーでスタート", 
+        if not view.game_started and view.game_over_effect_timer == 0:
+            TextRenderer.draw_effect(canvas, "スペースキーでスタート", 
                                    SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2, 
                                    size=52, color=YELLOW)
+        lap('テキスト')
             
+    def profiler_counts(self):
+        """プロファイラーに表示するオブジェクトの数"""
+        return [
+            ("障害物", len(self.obstacles)),
+            ("アイテム", len(self.items)),
+            ("パーティクル", len(self.particle_system.particles)),
+            ("風の筋", len(self.wind_effect.particles)),
+            ("エフェクト", len(self.effects)),
+            ("画質", self.quality_governor.label()),
+            ("ペーシング", f"{self.pacer.strategy} ずれ p99 {self.pacer.jitter_percentile(99):.1f} ms"),
+        ]
+            
+    def entity_counts(self):
+        """テレメトリに記録するオブジェクトの数"""
+        return {
+            'obstacles': len(self.obstacles),
+            'items': len(self.items),
+            'particles': len(self.particle_system.particles),
+            'wind': len(self.wind_effect.particles),
+            'effects': len(self.effects),
+        }
+        
+    @staticmethod
+    def _paused_box():
+        """一時停止のメニューボックスの位置と大きさ"""
+        box_width, box_height = 400, 250
+        return (SCREEN_WIDTH - box_width) // 2, (SCREEN_HEIGHT - box_height) // 2, box_width, box_height
+        
     def draw_paused_screen(self):
+        self.draw_paused_background()
+        self.ui[GameState.PAUSED].draw(self.canvas)
+        
+    def draw_paused_background(self):
+        """一時停止画面のボタン以外（プレイ中の画面の上に描くので、描く先は self.canvas）"""
+        canvas = self.canvas
         # ゲーム画面を半透明で覆う
-        overlay = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
-        overlay.set_alpha(200)
-        overlay.fill(BG_DARKEST)
-        self.screen.blit(overlay, (0, 0))
+        canvas.overlay(BG_DARKEST, 200)
         
         # メニューボックス
-        box_width, box_height = 400, 250
-        box_x = (SCREEN_WIDTH - box_width) // 2
-        box_y = (SCREEN_HEIGHT - box_height) // 2
+        box_x, box_y, box_width, box_height = self._paused_box()
         
         # 背景
-        pygame.draw.rect(self.screen, BG_DARK, (box_x, box_y, box_width, box_height))
-        pygame.draw.rect(self.screen, BORDER_COLOR, (box_x, box_y, box_width, box_height), 2)
+        canvas.rect(BG_DARK, (box_x, box_y, box_width, box_height))
+        canvas.rect(BORDER_COLOR, (box_x, box_y, box_width, box_height), 2)
         
         # タイトル（かっこよく）
-        TextRenderer.draw_title(self.screen, "一時停止", SCREEN_WIDTH // 2, box_y + 50, 
+        TextRenderer.draw_title(canvas, "一時停止", SCREEN_WIDTH // 2, box_y + 50, 
                               size=48, color=TEXT_LIGHT)
         
-        button_font = get_japanese_font(32)
-        buttons = [
-            ("再開", box_y + 120),
-            ("ゲーム終了", box_y + 180)
-        ]
-        
-        mouse_x, mouse_y = pygame.mouse.get_pos()
-        mouse_pressed = pygame.mouse.get_pressed()[0]  # 左クリック状態
-        for text, y in buttons:
-            hover = box_x + 50 <= mouse_x <= box_x + box_width - 50 and y <= mouse_y <= y + 45
-            clicked = hover and mouse_pressed
-            self.draw_button(box_x + 50, y, box_width - 100, 45, text, button_font, hover, clicked)
+    def draw_paused_frame(self):
+        """一時停止画面のボタン以外を、止まったプレイ画面から描く"""
+        self.draw_playing_screen()
+        self.draw_paused_background()
             
     def draw_result_screen(self):
+        self.draw_result_background()
+        self.ui[GameState.RESULT].draw(self.screen)
+        
+    def draw_result_background(self):
+        """リザルト画面のボタン以外"""
         self.draw_gradient_background()
         
         # スコア表示
@@ -1757,32 +3242,85 @@ class Game:
         self.screen.blit(shadow, (high_rect.x + 2, high_rect.y + 2))
         self.screen.blit(high_text, high_rect)
         
+        if self.unranked:
+            note_text = get_japanese_font(24).render("巻き戻し・早送りなどをしたプレイなので、スコアは記録されません", True, GRAY)
+            self.screen.blit(note_text, note_text.get_rect(center=(SCREEN_WIDTH // 2, 320)))
+        
         # エフェクト（NEW HIGH SCORE演出）
         for effect in self.effects:
             effect.draw(self.screen)
             
-        # ボタン
-        button_font = get_japanese_font(32)
-        buttons = [
-            ("もう一度遊ぶ", 380),
-            ("タイトルに戻る", 450),
-            ("ゲーム終了", 520)
-        ]
+    def draw_static_screen(self, draw_background, target, ui_dirty):
+        """背景が動かない画面（一時停止・リザルト）を描く
+        
+        前のフレームから背景が変わっていなければ、見た目が変わったボタンの範囲（ui_dirty）だけを描き直して
+        その範囲を返す。画面全体を描いたときは None を返す。
+        """
+        ui = self.ui[self.state]
+        reusable = (self.window is None and not self.profiler.enabled and self.asset_baker is None)
+        if reusable and self.static_background is not None and self.static_state == self.state:
+            return ui.redraw(self.screen, self.static_background, ui_dirty)
+        draw_background()
+        if reusable:
+            # ボタンを描く前の画面を取っておく（バッファは使い回す）
+            if self.static_background is None or self.static_background.get_size() != self.screen.get_size():
+                self.static_background = self.screen.copy()
+            else:
+                self.static_background.blit(self.screen, (0, 0))
+            self.static_state = self.state
+        else:
+            self.static_state = None
+        ui.draw(target)
+        return None
         
-        mouse_x, mouse_y = pygame.mouse.get_pos()
-        mouse_pressed = pygame.mouse.get_pressed()[0]  # 左クリック状態
-        for text, y in buttons:
-            hover = 450 <= mouse_x <= 750 and y <= mouse_y <= y + 50
-            clicked = hover and mouse_pressed
-            self.draw_button(450, y, 300, 50, text, button_font, hover, clicked)
+    def invalidate_static_screen(self):
+        """次のフレームで画面全体を描き直す"""
+        self.static_state = None
             
+    def needs_full_rate(self):
+        """毎フレーム描き直す必要があるか（False なら入力があるまで待ってよい）
+        
+        タイトル画面（背景が動く）とプレイ中は常に必要。一時停止・リザルト画面は止まっているので、
+        F3 の表示中・素材の作成中・ウインドウを開いているときだけ必要
+        （リザルト画面の NEW HIGH SCORE の演出は更新しないので、描き直しても変わらない）
+        """
+        if self.state not in (GameState.PAUSED, GameState.RESULT):
+            return True
+        return self.profiler.enabled or self.asset_baker is not None or self.show_window is not None
+        
     def run(self):
         running = True
+        waited_event = None  # 待っている間に来たイベント（次のフレームで処理する）
         
+        perf_counter = time.perf_counter
+        alloc_tracker = self.alloc_tracker
+        if alloc_tracker:
+            alloc_tracker.start()
         while running:
-            for event in pygame.event.get():
+            profiler = self.profiler
+            profiler.start_frame()
+            telemetry = self.telemetry
+            frame_start = perf_counter()
+            if alloc_tracker:
+                alloc_tracker.begin_frame(self.state.name)
+            events = pygame.event.get()
+            if waited_event is not None:
+                events.insert(0, waited_event)
+                waited_event = None
+            for event in events:
                 if event.type == pygame.QUIT:
                     running = False
+                if event.type == pygame.VIDEORESIZE:
+                    if self.pipeline:
+                        self.pipeline.wait()  # 描画スレッドが描いている画面を作り直さないように
+                    self.on_window_resized()
+                elif event.type == pygame.WINDOWEXPOSED:
+                    # ウインドウの内容が消えた可能性があるので、全体を描き直す
+                    self.invalidate_static_screen()
+                # F3 でプロファイラーの表示を切り替える（どの画面でも有効）
+                if event.type == pygame.KEYDOWN and event.key == pygame.K_F3:
+                    profiler.toggle()
+                    continue
                     
                 if self.state == GameState.START:
                     if not self.handle_start_screen(event):
@@ -1794,33 +3332,187 @@ class Game:
                 elif self.state == GameState.RESULT:
                     if not self.handle_result_screen(event):
                         running = False
+            profiler.lap('イベント')
+            update_start = perf_counter()
             
             # ゲーム更新（PLAYING状態の時は常に更新）
             if self.state == GameState.PLAYING:
                 self.update_game()
+                self.record_rewind_point()
             # タイトル画面の背景を更新
-            elif self.state == GameState.START:
+            elif self.state == GameState.START and self.title_background:
                 self.title_background.update()
+            draw_start = perf_counter()
                         
-            # 描画
+            # パイプライン描画: 更新したフレームを写し取り、描画スレッドが前のフレームを描き終えるのを待つ
+            # （描き終えた画面を表示してから、写し取ったフレームを渡す）
+            pipeline = self.pipeline
+            snapshot = None
+            if pipeline:
+                if self.state == GameState.PLAYING:
+                    snapshot = pipeline.capture(self)
+                pipeline.wait()
+                if snapshot is None:
+                    # 画面はこのスレッドで描くので、次にプレイ中になったときは描画スレッドの画面を使えない
+                    pipeline.reset()
+                elif pipeline.drawn_tick != snapshot.tick - 1:
+                    # 前のフレームを描いていない（プレイ中になった直後）ので、このフレームを描き終えるまで待つ
+                    # （次のフレームでは描画スレッドに渡したばかりなので、同じ画面をもう一度表示する）
+                    pipeline.submit(snapshot)
+                    pipeline.wait()
+                    snapshot = None
+            
+            # 描画（一時停止・リザルトは、ボタンの見た目が変わった範囲だけを描き直すことがある）
+            ui_dirty = self.update_ui_pointer()
+            dirty = None
             if self.state == GameState.START:
                 self.draw_start_screen()
             elif self.state == GameState.PLAYING:
-                self.draw_playing_screen()
+                if not pipeline:
+                    self.draw_playing_screen()
             elif self.state == GameState.PAUSED:
-                self.draw_playing_screen()
-                self.draw_paused_screen()
+                dirty = self.draw_static_screen(self.draw_paused_frame, self.canvas, ui_dirty)
             elif self.state == GameState.RESULT:
-                self.draw_result_screen()
+                dirty = self.draw_static_screen(self.draw_result_background, self.screen, ui_dirty)
+            if self.state not in (GameState.PAUSED, GameState.RESULT):
+                self.invalidate_static_screen()
+            if self.window is not None and self.state in (GameState.START, GameState.RESULT):
+                # Surface に描いた画面を Renderer に転送する
+                self.canvas.upload_screen(self.screen)
+            profiler.lap('描画その他')
+            
+            if profiler.enabled:
+                profiler.draw(self.canvas, self.profiler_counts())
+                profiler.lap('オーバーレイ')
                 
-            pygame.display.flip()
-            self.clock.tick(FPS)
+            flip_start = perf_counter()
+            self.present(dirty)
+            if snapshot is not None:
+                pipeline.submit(snapshot)
+            flip_end = perf_counter()
+            profiler.lap('flip')
+            if self.asset_baker:
+                # 最初のフレームが表示されてから、残りの素材をフレームごとに少しずつ作る
+                if self.asset_baker.frames == 0:
+                    startup_trace.mark("最初のフレーム")
+                self.asset_baker.step(ASSET_BAKE_BUDGET)
+                if self.asset_baker.finished:
+                    startup_trace.mark(f"素材の作成（{self.asset_baker.frames}フレーム）")
+                    startup_trace.finish()
+                    self.asset_baker = None
+                profiler.lap('描画その他')
+            busy_end = perf_counter()
+            if not self.asset_baker:
+                # 素材の作成中は処理時間が多めになるので、品質の判断に使わない
+                self.quality_governor.observe((busy_end - frame_start) * 1000)
+            if alloc_tracker:
+                alloc_tracker.end_frame()
+            idle = not self.needs_full_rate()
+            if not idle:
+                late_ms = self.pacer.wait()
+            else:
+                # 動くものがないので、入力があるまで待つ（入力があればすぐに次のフレームへ）
+                event = pygame.event.wait(IDLE_WAIT_MS)
+                if event.type != pygame.NOEVENT:
+                    waited_event = event
+                self.pacer.reset()
+                late_ms = 0.0
+            profiler.lap('待機 (tick)')
+            if telemetry:
+                frame_end = perf_counter()
+                telemetry.record_frame(
+                    state=self.state.name, game_time=self.game_time,
+                    frame_ms=round((frame_end - frame_start) * 1000, 3),
+                    update_ms=round((draw_start - update_start) * 1000, 3),
+                    draw_ms=round((flip_start - draw_start) * 1000, 3),
+                    flip_ms=round((flip_end - flip_start) * 1000, 3),
+                    busy_ms=round((busy_end - frame_start) * 1000, 3),
+                    late_ms=round(late_ms, 3), idle=int(idle),
+                    **self.entity_counts())
             
+        if self.pipeline:
+            self.pipeline.close()
+        self.stop_replay_recording()
+        if self.telemetry:
+            self.telemetry.close()
+        if alloc_tracker:
+            alloc_tracker.stop()
+            print(alloc_tracker.report())
+        if self.pacing_report:
+            print(self.pacer.report())
+        self.score_manager.close()
         pygame.quit()
 
+def parse_window_size(text):
+    """'1920x1080' を (1920, 1080) にする"""
+    try:
+        width, height = (int(value) for value in text.lower().split('x'))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"WxH の形式で指定してください: {text}")
+    if width <= 0 or height <= 0:
+        raise argparse.ArgumentTypeError(f"大きさが不正です: {text}")
+    return width, height
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="yokero")
+    parser.add_argument('--skip-to-time', type=float, metavar='SECONDS',
+                        help="デバッグ用: 指定したゲーム時間（秒）まで早送りしてから開始")
+    parser.add_argument('--skip-to-score', type=int, metavar='SCORE',
+                        help="デバッグ用: 指定したスコアまで早送りしてから開始")
+    parser.add_argument('--load-state', metavar='PATH',
+                        help=f"デバッグ用: 保存した状態（{STATE_EXTENSION}、プレイ中に F5 で保存）を読み込んでプレイ中から始める")
+    parser.add_argument('--leaderboard', metavar='URL',
+                        help="共有ランキングサーバーの URL（例: http://192.168.0.10:8765）")
+    parser.add_argument('--kiosk-id', help="共有ランキングに表示する端末名（省略時はホスト名）")
+    parser.add_argument('--startup-trace', action='store_true', help="起動時間の内訳を表示")
+    parser.add_argument('--quality', choices=QUALITY_NAMES, help="描画品質を固定する（auto で自動）")
+    parser.add_argument('--window', type=parse_window_size, metavar='WxH', help="ウインドウの大きさ（例: 1920x1080）")
+    parser.add_argument('--fullscreen', action='store_true', help="全画面で表示")
+    parser.add_argument('--render-scale', type=float, default=RENDER_SCALE, metavar='SCALE',
+                        help="ゲーム画面を描く解像度の倍率（0.25〜1.0、小さいほど軽い）")
+    parser.add_argument('--renderer', choices=RENDERER_NAMES, default=RENDERER,
+                        help="描画先（sdl2 は GPU、なければ SDL のソフトウェアレンダラーを使う）")
+    parser.add_argument('--pacing', choices=PACING_NAMES, default=PACING,
+                        help="フレームの時刻の待ち方（hybrid は眠ったあと最後の約1msだけ空回りする）")
+    parser.add_argument('--pacing-report', action='store_true',
+                        help="終了時にフレームの時刻のずれのヒストグラム・FPS・CPU 使用率を表示")
+    parser.add_argument('--pipelined', action='store_true', default=PIPELINED,
+                        help="プレイ中の画面を別のスレッドで描く（表示は1フレーム遅れる、--renderer software のみ）")
+    parser.add_argument('--telemetry', metavar='PATH',
+                        help="フレームごとの記録を書き出す（.jsonl または .csv、解析は telemetry.py）")
+    parser.add_argument('--alloc-debug', action='store_true',
+                        help="デバッグ用: フレームごとのメモリ確保と GC を画面ごとに集計し、終了時に表示")
+    args = parser.parse_args(argv)
+    if not 0.25 <= args.render_scale <= 1.0:
+        parser.error("--render-scale は 0.25〜1.0 で指定してください")
+    if args.pipelined and args.renderer != 'software':
+        parser.error("--pipelined は --renderer software のときだけ使えます")
+    if args.renderer == 'sdl2' and not renderer_available():
+        parser.error("この pygame では --renderer sdl2 は使えません（pygame._sdl2.video がありません）")
+    return args
+
 if __name__ == "__main__":
     try:
-        game = Game()
+        args = parse_args()
+        startup_trace.enabled = args.startup_trace
+        startup_trace.mark("モジュール読み込み")
+        leaderboard = LeaderboardClient(args.leaderboard, args.kiosk_id) if args.leaderboard else None
+        telemetry = TelemetryRecorder(args.telemetry) if args.telemetry else None
+        alloc_tracker = None
+        if args.alloc_debug:
+            from alloc_debug import AllocationTracker
+            alloc_tracker = AllocationTracker()
+        game = Game(leaderboard=leaderboard, telemetry=telemetry, alloc_tracker=alloc_tracker,
+                    window_size=args.window, fullscreen=args.fullscreen, render_scale=args.render_scale,
+                    renderer=args.renderer, pacing=args.pacing, pipelined=args.pipelined)
+        game.pacing_report = args.pacing_report
+        if args.quality:
+            game.quality_governor.pin(None if args.quality == 'auto' else QUALITY_NAMES.index(args.quality))
+        if args.skip_to_time is not None or args.skip_to_score is not None:
+            target_frames = int(args.skip_to_time * FPS) if args.skip_to_time is not None else None
+            game.fast_forward(target_frames=target_frames, target_score=args.skip_to_score)
+        if args.load_state:
+            game.load_state_file(args.load_state)
         game.run()
     except Exception as e:
         import traceback
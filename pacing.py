@@ -0,0 +1,146 @@
+"""yokero のフレームの間隔の調整（フレームペーシング）
+
+次のフレームの時刻まで待つ方式を選べる。
+
+- tick: pygame.time.Clock.tick()（SDL_Delay でミリ秒単位に眠るので、数ミリ秒遅れることがある。CPU は使わない）
+- busy: pygame.time.Clock.tick_busy_loop()（最後まで空回りして待つので正確だが、待つ間も CPU を使い切る）
+- hybrid: 残りが SPIN_MS になるまで眠り、最後だけ空回りして待つ（正確さはほぼ busy、CPU はほぼ tick）
+
+どの方式でも、待ち終わった時刻と予定の時刻の差（遅れ）をヒストグラムに記録し、
+実際の FPS・ずれの p99（ジッタ）・待機中を含めた CPU 使用率を出す。ヒストグラムとジッタは差の大きさで数える
+（Clock はミリ秒単位なので、tick と busy は 60FPS でも 16ms ごとになり、毎フレーム約 0.7ms 早い）。
+処理が1フレームに収まらなかったフレームは、待たずに次へ進むので「超過」として別に数える。
+
+    python main.py --pacing hybrid
+    python benchmarks/bench_pacing.py
+"""
+import time
+
+import pygame
+
+PACING_NAMES = ('tick', 'busy', 'hybrid')
+
+
+class FramePacer:
+    """フレームの開始時刻をそろえる
+
+    メインループの最後に wait() を呼ぶ。入力を待つなど自分で待ったときは reset() を呼ぶ
+    （待った時間を遅れとして数えない）。
+    """
+    SPIN_MS = 1.0  # hybrid で最後に空回りして待つ時間
+    BUCKET_MS = 0.1  # ヒストグラムの1区間の幅
+    BUCKETS = 100  # 区間の数（最後の区間はそれ以上のずれをまとめる）
+
+    def __init__(self, fps, strategy='tick'):
+        if strategy not in PACING_NAMES:
+            raise ValueError(f"不明な方式: {strategy}（{', '.join(PACING_NAMES)} から選択）")
+        self.fps = fps
+        self.strategy = strategy
+        self.period = 1.0 / fps
+        self.clock = pygame.time.Clock()
+        self.histogram = [0] * self.BUCKETS
+        self.frames = 0  # 記録したフレーム数（超過を含む）
+        self.overruns = 0  # 処理が1フレームに収まらなかったフレーム数
+        self.last_late_ms = 0.0
+        self._last = None  # 前回 wait() を抜けた時刻
+        self._target = None  # hybrid の前回の予定の時刻（予定は前回の予定から数えるので、少しの遅れが積もらない）
+        self._paced_time = 0.0  # 記録したフレームの合計時間（秒）
+        self._cpu_start = time.process_time()
+        self._wall_start = time.perf_counter()
+
+    def reset(self):
+        """自分で待ったあと、次の予定を今から数え直す"""
+        self.clock.tick()
+        self._last = self._target = time.perf_counter()
+
+    def wait(self):
+        """次のフレームの時刻まで待ち、予定からの遅れ（ms、早ければ負）を返す"""
+        last = self._last
+        called = time.perf_counter()
+        # 予定は tick・busy では前回の時刻 + 1フレーム（Clock と同じ）、hybrid では自分で決めた時刻
+        deadline = None if last is None else last + self.period
+        if self.strategy == 'tick':
+            self.clock.tick(self.fps)
+        elif self.strategy == 'busy':
+            self.clock.tick_busy_loop(self.fps)
+        else:
+            target = deadline = called if self._target is None else self._target + self.period
+            if target < called - self.period:
+                # 1フレーム以上遅れたら、追いつこうとせずに今から数え直す
+                # （超過かどうかは、数え直す前の予定 deadline で判断する）
+                target = called
+            self._sleep_then_spin(target)
+            self._target = target
+            self.clock.tick()
+        now = self._last = time.perf_counter()
+        if last is None:
+            return 0.0
+        if called > deadline:
+            # 待つ前に予定を過ぎていた（処理が重い）ので、待ち方の遅れではない
+            self.overruns += 1
+            late = now - called
+        else:
+            late = now - deadline
+        late_ms = self.last_late_ms = late * 1000
+        self.histogram[min(self.BUCKETS - 1, int(abs(late_ms) / self.BUCKET_MS))] += 1
+        self.frames += 1
+        self._paced_time += now - last
+        return late_ms
+
+    def _sleep_then_spin(self, deadline):
+        perf_counter = time.perf_counter
+        remaining = deadline - perf_counter() - self.SPIN_MS / 1000
+        if remaining > 0:
+            time.sleep(remaining)
+        while perf_counter() < deadline:
+            pass
+
+    # --- 結果 ---
+
+    def achieved_fps(self):
+        """記録したフレームの平均 FPS"""
+        return self.frames / self._paced_time if self._paced_time else 0.0
+
+    def jitter_percentile(self, percent=99):
+        """予定とのずれの大きさの percent パーセンタイル（ms、ヒストグラムの区間の上端）"""
+        if not self.frames:
+            return 0.0
+        rank = self.frames * percent / 100
+        count = 0
+        for index, frames in enumerate(self.histogram):
+            count += frames
+            if count >= rank:
+                return (index + 1) * self.BUCKET_MS
+        return self.BUCKETS * self.BUCKET_MS
+
+    def cpu_percent(self):
+        """作ってからのプロセスの CPU 使用率（待機中を含む、% は1コア分）"""
+        wall = time.perf_counter() - self._wall_start
+        return (time.process_time() - self._cpu_start) / wall * 100 if wall > 0 else 0.0
+
+    def summary(self):
+        """結果の一覧（ベンチマークの JSON 用）"""
+        return {
+            'strategy': self.strategy,
+            'frames': self.frames,
+            'achieved_fps': round(self.achieved_fps(), 2),
+            'jitter_p50_ms': round(self.jitter_percentile(50), 2),
+            'jitter_p99_ms': round(self.jitter_percentile(99), 2),
+            'overruns': self.overruns,
+            'cpu_percent': round(self.cpu_percent(), 1),
+        }
+
+    def report(self):
+        """結果とずれのヒストグラムを文字列で返す（回数が0の区間は省く）"""
+        s = self.summary()
+        lines = [f"フレームペーシング（{s['strategy']}）: {s['frames']}フレーム  {s['achieved_fps']:.2f} FPS  "
+                 f"ずれ p50 {s['jitter_p50_ms']:.1f} ms  p99 {s['jitter_p99_ms']:.1f} ms  "
+                 f"超過 {s['overruns']}  CPU {s['cpu_percent']:.0f}%"]
+        peak = max(self.histogram) or 1
+        for index, frames in enumerate(self.histogram):
+            if not frames:
+                continue
+            lower = index * self.BUCKET_MS
+            label = f"{lower:4.1f}+    " if index == self.BUCKETS - 1 else f"{lower:4.1f}-{lower + self.BUCKET_MS:4.1f}"
+            lines.append(f"  {label} ms {frames:7d}  {'#' * max(1, frames * 40 // peak)}")
+        return '\n'.join(lines)
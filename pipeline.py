@@ -0,0 +1,129 @@
+"""yokero のパイプライン描画（シミュレーションと描画を別のスレッドで重ねて行う）
+
+メインスレッドはフレーム N を更新して描画用のスナップショットに写し取り、描画スレッドに渡す。
+描画スレッドがそれを描いている間に、メインスレッドは待機・イベント処理・フレーム N+1 の更新を進める。
+pygame の blit・fill などは GIL を手放すので、CPU が複数あれば描画と更新が同時に進む。
+代わりに、表示されるのは1つ前に更新したフレームになる（遅れ1フレーム）。
+
+スナップショットは2つを交互に使い回す（ダブルバッファ）。写し取っている方は描画スレッドが触らず、
+描いている方はメインスレッドが触らない。
+
+    pipeline = RenderPipeline(draw, make_snapshot)
+    snapshot = pipeline.capture(game)  # 更新のあと（描画スレッドが前のフレームを描いていてもよい）
+    pipeline.wait()                    # 前のフレームを描き終えるまで待つ（この間に画面を表示する）
+    pipeline.submit(snapshot)          # 描画スレッドに渡してすぐに戻る
+
+画面の Surface は、wait() から submit() までの間だけメインスレッドが触ってよい。
+"""
+import threading
+
+import pygame
+
+
+def copy_slots(source, target):
+    """__slots__ のオブジェクトの属性を target に写す（Rect は target の Rect を書き換えて共有しない）"""
+    for name in type(source).__slots__:
+        value = getattr(source, name)
+        if type(value) is pygame.Rect:
+            rect = getattr(target, name, None)
+            if rect is None:
+                setattr(target, name, value.copy())
+            else:
+                rect.update(value)
+        else:
+            setattr(target, name, value)
+
+
+def copy_list(sources, targets):
+    """sources の各オブジェクトを targets に写す（targets の要素は使い回し、足りなければ作る）"""
+    del targets[len(sources):]
+    count = len(targets)
+    for i, source in enumerate(sources):
+        if i < count:
+            target = targets[i]
+            if type(target) is not type(source):
+                target = targets[i] = object.__new__(type(source))
+        else:
+            target = object.__new__(type(source))
+            targets.append(target)
+        copy_slots(source, target)
+
+
+class RenderPipeline:
+    """描画スレッドとスナップショットの受け渡し
+
+    draw(snapshot) は描画スレッドで呼ばれる。make_snapshot() はスナップショットを作る関数で、
+    作ったものは capture(game) のたびに snapshot.capture(game) で上書きする。
+    """
+
+    def __init__(self, draw, make_snapshot):
+        self._draw = draw
+        self._buffers = (make_snapshot(), make_snapshot())
+        self.captured = 0  # 写し取ったフレーム数
+        self.drawn_tick = None  # 最後に描き終えたスナップショットの番号（capture() の順、0 から）
+        self._condition = threading.Condition()
+        self._pending = None  # 描画スレッドに渡したがまだ描き始めていないスナップショット
+        self._busy = False  # 渡したスナップショットを描き終えていない
+        self._error = None
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name='render', daemon=True)
+        self._thread.start()
+
+    def capture(self, game):
+        """描いていない方のバッファに game を写し取って返す"""
+        snapshot = self._buffers[self.captured % 2]
+        snapshot.tick = self.captured
+        snapshot.capture(game)
+        self.captured += 1
+        return snapshot
+
+    def submit(self, snapshot):
+        """snapshot を描画スレッドに渡す（前のスナップショットを描き終えてから呼ぶ）"""
+        with self._condition:
+            self._pending = snapshot
+            self._busy = True
+            self._condition.notify_all()
+
+    def wait(self):
+        """渡したスナップショットを描き終えるまで待つ（描画スレッドの例外はここで送出する）"""
+        with self._condition:
+            while self._busy:
+                self._condition.wait()
+            error, self._error = self._error, None
+        if error is not None:
+            raise error
+
+    def reset(self):
+        """描いたフレームを忘れる（wait() のあとに呼ぶ）
+
+        描画スレッドを使わない画面（一時停止・リザルトなど）を表示したあとに呼ぶと、
+        次に capture() したフレームは前のフレームを描いていない扱いになる（同期して描く必要がわかる）。
+        """
+        self.drawn_tick = None
+
+    def close(self):
+        """描き終えるのを待って描画スレッドを止める"""
+        with self._condition:
+            while self._busy:
+                self._condition.wait()
+            self._closed = True
+            self._condition.notify_all()
+        self._thread.join()
+
+    def _run(self):
+        condition = self._condition
+        while True:
+            with condition:
+                while self._pending is None and not self._closed:
+                    condition.wait()
+                if self._closed:
+                    return
+                snapshot, self._pending = self._pending, None
+            try:
+                self._draw(snapshot)
+            except Exception as e:
+                self._error = e
+            with condition:
+                self._busy = False
+                self.drawn_tick = snapshot.tick
+                condition.notify_all()
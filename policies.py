@@ -0,0 +1,94 @@
+"""yokero ボットの操作（ポリシー）
+
+ポリシーは game を受け取り、(上キー, 下キー) を返す呼び出し可能オブジェクト。
+main.py（Game.fast_forward()）からも使うので、main を import しない（ゲームを実行する部分は bots.py）。
+"""
+import random
+
+
+class RandomPolicy:
+    """ランダムに上下キーを押し続けるボット（一定時間同じ入力を保持）"""
+
+    def __init__(self, seed=None, min_hold=5, max_hold=40):
+        self.rng = random.Random(seed)
+        self.min_hold = min_hold
+        self.max_hold = max_hold
+        self.action = (False, False)
+        self.hold = 0
+
+    def __call__(self, game):
+        if self.hold <= 0:
+            self.action = self.rng.choice([(False, False), (True, False), (False, True)])
+            self.hold = self.rng.randint(self.min_hold, self.max_hold)
+        self.hold -= 1
+        return self.action
+
+
+class DodgePolicy:
+    """前方の障害物を先読みしてよける簡易ボット
+
+    「止まる・上・下」をそれぞれ horizon フレーム続けた場合を予測し、
+    最初の衝突が最も遅い行動を選ぶ。
+    """
+
+    ACTIONS = ((False, False), (True, False), (False, True))
+
+    def __init__(self, screen_height, horizon=30, step=3):
+        self.screen_height = screen_height  # 上下のワープの位置（main.SCREEN_HEIGHT）
+        self.horizon = horizon
+        self.step = step
+        self.action = (False, False)
+
+    def __call__(self, game):
+        player = game.player
+        # 予測範囲に入る障害物だけを対象にする
+        reach = player.x + player.width + game.obstacle_speed * 2 * self.horizon
+        threats = [(o.x, o.y, o.width, o.height, o.speed) for o in game.obstacles
+                   if o.x < reach and o.x + o.width > player.x]
+        if not threats:
+            self.action = (False, False)
+            return self.action
+
+        best_action = self.action
+        best_time = self._first_hit(player, threats, self.action)
+        for action in self.ACTIONS:
+            if action == self.action:
+                continue
+            hit_time = self._first_hit(player, threats, action)
+            if hit_time > best_time:
+                best_action = action
+                best_time = hit_time
+        self.action = best_action
+        return self.action
+
+    def _first_hit(self, player, threats, action):
+        """action を続けた場合に最初にぶつかるフレーム（ぶつからなければ horizon + 1）"""
+        up, down = action
+        px = player.x
+        pw = player.width
+        ph = player.height
+        y = player.y
+        screen_height = self.screen_height
+        for t in range(1, self.horizon + 1):
+            # Player.update と同じ移動・ワープ処理
+            if up:
+                y -= player.speed
+                if y < 0:
+                    y = screen_height - ph
+            if down:
+                y += player.speed
+                if y > screen_height - ph:
+                    y = 0
+            if t % self.step:
+                continue
+            for ox, oy, ow, oh, speed in threats:
+                ox -= speed * t
+                if ox < px + pw and ox + ow > px and oy < y + ph and oy + oh > y:
+                    return t
+        return self.horizon + 1
+
+
+POLICIES = {
+    'random': RandomPolicy,
+    'dodge': DodgePolicy,
+}
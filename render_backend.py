@@ -0,0 +1,399 @@
+"""yokero の描画先（ソフトウェアの Surface と SDL2 の Renderer に同じ命令で描く）
+
+ゲーム画面（プレイ中・一時停止）は Canvas の描画命令で描く。
+
+- fill / rect / line / circle: 塗りつぶし・矩形・線・円
+- overlay: 全体が同じ透明度の半透明の塗りつぶし（Surface.set_alpha() と同じ）
+- alpha_rect / glow_rect / glow_circle: 色の4番目を透明度として重ねる矩形・円（グローは1層分）
+- sprite: 作ったあと書き換えない Surface（テキスト・アイテム・ボタンなどのキャッシュした素材）
+- sprites: sprite() の (Surface, 位置) をまとめて描く（パーティクルなど、小さな素材をたくさん描くとき）
+- blit: 毎回作る・書き換える Surface
+
+描画先は2種類:
+
+- SurfaceCanvas: pygame.Surface に描く（今までどおりの描画）
+- TextureCanvas: pygame._sdl2.video の Renderer に描く。sprite() の Surface は最初の1回だけテクスチャにして
+  使い回し、円は半径ごとの白い円のテクスチャに色を付けて描く。GPU がなければ SDL のソフトウェアレンダラーで動く
+  （SDL_VIDEODRIVER=dummy でも動くので、画面のない Linux でも確かめられる）
+
+タイトル・リザルト画面などは今までどおり Surface に描き、TextureCanvas.upload_screen() でまとめて転送する。
+"""
+import abc
+
+import pygame
+
+try:
+    from pygame._sdl2 import video
+    from pygame._sdl2.sdl2 import error as SDLError
+except ImportError:  # pygame 1.9 など
+    video = None
+    SDLError = pygame.error
+
+
+def renderer_available():
+    """SDL2 の Renderer が使えるか"""
+    return video is not None
+
+
+def create_renderer(title, size, fullscreen=False):
+    """ウインドウと Renderer を作る（GPU を優先し、使えなければソフトウェアレンダラー）
+
+    pygame.display.set_mode() のウインドウには Renderer を作れないので、ウインドウも自分で作る。
+    戻り値は (Window, Renderer, GPU を使っているか)
+    """
+    if video is None:
+        raise pygame.error("pygame._sdl2.video がありません")
+    if fullscreen:
+        window = video.Window(title, size=size, fullscreen_desktop=True)
+    else:
+        window = video.Window(title, size=size, resizable=True)
+    try:
+        return window, video.Renderer(window, accelerated=1), True
+    except SDLError:
+        return window, video.Renderer(window, accelerated=0), False
+
+
+def draw_sprite(target, surface, dest):
+    """キャッシュした素材を描く（target が Canvas なら sprite()、Surface なら blit()）"""
+    # Canvas は ABC で isinstance() が遅いので、Surface かどうかで分ける
+    if isinstance(target, pygame.Surface):
+        target.blit(surface, dest)
+    else:
+        target.sprite(surface, dest)
+
+
+def draw_sprites(target, sequence):
+    """キャッシュした素材の (Surface, 位置) の並びをまとめて描く（Surface なら blits() 1回）"""
+    if isinstance(target, pygame.Surface):
+        target.blits(sequence, doreturn=False)
+    else:
+        target.sprites(sequence)
+
+
+class Canvas(abc.ABC):
+    """描画先の共通部分
+
+    scale はゲーム画面を描く解像度の倍率（座標と大きさに掛けるのは描く側）。
+    抽象メソッドがそろっていない描画先は、作るときに TypeError になる。
+    """
+    scale = 1
+
+    @abc.abstractmethod
+    def get_size(self):
+        """描画先の大きさ (幅, 高さ)"""
+
+    def get_width(self):
+        return self.get_size()[0]
+
+    def get_height(self):
+        return self.get_size()[1]
+
+    # --- 描画命令 ---
+
+    @abc.abstractmethod
+    def fill(self, color, rect=None):
+        """rect（省略時は全体）を塗りつぶす"""
+
+    @abc.abstractmethod
+    def rect(self, color, rect, width=0):
+        """矩形を描く（width が 0 なら塗りつぶし、それ以外は内側に width の太さの枠）"""
+
+    @abc.abstractmethod
+    def line(self, color, start, end):
+        """太さ1の線を描く"""
+
+    @abc.abstractmethod
+    def circle(self, color, center, radius):
+        """塗りつぶした円を描く"""
+
+    @abc.abstractmethod
+    def overlay(self, color, alpha, rect=None):
+        """rect（省略時は全体）に透明度 alpha の color を重ねる"""
+
+    @abc.abstractmethod
+    def alpha_rect(self, color, rect):
+        """color の4番目を透明度として矩形を重ねる"""
+
+    @abc.abstractmethod
+    def glow_rect(self, color, rect):
+        """グロー1層分の矩形を重ねる（color の4番目が透明度）"""
+
+    @abc.abstractmethod
+    def glow_circle(self, color, center, radius):
+        """グロー1層分の円を重ねる（color の4番目が透明度）"""
+
+    @abc.abstractmethod
+    def blit(self, surface, dest):
+        """毎回作る・書き換える Surface を描き、描いた範囲の Rect を返す"""
+
+    @abc.abstractmethod
+    def sprite(self, surface, dest):
+        """作ったあと書き換えない Surface を描き、描いた範囲の Rect を返す"""
+
+    @abc.abstractmethod
+    def sprites(self, sequence):
+        """sprite() の (Surface, 位置) の並びをまとめて描く"""
+
+    # --- ゲーム画面 ---
+
+    @abc.abstractmethod
+    def begin_world(self, scale, offset):
+        """ゲーム画面（シェイクでずれる部分）を描き始める。描く先の Canvas を返す"""
+
+    @abc.abstractmethod
+    def upscale_world(self):
+        """ゲーム画面の縮小して描く部分が終わったら呼ぶ。続けて等倍で描く先の Canvas を返す"""
+
+    @abc.abstractmethod
+    def end_world(self):
+        """ゲーム画面を描き終える（シェイクのずれを付けて画面に合成する）"""
+
+
+class SurfaceCanvas(Canvas):
+    """pygame.Surface に描く"""
+
+    def __init__(self, surface, scale=1):
+        self.surface = surface
+        self.scale = scale
+        self._world = None  # ゲーム画面を描くバッファ（描画倍率の大きさ）
+        self._upscaled = None  # 縮小して描いたゲーム画面を等倍に拡大したもの
+        self._world_target = None
+        self._offset = (0, 0)
+
+    def get_size(self):
+        return self.surface.get_size()
+
+    def fill(self, color, rect=None):
+        self.surface.fill(color, rect)
+
+    def rect(self, color, rect, width=0):
+        pygame.draw.rect(self.surface, color, rect, width)
+
+    def line(self, color, start, end):
+        pygame.draw.line(self.surface, color, start, end)
+
+    def circle(self, color, center, radius):
+        pygame.draw.circle(self.surface, color, center, radius)
+
+    def overlay(self, color, alpha, rect=None):
+        x, y, width, height = rect or self.surface.get_rect()
+        overlay = pygame.Surface((width, height))
+        overlay.set_alpha(alpha)
+        overlay.fill(color)
+        self.surface.blit(overlay, (x, y))
+
+    def alpha_rect(self, color, rect):
+        x, y, width, height = rect
+        surf = pygame.Surface((width, height), pygame.SRCALPHA)
+        surf.fill(color)
+        self.surface.blit(surf, (x, y))
+
+    def glow_rect(self, color, rect):
+        x, y, width, height = rect
+        glow_surf = pygame.Surface((width, height), pygame.SRCALPHA)
+        pygame.draw.rect(glow_surf, color, (0, 0, width, height))
+        self._blit_glow(glow_surf, (x, y))
+
+    def glow_circle(self, color, center, radius):
+        glow_surf = pygame.Surface((radius * 2, radius * 2), pygame.SRCALPHA)
+        pygame.draw.circle(glow_surf, color, (radius, radius), radius)
+        self._blit_glow(glow_surf, (center[0] - radius, center[1] - radius))
+
+    def _blit_glow(self, glow_surf, pos):
+        try:
+            self.surface.blit(glow_surf, pos, special_flags=pygame.BLEND_ALPHA_SDL2)
+        except:
+            self.surface.blit(glow_surf, pos)
+
+    def blit(self, surface, dest):
+        return self.surface.blit(surface, dest)
+
+    sprite = blit
+
+    def sprites(self, sequence):
+        self.surface.blits(sequence, doreturn=False)
+
+    # --- ゲーム画面 ---
+
+    def begin_world(self, scale, offset):
+        size = (max(1, int(self.surface.get_width() * scale)), max(1, int(self.surface.get_height() * scale)))
+        if self._world is None or self._world.get_size() != size:
+            # バッファは毎フレーム作らずに使い回す
+            self._world = SurfaceCanvas(pygame.Surface(size), scale)
+            self._upscaled = None if scale == 1 else SurfaceCanvas(pygame.Surface(self.surface.get_size()))
+        self._world.scale = scale
+        self._world_target = self._world
+        self._offset = offset
+        return self._world
+
+    def upscale_world(self):
+        if self._upscaled is not None:
+            pygame.transform.scale(self._world.surface, self._upscaled.get_size(), self._upscaled.surface)
+            self._world_target = self._upscaled
+        return self._world_target
+
+    def end_world(self):
+        self.surface.blit(self._world_target.surface, self._offset)
+        self._world_target = None
+
+
+class TextureCanvas(Canvas):
+    """SDL2 の Renderer に描く
+
+    座標は論理解像度（size）で、ウインドウへの拡大縮小と余白は Renderer が行う（logical_size）。
+    sprite() に渡した Surface は、しばらく使われなければテクスチャを捨てる。
+    """
+    # sprite() のテクスチャを捨てるまでのフレーム数
+    TEXTURE_TTL = 120
+    BLEND = 1  # SDL_BLENDMODE_BLEND
+
+    def __init__(self, renderer, size):
+        self.renderer = renderer
+        self.size = size
+        renderer.logical_size = size
+        renderer.draw_blend_mode = self.BLEND
+        self._textures = {}  # id(Surface) -> [Surface, Texture, 最後に使ったフレーム]
+        self._circles = {}  # 半径 -> 白い円のテクスチャ
+        self._screen_texture = None
+        self._frame = 0
+        self._offset_x = 0
+        self._offset_y = 0
+
+    def get_size(self):
+        return self.size
+
+    def _set_color(self, color, alpha=255):
+        """描画色（color に4番目があればそれを透明度にする）"""
+        self.renderer.draw_color = (color[0], color[1], color[2], color[3] if len(color) > 3 else alpha)
+
+    def _dest(self, rect):
+        x, y, width, height = rect
+        return (x + self._offset_x, y + self._offset_y, width, height)
+
+    def fill(self, color, rect=None):
+        renderer = self.renderer
+        self._set_color(color)
+        if rect is None:
+            renderer.clear()
+        else:
+            renderer.fill_rect(self._dest(rect))
+
+    def rect(self, color, rect, width=0):
+        renderer = self.renderer
+        self._set_color(color)
+        if width <= 0:
+            renderer.fill_rect(self._dest(rect))
+            return
+        # pygame.draw.rect と同じく、枠は内側に太くする
+        x, y, w, h = self._dest(rect)
+        for i in range(width):
+            renderer.draw_rect((x + i, y + i, w - i * 2, h - i * 2))
+
+    def line(self, color, start, end):
+        renderer = self.renderer
+        self._set_color(color)
+        ox, oy = self._offset_x, self._offset_y
+        renderer.draw_line((start[0] + ox, start[1] + oy), (end[0] + ox, end[1] + oy))
+
+    def circle(self, color, center, radius):
+        self._draw_circle(color, center, radius, 255)
+
+    def _draw_circle(self, color, center, radius, alpha):
+        radius = int(radius)
+        texture = self._circle_texture(radius)
+        texture.color = color[:3]
+        texture.alpha = alpha
+        size = radius * 2 + 1
+        texture.draw(dstrect=self._dest((center[0] - radius, center[1] - radius, size, size)))
+
+    def _circle_texture(self, radius):
+        texture = self._circles.get(radius)
+        if texture is None:
+            size = radius * 2 + 1
+            surface = pygame.Surface((size, size), pygame.SRCALPHA)
+            pygame.draw.circle(surface, (255, 255, 255), (radius, radius), radius)
+            texture = self._circles[radius] = video.Texture.from_surface(self.renderer, surface)
+            texture.blend_mode = self.BLEND
+        return texture
+
+    def overlay(self, color, alpha, rect=None):
+        renderer = self.renderer
+        self._set_color(color[:3], alpha)
+        renderer.fill_rect(self._dest(rect or (0, 0, *self.size)))
+
+    def alpha_rect(self, color, rect):
+        self._set_color(color)
+        self.renderer.fill_rect(self._dest(rect))
+
+    glow_rect = alpha_rect
+
+    def glow_circle(self, color, center, radius):
+        self._draw_circle(color, center, radius, color[3] if len(color) > 3 else 255)
+
+    def blit(self, surface, dest):
+        texture = video.Texture.from_surface(self.renderer, surface)
+        return self._draw_texture(texture, surface, dest)
+
+    def sprite(self, surface, dest):
+        entry = self._textures.get(id(surface))
+        if entry is None:
+            # Surface も持っておくので、id が別の Surface に使い回されることはない
+            entry = self._textures[id(surface)] = [surface, video.Texture.from_surface(self.renderer, surface), 0]
+        entry[2] = self._frame
+        return self._draw_texture(entry[1], surface, dest)
+
+    def sprites(self, sequence):
+        # Renderer には blits() にあたるものがないので1枚ずつ描く（sprite() を展開したもの。テクスチャは同じく使い回す）
+        textures = self._textures
+        frame = self._frame
+        ox, oy = self._offset_x, self._offset_y
+        for surface, (x, y) in sequence:
+            entry = textures.get(id(surface))
+            if entry is None:
+                entry = textures[id(surface)] = [surface, video.Texture.from_surface(self.renderer, surface), 0]
+            entry[2] = frame
+            texture = entry[1]
+            texture.draw(dstrect=(x + ox, y + oy, texture.width, texture.height))
+
+    def _draw_texture(self, texture, surface, dest):
+        width, height = surface.get_size()
+        rect = pygame.Rect(dest[0], dest[1], width, height)
+        texture.draw(dstrect=self._dest(rect))
+        return rect
+
+    def upload_screen(self, surface):
+        """Surface に描いた画面全体を転送する（タイトル・リザルト画面など）"""
+        texture = self._screen_texture
+        if texture is None or (texture.width, texture.height) != surface.get_size():
+            texture = self._screen_texture = video.Texture(self.renderer, surface.get_size(), streaming=True)
+        texture.update(surface)
+        texture.draw(dstrect=(0, 0, *self.size))
+
+    def present(self):
+        """描いた内容をウインドウに表示する"""
+        self.renderer.present()
+        self._frame += 1
+        if self._frame % self.TEXTURE_TTL == 0:
+            oldest = self._frame - self.TEXTURE_TTL
+            for key in [key for key, entry in self._textures.items() if entry[2] < oldest]:
+                del self._textures[key]
+
+    def texture_count(self):
+        return len(self._textures) + len(self._circles)
+
+    # --- ゲーム画面 ---
+
+    def begin_world(self, scale, offset):
+        # 描画倍率は使わない（拡大縮小は Renderer が行うので、縮小して描いても軽くならない）
+        self._offset_x, self._offset_y = offset
+        if offset != (0, 0):
+            # シェイクでずれたときの画面の端
+            self.renderer.draw_color = (0, 0, 0, 255)
+            self.renderer.clear()
+        return self
+
+    def upscale_world(self):
+        return self
+
+    def end_world(self):
+        self._offset_x = self._offset_y = 0
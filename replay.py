@@ -0,0 +1,193 @@
+"""yokero リプレイ（バイナリ形式）
+
+ファイル構成:
+    ヘッダー  : マジック(4) + バージョン(u16) + シード(u64) + チューニング値JSON長(u32)
+    チューニング値 : UTF-8 の JSON
+    本体      : 入力ランの列。1ランは varint で (連続フレーム数 << 2) | 入力ビット
+    終端      : varint 0
+
+入力ビットは bit0 = K_UP, bit1 = K_DOWN。
+キー入力はほとんど変化しないため、10分のプレイでも数KBに収まる。
+"""
+import json
+import struct
+import sys
+
+REPLAY_MAGIC = b'YKRP'
+REPLAY_VERSION = 1
+REPLAY_EXTENSION = '.ykr'
+
+INPUT_UP = 0b01
+INPUT_DOWN = 0b10
+
+_HEADER = struct.Struct('<4sHQI')
+
+
+def _encode_varint(value):
+    """符号なし整数を LEB128 形式の varint にエンコード"""
+    out = bytearray()
+    while True:
+        byte = value & 0x7F
+        value >>= 7
+        if value:
+            out.append(byte | 0x80)
+        else:
+            out.append(byte)
+            return bytes(out)
+
+
+class ReplayFormatError(ValueError):
+    """リプレイファイルの形式が不正"""
+
+
+class ReplayWriter:
+    """リプレイを逐次書き出すライター（バッファ付き）
+
+    record() は入力が変化した時だけ数バイトをバッファに積むので、
+    ゲームループ中のディスク書き込みはほぼ発生せず、終了時の close() も軽い。
+    """
+
+    def __init__(self, path, seed, tunables, buffer_size=8192):
+        self.path = path
+        self.seed = seed
+        self.ticks = 0
+        self._bits = None
+        self._run = 0
+        self._file = open(path, 'wb', buffering=buffer_size)
+        tunables_json = json.dumps(tunables, sort_keys=True, separators=(',', ':')).encode('utf-8')
+        self._file.write(_HEADER.pack(REPLAY_MAGIC, REPLAY_VERSION, seed, len(tunables_json)))
+        self._file.write(tunables_json)
+
+    def record(self, up, down):
+        """1フレーム分の入力を記録"""
+        bits = (INPUT_UP if up else 0) | (INPUT_DOWN if down else 0)
+        self.ticks += 1
+        if bits == self._bits:
+            self._run += 1
+            return
+        self._flush_run()
+        self._bits = bits
+        self._run = 1
+
+    def _flush_run(self):
+        if self._run > 0:
+            self._file.write(_encode_varint((self._run << 2) | self._bits))
+
+    def close(self):
+        """残りのランと終端を書き出してファイルを閉じる"""
+        if self._file is None:
+            return
+        self._flush_run()
+        self._run = 0
+        self._file.write(_encode_varint(0))
+        self._file.close()
+        self._file = None
+
+    @property
+    def closed(self):
+        return self._file is None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class ReplayReader:
+    """リプレイをストリーミングでデコードするリーダー
+
+    ファイル全体を読み込まず、チャンク単位で varint を復号する。
+    途中で切れたファイル（クラッシュ時など）は読めたところまでを返す。
+    """
+
+    def __init__(self, path, chunk_size=4096):
+        self.path = path
+        self.chunk_size = chunk_size
+        self._file = open(path, 'rb')
+        header = self._file.read(_HEADER.size)
+        if len(header) < _HEADER.size:
+            self._file.close()
+            raise ReplayFormatError(f"ヘッダーが短すぎます: {path}")
+        magic, self.version, self.seed, tunables_len = _HEADER.unpack(header)
+        if magic != REPLAY_MAGIC:
+            self._file.close()
+            raise ReplayFormatError(f"リプレイファイルではありません: {path}")
+        if self.version > REPLAY_VERSION:
+            self._file.close()
+            raise ReplayFormatError(f"未対応のバージョンです: {self.version}")
+        tunables_json = self._file.read(tunables_len)
+        if len(tunables_json) < tunables_len:
+            self._file.close()
+            raise ReplayFormatError(f"チューニング値が途中で切れています: {path}")
+        self.tunables = json.loads(tunables_json.decode('utf-8'))
+        self._consumed = False
+
+    def runs(self):
+        """(入力ビット, 連続フレーム数) を順に返す"""
+        if self._consumed:
+            raise RuntimeError("runs() は一度しか呼び出せません")
+        self._consumed = True
+        value = 0
+        shift = 0
+        while True:
+            chunk = self._file.read(self.chunk_size)
+            if not chunk:
+                return
+            for byte in chunk:
+                value |= (byte & 0x7F) << shift
+                if byte & 0x80:
+                    shift += 7
+                    continue
+                if value == 0:
+                    return
+                yield value & 0b11, value >> 2
+                value = 0
+                shift = 0
+
+    def inputs(self):
+        """フレームごとの (up, down) を順に返す"""
+        for bits, length in self.runs():
+            up = bool(bits & INPUT_UP)
+            down = bool(bits & INPUT_DOWN)
+            for _ in range(length):
+                yield up, down
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def main(argv=None):
+    """リプレイファイルの概要を表示"""
+    import argparse
+    import os
+
+    parser = argparse.ArgumentParser(description="yokero リプレイの概要を表示")
+    parser.add_argument('paths', nargs='+', help="リプレイファイル (.ykr)")
+    args = parser.parse_args(argv)
+
+    for path in args.paths:
+        with ReplayReader(path) as reader:
+            run_count = 0
+            ticks = 0
+            for _, length in reader.runs():
+                run_count += 1
+                ticks += length
+            print(f"{path}")
+            print(f"  バージョン : {reader.version}")
+            print(f"  シード     : {reader.seed}")
+            print(f"  フレーム数 : {ticks} ({ticks / 60:.1f}秒)")
+            print(f"  ラン数     : {run_count}")
+            print(f"  サイズ     : {os.path.getsize(path)} bytes")
+            print(f"  チューニング値: {json.dumps(reader.tunables, ensure_ascii=False)}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,89 @@
+"""yokero のゲーム状態の保存（巻き戻し・途中からの再開用）
+
+状態は Game.capture_state() が作る dict（数値・文字列・タプル・リストだけ）で、
+ゲームの進行に関わるもの（プレイヤー・障害物・アイテム・アイテム効果・生成のカウンター・スコア・乱数の状態）を持つ。
+パーティクルなどの演出は含めない。
+
+ファイル構成:
+    ヘッダー : マジック(4) + バージョン(u16) + 本体の長さ(u32)
+    本体     : zlib で圧縮した UTF-8 の JSON（タプルはリストになる）
+
+    python main.py --load-state states/20250101-120000.yks
+"""
+import json
+import struct
+import zlib
+from collections import deque
+
+STATE_MAGIC = b'YKST'
+STATE_VERSION = 1
+STATE_EXTENSION = '.yks'
+
+_HEADER = struct.Struct('<4sHI')
+
+
+class StateFormatError(ValueError):
+    """状態ファイルの形式が不正"""
+
+
+def encode_state(state):
+    """状態をファイルの形式（bytes）にする"""
+    body = zlib.compress(json.dumps(state, separators=(',', ':')).encode('utf-8'))
+    return _HEADER.pack(STATE_MAGIC, STATE_VERSION, len(body)) + body
+
+
+def decode_state(data):
+    """encode_state() の逆（タプルだったものはリストで返る）"""
+    if len(data) < _HEADER.size:
+        raise StateFormatError("ヘッダーが短すぎます")
+    magic, version, length = _HEADER.unpack_from(data)
+    if magic != STATE_MAGIC:
+        raise StateFormatError("状態ファイルではありません")
+    if version != STATE_VERSION:
+        raise StateFormatError(f"対応していないバージョンです: {version}")
+    body = data[_HEADER.size:_HEADER.size + length]
+    if len(body) != length:
+        raise StateFormatError("本体が途中で切れています")
+    try:
+        return json.loads(zlib.decompress(body).decode('utf-8'))
+    except (zlib.error, ValueError) as e:
+        raise StateFormatError(f"本体を読めません: {e}") from e
+
+
+def save_state(path, state):
+    with open(path, 'wb') as f:
+        f.write(encode_state(state))
+
+
+def load_state(path):
+    with open(path, 'rb') as f:
+        return decode_state(f.read())
+
+
+class StateRing:
+    """一定間隔で取った状態を新しい順に capacity 個まで持つ（古いものから捨てる）
+
+    状態は capture_state() が毎回新しく作るので、そのまま持つ（書き換えないこと）。
+    """
+
+    def __init__(self, capacity):
+        self.states = deque(maxlen=capacity)
+
+    def __len__(self):
+        return len(self.states)
+
+    def clear(self):
+        self.states.clear()
+
+    def push(self, game_time, state):
+        self.states.append((game_time, state))
+
+    def rewind(self, target_time):
+        """game_time が target_time 以前の最も新しい状態（なければ最も古い状態、空なら None）
+
+        それより新しい状態は捨てる。返した状態は残すので、続けて呼ぶとさらに戻れる。
+        """
+        states = self.states
+        while len(states) > 1 and states[-1][0] > target_time:
+            states.pop()
+        return states[-1][1] if states else None
@@ -0,0 +1,210 @@
+"""yokero のスコア履歴（SQLite）
+
+すべてのプレイを1行ずつ保存する。書き込みは専用スレッドで行い、
+読み込み（ランキング・自己ベスト・パーセンタイル・日別集計）は呼び出し元のスレッドで行う。
+"""
+import queue
+import sqlite3
+import sys
+import threading
+import time
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    score INTEGER NOT NULL,
+    played_at REAL,            -- UNIX 時刻（scores.json から取り込んだ記録は NULL）
+    day TEXT,                  -- ローカル日付 YYYY-MM-DD（日別集計用）
+    duration_frames INTEGER,
+    items_collected INTEGER,
+    seed INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_runs_score ON runs (score DESC);
+CREATE INDEX IF NOT EXISTS idx_runs_day ON runs (day, score);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+_STOP = object()
+
+
+class ScoreStore:
+    """SQLite のスコア履歴"""
+
+    def __init__(self, path='scores.db'):
+        self.path = path
+        self._local = threading.local()
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+        with self._connection() as conn:
+            conn.executescript(SCHEMA)
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=5.0)
+        # 書き込み中でも読み込みがブロックされないようにする
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        return conn
+
+    def _connection(self):
+        """スレッドごとの接続（sqlite3 の接続はスレッド間で共有しない）"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._local.conn = self._connect()
+        return conn
+
+    def json_imported(self):
+        """scores.json の記録を取り込み済みか"""
+        return self._connection().execute("SELECT 1 FROM meta WHERE key = 'json_imported'").fetchone() is not None
+
+    def import_scores(self, scores):
+        """初回起動時に scores.json から読んだスコアを取り込み、取り込み済みにする（取り込み済みなら何もしない）
+
+        ファイルを読めなかったときは呼ばないこと（取り込み済みになり、次回以降も取り込まれない）。
+        """
+        conn = self._connection()
+        if self.json_imported():
+            return 0
+        with conn:
+            conn.executemany("INSERT INTO runs (score) VALUES (?)", [(score,) for score in scores])
+            conn.execute("INSERT INTO meta (key, value) VALUES ('json_imported', ?)", (str(time.time()),))
+        return len(scores)
+
+    # --- 書き込み（バックグラウンド） ---
+
+    def add_run(self, score, duration_frames=None, items_collected=None, seed=None, played_at=None):
+        """プレイ結果を保存する（キューに積むだけですぐに戻る）"""
+        if played_at is None:
+            played_at = time.time()
+        day = time.strftime('%Y-%m-%d', time.localtime(played_at))
+        row = (score, played_at, day, duration_frames, items_collected, seed)
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='score-store', daemon=True)
+                self._thread.start()
+        self._queue.put(row)
+
+    def _run(self):
+        conn = self._connection()
+        try:
+            while True:
+                row = self._queue.get()
+                try:
+                    if row is _STOP:
+                        return
+                    # たまっている分はまとめて1トランザクションで書く
+                    rows = [row]
+                    stop = False
+                    while True:
+                        try:
+                            extra = self._queue.get_nowait()
+                        except queue.Empty:
+                            break
+                        if extra is _STOP:
+                            stop = True
+                            self._queue.task_done()
+                            break
+                        rows.append(extra)
+                        self._queue.task_done()
+                    try:
+                        with conn:
+                            conn.executemany(
+                                "INSERT INTO runs (score, played_at, day, duration_frames, items_collected, seed) "
+                                "VALUES (?, ?, ?, ?, ?, ?)", rows)
+                    except sqlite3.Error as e:
+                        print(f"スコア履歴の保存に失敗しました: {e}", file=sys.stderr)
+                    if stop:
+                        return
+                finally:
+                    self._queue.task_done()
+        finally:
+            # 書き込みスレッドの接続はこのスレッドで閉じる（close() が閉じるのは呼び出し元のスレッドの接続）
+            conn.close()
+            self._local.conn = None
+
+    def flush(self):
+        """キューに積まれた記録がすべて書かれるまで待つ"""
+        if self._thread is not None:
+            self._queue.join()
+
+    def close(self):
+        """書き込みスレッドを止めて接続を閉じる（そのあと add_run() を呼ぶと、書き込みスレッドを作り直す）"""
+        with self._lock:
+            thread = self._thread
+            self._thread = None
+        if thread is not None and thread.is_alive():
+            self._queue.put(_STOP)
+            thread.join(5.0)
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    # --- 読み込み ---
+
+    def top_scores(self, limit=10):
+        """上位 limit 件のスコア"""
+        rows = self._connection().execute(
+            "SELECT score FROM runs ORDER BY score DESC LIMIT ?", (limit,)).fetchall()
+        return [row[0] for row in rows]
+
+    def top_runs(self, limit=10):
+        """上位 limit 件のプレイ（辞書のリスト）"""
+        cursor = self._connection().execute(
+            "SELECT score, played_at, duration_frames, items_collected, seed FROM runs "
+            "ORDER BY score DESC LIMIT ?", (limit,))
+        columns = [column[0] for column in cursor.description]
+        return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+    def personal_best(self):
+        row = self._connection().execute("SELECT MAX(score) FROM runs").fetchone()
+        return row[0] or 0
+
+    def count(self):
+        return self._connection().execute("SELECT COUNT(*) FROM runs").fetchone()[0]
+
+    def percentile_of(self, score):
+        """score より低いプレイの割合（0〜100）"""
+        conn = self._connection()
+        total = conn.execute("SELECT COUNT(*) FROM runs").fetchone()[0]
+        if total == 0:
+            return 100.0
+        below = conn.execute("SELECT COUNT(*) FROM runs WHERE score < ?", (score,)).fetchone()[0]
+        return below * 100.0 / total
+
+    def daily_stats(self, days=30):
+        """日別の集計（新しい日から days 日分）"""
+        cursor = self._connection().execute(
+            "SELECT day, COUNT(*) AS runs, MAX(score) AS best, AVG(score) AS average, "
+            "SUM(duration_frames) AS total_frames, SUM(items_collected) AS items "
+            "FROM runs WHERE day IS NOT NULL GROUP BY day ORDER BY day DESC LIMIT ?", (days,))
+        columns = [column[0] for column in cursor.description]
+        return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+
+def main(argv=None):
+    """スコア履歴の集計を表示"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="yokero のスコア履歴を表示")
+    parser.add_argument('--db', default='scores.db', help="SQLite ファイル")
+    parser.add_argument('--days', type=int, default=14, help="日別集計の日数")
+    parser.add_argument('--percentile', type=int, metavar='SCORE', help="このスコアのパーセンタイルを表示")
+    args = parser.parse_args(argv)
+
+    store = ScoreStore(args.db)
+    print(f"プレイ数: {store.count()}  自己ベスト: {store.personal_best()}")
+    print("トップ10:", ', '.join(str(score) for score in store.top_scores(10)))
+    if args.percentile is not None:
+        print(f"スコア {args.percentile} は下位から {store.percentile_of(args.percentile):.1f}% の位置です")
+    for row in store.daily_stats(args.days):
+        print(f"  {row['day']}  {row['runs']:4d}回  ベスト {row['best']:5d}  平均 {row['average']:7.1f}")
+    store.close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
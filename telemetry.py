@@ -0,0 +1,264 @@
+"""yokero のパフォーマンス記録（テレメトリ）
+
+1フレームごとにフレーム時間・処理の内訳・予定の時刻からの遅れ・オブジェクトの数・画面の状態・ゲーム時間・GC を記録する。
+一時停止・リザルト画面で入力を待ったフレームは idle が 1 で、frame_ms に待った時間も入るので、解析では数えない。
+記録はメモリにためておき、バックグラウンドスレッドが一定間隔でまとめてファイルに書くので、
+ゲームループではディスク書き込みが発生しない。
+
+形式は拡張子で決まる（.csv なら CSV、それ以外は JSON Lines）。CSV の events / gc 列は JSON の文字列。
+
+記録の解析（カクつきの検出と、その直前に起きたイベントとの関係）:
+
+    python telemetry.py session.jsonl
+    python telemetry.py session.csv --threshold 25 --window 5
+"""
+import csv
+import gc
+import json
+import sys
+import threading
+import time
+
+# 1フレームの記録の列（CSV の列順）
+COLUMNS = ('t', 'frame', 'state', 'game_time', 'frame_ms', 'update_ms', 'draw_ms', 'flip_ms', 'busy_ms', 'late_ms',
+           'idle', 'obstacles', 'items', 'particles', 'wind', 'effects', 'events', 'gc')
+_JSON_COLUMNS = ('events', 'gc')
+
+
+class TelemetryRecorder:
+    """1フレームごとの記録をファイルに書き出す
+
+    event() でそのフレームに起きた出来事（障害物の生成・速度上昇など）を登録し、
+    record_frame() でフレームの記録を確定する。GC は gc.callbacks で自動的に記録する。
+    """
+
+    def __init__(self, path, flush_interval=1.0, max_buffer=600):
+        self.path = path
+        self.format = 'csv' if path.lower().endswith('.csv') else 'jsonl'
+        self.flush_interval = flush_interval
+        self.max_buffer = max_buffer
+        self.frames = 0
+        self._started = time.perf_counter()
+        self._events = []  # このフレームの出来事（ゲームスレッドだけが触る）
+        self._gc = []  # 前回の record_frame() 以降の GC
+        self._gc_start = None
+        self._condition = threading.Condition()
+        self._buffer = []
+        self._closed = False
+        self._file = open(path, 'w', encoding='utf-8', newline='')
+        self._csv = None
+        if self.format == 'csv':
+            self._csv = csv.writer(self._file)
+            self._csv.writerow(COLUMNS)
+        gc.callbacks.append(self._on_gc)
+        self._thread = threading.Thread(target=self._run, name='telemetry', daemon=True)
+        self._thread.start()
+
+    # --- ゲームスレッドから呼ぶ ---
+
+    def event(self, name, **data):
+        """このフレームに起きた出来事を登録する"""
+        data['name'] = name
+        self._events.append(data)
+
+    def record_frame(self, **sample):
+        """フレームの記録を確定してバッファに積む（すぐに戻る）"""
+        gc_events, self._gc = self._gc, []
+        sample = {'t': round(time.perf_counter() - self._started, 4), 'frame': self.frames,
+                  **sample, 'events': self._events, 'gc': gc_events}
+        self._events = []
+        self.frames += 1
+        with self._condition:
+            self._buffer.append(sample)
+            if len(self._buffer) >= self.max_buffer:
+                self._condition.notify()
+
+    def close(self, timeout=5.0):
+        """残りを書き出してファイルを閉じる"""
+        with self._condition:
+            if self._closed:
+                return
+            self._closed = True
+            self._condition.notify()
+        if self._on_gc in gc.callbacks:
+            gc.callbacks.remove(self._on_gc)
+        self._thread.join(timeout)
+
+    def _on_gc(self, phase, info):
+        if phase == 'start':
+            self._gc_start = time.perf_counter()
+        elif self._gc_start is not None:
+            self._gc.append({'generation': info['generation'], 'collected': info['collected'],
+                             'ms': round((time.perf_counter() - self._gc_start) * 1000, 3)})
+            self._gc_start = None
+
+    # --- バックグラウンドスレッド ---
+
+    def _run(self):
+        try:
+            while True:
+                with self._condition:
+                    self._condition.wait_for(
+                        lambda: self._closed or len(self._buffer) >= self.max_buffer, self.flush_interval)
+                    samples = self._buffer
+                    self._buffer = []
+                    closed = self._closed
+                if samples:
+                    try:
+                        self._write(samples)
+                    except OSError as e:
+                        print(f"テレメトリの書き込みに失敗しました: {e}", file=sys.stderr)
+                if closed:
+                    return
+        finally:
+            self._file.close()
+
+    def _write(self, samples):
+        if self._csv:
+            for sample in samples:
+                self._csv.writerow([json.dumps(sample.get(column), ensure_ascii=False)
+                                    if column in _JSON_COLUMNS else sample.get(column, '')
+                                    for column in COLUMNS])
+        else:
+            self._file.writelines(json.dumps(sample, ensure_ascii=False, separators=(',', ':')) + '\n'
+                                  for sample in samples)
+        self._file.flush()
+
+
+# --- 解析 ---
+
+def load_samples(path):
+    """記録ファイル（JSON Lines または CSV）を読み込む"""
+    samples = []
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        if path.lower().endswith('.csv'):
+            for row in csv.DictReader(f):
+                sample = {}
+                for key, value in row.items():
+                    if key in _JSON_COLUMNS:
+                        sample[key] = json.loads(value) if value else []
+                    elif key == 'state' or value == '':
+                        sample[key] = value
+                    else:
+                        sample[key] = float(value)
+                samples.append(sample)
+        else:
+            for line in f:
+                if line.strip():
+                    samples.append(json.loads(line))
+    return samples
+
+
+def _percentile(sorted_values, ratio):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * ratio))]
+
+
+def _frame_tags(sample, previous_state):
+    """フレームに起きた出来事の名前（状態の切り替わりと GC も含む）"""
+    tags = [event['name'] for event in sample.get('events') or ()]
+    tags += [f"gc{entry['generation']}" for entry in sample.get('gc') or ()]
+    if previous_state is not None and sample.get('state') != previous_state:
+        tags.append(f"state:{sample.get('state')}")
+    return tags
+
+
+def analyze(samples, threshold_ms=None, factor=2.0, window=3):
+    """カクつき（frame_ms が閾値を超えたフレーム）を探し、出来事との関係を集計する
+
+    threshold_ms を省略すると、フレーム時間の中央値の factor 倍（ただし 1.5 フレーム分以上）を閾値にする。
+    出来事は、そのフレームから window フレーム後までのカクつきと関係があるとみなす。
+    入力を待ったフレーム（idle）は、待った時間がフレーム時間に入っているので除く（index は除いたあとの番号）。
+    """
+    idle_frames = sum(1 for sample in samples if sample.get('idle'))
+    if idle_frames:
+        samples = [sample for sample in samples if not sample.get('idle')]
+    frame_times = sorted(sample['frame_ms'] for sample in samples)
+    median = _percentile(frame_times, 0.5)
+    if threshold_ms is None:
+        threshold_ms = max(median * factor, 1000 / 60 * 1.5)
+    hitch_indices = [i for i, sample in enumerate(samples) if sample['frame_ms'] > threshold_ms]
+    hitch_set = set(hitch_indices)
+
+    tags_per_frame = []
+    previous_state = None
+    for sample in samples:
+        tags_per_frame.append(_frame_tags(sample, previous_state))
+        previous_state = sample.get('state')
+
+    # 出来事ごとに「window フレーム以内にカクつきが起きた割合」を数える
+    followed = [any(j in hitch_set for j in range(i, i + window + 1)) for i in range(len(samples))]
+    by_tag = {}
+    for tags, hitch_follows in zip(tags_per_frame, followed):
+        for tag in tags:
+            stats = by_tag.setdefault(tag, {'count': 0, 'hitches': 0})
+            stats['count'] += 1
+            stats['hitches'] += hitch_follows
+    # 任意のフレームの後にカクつきが起きる割合（比較用）
+    base_rate = sum(followed) / len(samples) if samples else 0.0
+
+    hitches = []
+    for i in hitch_indices:
+        sample = samples[i]
+        nearby = []
+        for j in range(max(0, i - window), i + 1):
+            nearby += tags_per_frame[j]
+        hitches.append({'index': i, 'sample': sample, 'nearby': nearby})
+
+    return {
+        'frames': len(samples),
+        'idle_frames': idle_frames,
+        'mean_ms': sum(frame_times) / len(frame_times) if frame_times else 0.0,
+        'median_ms': median,
+        'p95_ms': _percentile(frame_times, 0.95),
+        'p99_ms': _percentile(frame_times, 0.99),
+        'max_ms': frame_times[-1] if frame_times else 0.0,
+        'threshold_ms': threshold_ms,
+        'hitches': hitches,
+        'by_tag': by_tag,
+        'base_rate': base_rate,
+    }
+
+
+def main(argv=None):
+    """記録ファイルのカクつきを表示"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="yokero のテレメトリを解析してカクつきの原因を探す")
+    parser.add_argument('path', help="記録ファイル（.jsonl または .csv）")
+    parser.add_argument('--threshold', type=float, metavar='MS', help="カクつきとみなすフレーム時間（省略時は中央値の2倍）")
+    parser.add_argument('--window', type=int, default=3, help="出来事の後、何フレームまでのカクつきを関係ありとみなすか")
+    parser.add_argument('--top', type=int, default=15, help="表示するカクつきの数（重い順）")
+    args = parser.parse_args(argv)
+
+    samples = load_samples(args.path)
+    if not samples:
+        print("記録がありません")
+        return 1
+    report = analyze(samples, args.threshold, window=args.window)
+    hitches = report['hitches']
+    idle = f"、入力待ち {report['idle_frames']} フレームを除く" if report['idle_frames'] else ''
+    print(f"フレーム数: {report['frames']}（{samples[-1]['t']:.1f}秒{idle}）")
+    print(f"フレーム時間: 平均 {report['mean_ms']:.2f} ms  中央値 {report['median_ms']:.2f} ms  "
+          f"p95 {report['p95_ms']:.2f} ms  p99 {report['p99_ms']:.2f} ms  最大 {report['max_ms']:.2f} ms")
+    print(f"カクつき（{report['threshold_ms']:.1f} ms 超）: {len(hitches)}回")
+
+    if hitches:
+        print(f"\n重いフレーム（上位 {args.top}）:")
+        for hitch in sorted(hitches, key=lambda h: h['sample']['frame_ms'], reverse=True)[:args.top]:
+            s = hitch['sample']
+            nearby = ', '.join(hitch['nearby']) or '-'
+            print(f"  #{int(s['frame']):6d} {s['t']:8.2f}s {s['state']:<8} {s['frame_ms']:7.2f} ms "
+                  f"(更新 {s['update_ms']:.1f} / 描画 {s['draw_ms']:.1f} / flip {s['flip_ms']:.1f})  {nearby}")
+
+    if report['by_tag']:
+        print(f"\n出来事の後 {args.window} フレーム以内にカクつきが起きた割合（全フレーム平均: {report['base_rate']:.1%}）:")
+        ranked = sorted(report['by_tag'].items(), key=lambda item: item[1]['hitches'] / item[1]['count'], reverse=True)
+        for tag, stats in ranked:
+            print(f"  {tag:<16} {stats['hitches']:5d} / {stats['count']:5d}  ({stats['hitches'] / stats['count']:.1%})")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
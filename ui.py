@@ -0,0 +1,117 @@
+"""yokero の UI 部品（ボタン・モーダルウインドウ）
+
+画面ごとに部品の木（WidgetTree）を一度だけ作り、部品の位置と大きさは固定する（論理座標）。
+
+- 当たり判定は、作るときに用意する格子状の索引（セルごとの部品の一覧）で探す
+- マウスの位置と左ボタンの状態は update_pointer() で反映し、見た目が変わった部品の範囲（dirty rect）を返す
+- 見た目は style（Game）に任せる。style.draw_widget(target, widget) で描き、
+  style.widget_bounds(widget) で描く範囲（影を含む）を返す。見た目は状態ごとに style 側でキャッシュする
+
+背景が変わらない画面では redraw() で、見た目が変わった部品の範囲だけを描き直せる。
+"""
+import pygame
+
+
+class Button:
+    """ボタン（action はクリックされたときに WidgetTree.click() が返す値）"""
+    __slots__ = ('rect', 'text', 'action', 'font_size', 'hover', 'pressed', 'drawn_rect')
+
+    def __init__(self, rect, text, action, font_size=32):
+        self.rect = pygame.Rect(rect)  # 当たり判定
+        self.text = text
+        self.action = action
+        self.font_size = font_size
+        self.hover = False
+        self.pressed = False  # hover 中に左ボタンが押されている
+        self.drawn_rect = None  # 最後に描いた範囲（影を含む）
+
+
+class WidgetTree:
+    """1つの画面（またはモーダルウインドウ）の部品
+
+    bounds を指定するとモーダルウインドウとして扱い、bounds の外側のクリックで outside_action を返す。
+    """
+    CELL = 64  # 当たり判定の索引のセルの大きさ
+
+    def __init__(self, widgets, style, bounds=None, outside_action=None):
+        self.widgets = list(widgets)
+        self.style = style
+        self.bounds = pygame.Rect(bounds) if bounds else None
+        self.outside_action = outside_action
+        self._index = {}
+        for widget in reversed(self.widgets):
+            # 後ろの部品ほど上に描くので、索引では先に並べる
+            for cell in self._cells(widget.rect):
+                self._index.setdefault(cell, []).append(widget)
+
+    def _cells(self, rect):
+        cell = self.CELL
+        for cx in range(rect.left // cell, (rect.right - 1) // cell + 1):
+            for cy in range(rect.top // cell, (rect.bottom - 1) // cell + 1):
+                yield cx, cy
+
+    def hit_test(self, pos):
+        """pos にある部品（なければ None）"""
+        x, y = pos
+        for widget in self._index.get((x // self.CELL, y // self.CELL), ()):
+            if widget.rect.collidepoint(x, y):
+                return widget
+        return None
+
+    def click(self, pos):
+        """pos をクリックしたときの action（何もなければ None）"""
+        widget = self.hit_test(pos)
+        if widget is not None:
+            return widget.action
+        if self.bounds is not None and not self.bounds.collidepoint(pos):
+            return self.outside_action
+        return None
+
+    def update_pointer(self, pos, pressed):
+        """マウスの状態を反映し、見た目が変わった範囲のリストを返す（pos が None ならどの部品にも乗っていない）"""
+        hovered = self.hit_test(pos) if pos is not None else None
+        dirty = []
+        for widget in self.widgets:
+            hover = widget is hovered
+            widget_pressed = hover and pressed
+            if hover == widget.hover and widget_pressed == widget.pressed:
+                continue
+            widget.hover = hover
+            widget.pressed = widget_pressed
+            rect = self.style.widget_bounds(widget)
+            dirty.append(rect.union(widget.drawn_rect) if widget.drawn_rect else rect)
+        return dirty
+
+    def reset_pointer(self):
+        """どの部品にも乗っていない状態に戻す（画面を切り替えたとき）"""
+        self.update_pointer(None, False)
+
+    def draw(self, target):
+        """すべての部品を描く"""
+        style = self.style
+        for widget in self.widgets:
+            widget.drawn_rect = style.draw_widget(target, widget)
+
+    def redraw(self, target, background, dirty):
+        """dirty の範囲を background（部品を描く前の画面）で消し、重なる部品だけを描き直す
+
+        target は Surface（範囲の外を書き換えないよう set_clip() で切り抜く）。描き直した範囲を返す。
+        """
+        area = target.get_rect()
+        redrawn = []
+        clip = target.get_clip()
+        try:
+            for rect in dirty:
+                rect = rect.clip(area)
+                if not rect:
+                    continue
+                target.set_clip(rect)
+                target.blit(background, rect, rect)
+                for widget in self.widgets:
+                    drawn = widget.drawn_rect or self.style.widget_bounds(widget)
+                    if drawn.colliderect(rect):
+                        widget.drawn_rect = self.style.draw_widget(target, widget)
+                redrawn.append(rect)
+        finally:
+            target.set_clip(clip)
+        return redrawn
@@ -0,0 +1,438 @@
+"""yokero のボット学習・評価用の環境（Gym 形式）
+
+YokeroEnv はヘッドレスの Game をそのまま使う単一環境。
+VectorYokeroEnv は同じルールを NumPy 配列で実装し、N 個のゲームを一度に進める。
+
+行動: 0 = 何もしない, 1 = 上, 2 = 下
+観測: float32 の1次元配列（OBS_SIZE 要素）
+    [0:3]   プレイヤー（y, 高さ, 速度倍率）
+    [3:7]   アイテム効果の残り時間の割合（ITEM_TYPES の順）
+    [7:47]  前方の近い障害物 OBS_OBSTACLES 個 × (dx, y, 幅, 高さ, 速度)
+    [47:53] 前方の近いアイテム OBS_ITEMS 個 × (dx, y, 種類)
+座標は画面サイズで、速度は OBSTACLE_SPEED_SCALE で正規化している。
+存在しない枠は 0 で埋める。
+"""
+import os
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+
+import numpy as np
+import pygame
+
+from main import DEFAULT_TUNABLES, Game, GameState, SCREEN_HEIGHT, SCREEN_WIDTH
+
+ITEM_TYPES = ('speed', 'shrink', 'obstacle_shrink', 'slow')
+
+# 障害物の種類（Game.spawn_obstacle と同じ）: (幅, 最小の高さ, 最大の高さ)
+OBSTACLE_TYPES = np.array([
+    (40, 80, 200),
+    (60, 60, 60),
+    (80, 40, 60),
+    (30, 100, 180),
+    (50, 50, 50),
+], dtype=np.int64)
+
+# プレイヤーとアイテムの初期値（Player / Item と同じ）
+PLAYER_X = 50
+PLAYER_WIDTH = 40
+PLAYER_HEIGHT = 60
+PLAYER_SPEED = 7
+ITEM_SIZE = 30
+ITEM_SPEED = 3
+
+# アイテム効果の倍率（Game.update_game と同じ）
+SPEED_BOOST = 1.5
+PLAYER_SHRINK = 0.6
+OBSTACLE_SHRINK = 0.7
+OBSTACLE_SLOW = 0.7
+
+OBS_OBSTACLES = 8
+OBS_ITEMS = 2
+OBSTACLE_FEATURES = 5
+ITEM_FEATURES = 3
+OBS_SIZE = 3 + len(ITEM_TYPES) + OBS_OBSTACLES * OBSTACLE_FEATURES + OBS_ITEMS * ITEM_FEATURES
+OBSTACLE_SPEED_SCALE = 10.0
+
+ACTION_KEYS = (
+    (False, False),  # 0: 何もしない
+    (True, False),   # 1: 上
+    (False, True),   # 2: 下
+)
+
+
+def _nearest_ahead(dx, valid, count):
+    """各行で前方（dx が小さい順）の count 個のインデックスと有効フラグを返す"""
+    keyed = np.where(valid, dx, np.inf)
+    if keyed.shape[1] > count:
+        order = np.argpartition(keyed, count - 1, axis=1)[:, :count]
+    else:
+        order = np.broadcast_to(np.arange(keyed.shape[1]), keyed.shape).copy()
+    picked = np.take_along_axis(keyed, order, axis=1)
+    sort = np.argsort(picked, axis=1, kind='stable')
+    order = np.take_along_axis(order, sort, axis=1)
+    present = np.isfinite(np.take_along_axis(keyed, order, axis=1))
+    if order.shape[1] < count:
+        pad = count - order.shape[1]
+        order = np.pad(order, ((0, 0), (0, pad)))
+        present = np.pad(present, ((0, 0), (0, pad)))
+    return order, present
+
+
+def build_observations(player_y, player_h, player_speed, effect_remaining,
+                       obstacles, obstacle_valid, items, item_valid):
+    """配列からバッチの観測を組み立てる
+
+    obstacles: (N, M, 5) = x, y, 幅, 高さ, 速度
+    items:     (N, L, 3) = x, y, 種類（1 始まり）
+    """
+    n = player_y.shape[0]
+    obs = np.zeros((n, OBS_SIZE), dtype=np.float32)
+    obs[:, 0] = player_y / SCREEN_HEIGHT
+    obs[:, 1] = player_h / SCREEN_HEIGHT
+    obs[:, 2] = player_speed / PLAYER_SPEED
+    obs[:, 3:7] = effect_remaining
+
+    offset = 7
+    if obstacles.shape[1]:
+        # プレイヤーを通り過ぎていない障害物のみ
+        ahead = obstacle_valid & (obstacles[:, :, 0] + obstacles[:, :, 2] > PLAYER_X)
+        order, present = _nearest_ahead(obstacles[:, :, 0] - PLAYER_X, ahead, OBS_OBSTACLES)
+        picked = np.take_along_axis(obstacles, order[:, :, None], axis=1)
+        features = np.stack([
+            (picked[:, :, 0] - PLAYER_X) / SCREEN_WIDTH,
+            picked[:, :, 1] / SCREEN_HEIGHT,
+            picked[:, :, 2] / SCREEN_WIDTH,
+            picked[:, :, 3] / SCREEN_HEIGHT,
+            picked[:, :, 4] / OBSTACLE_SPEED_SCALE,
+        ], axis=2) * present[:, :, None]
+        obs[:, offset:offset + OBS_OBSTACLES * OBSTACLE_FEATURES] = features.reshape(n, -1)
+    offset += OBS_OBSTACLES * OBSTACLE_FEATURES
+
+    if items.shape[1]:
+        ahead = item_valid & (items[:, :, 0] + ITEM_SIZE > PLAYER_X)
+        order, present = _nearest_ahead(items[:, :, 0] - PLAYER_X, ahead, OBS_ITEMS)
+        picked = np.take_along_axis(items, order[:, :, None], axis=1)
+        features = np.stack([
+            (picked[:, :, 0] - PLAYER_X) / SCREEN_WIDTH,
+            picked[:, :, 1] / SCREEN_HEIGHT,
+            picked[:, :, 2] / len(ITEM_TYPES),
+        ], axis=2) * present[:, :, None]
+        obs[:, offset:offset + OBS_ITEMS * ITEM_FEATURES] = features.reshape(n, -1)
+    return obs
+
+
+class YokeroEnv:
+    """ヘッドレスの Game を使う単一環境
+
+    reset(seed) -> (obs, info)
+    step(action) -> (obs, reward, terminated, truncated, info)
+    報酬はスコアの増加量（0.1秒ごとに +1、アイテムで +100）。
+    """
+
+    def __init__(self, tunables=None, max_frames=None):
+        self.game = Game(tunables=tunables, headless=True)
+        self.max_frames = max_frames
+        self._keys = {pygame.K_UP: False, pygame.K_DOWN: False}
+
+    def reset(self, seed=None):
+        game = self.game
+        game.state = GameState.PLAYING
+        # base_obstacle_speed は速度上昇でゲームをまたいで増えるので、毎回初期値に戻す
+        game.base_obstacle_speed = game.tunables['base_obstacle_speed']
+        game.reset_game()
+        if seed is not None:
+            game.reseed(seed)
+        game.start_play()
+        return self._observation(), self._info()
+
+    def step(self, action):
+        game = self.game
+        score_before = game.score
+        self._keys[pygame.K_UP], self._keys[pygame.K_DOWN] = ACTION_KEYS[action]
+        game.update_game(self._keys)
+        reward = game.score - score_before
+        # 衝突した時点（ゲームオーバー演出の開始）で終了とする
+        terminated = game.game_over_effect_timer > 0 or game.state != GameState.PLAYING
+        truncated = self.max_frames is not None and game.game_time >= self.max_frames
+        return self._observation(), float(reward), terminated, truncated, self._info()
+
+    def _info(self):
+        game = self.game
+        return {'score': game.score, 'frames': game.game_time, 'items': game.items_collected}
+
+    def _observation(self):
+        game = self.game
+        player = game.player
+        effects = game.item_effects
+        remaining = np.array([[
+            1 - effects[name]['timer'] / effects[name]['duration'] if effects[name]['active'] else 0.0
+            for name in ITEM_TYPES
+        ]])
+        obstacles = np.array([[(o.x, o.y, o.width, o.height, o.speed) for o in game.obstacles]],
+                             dtype=np.float64).reshape(1, -1, 5)
+        items = np.array([[(i.x, i.y, ITEM_TYPES.index(i.type) + 1) for i in game.items if not i.collected]],
+                         dtype=np.float64).reshape(1, -1, 3)
+        return build_observations(
+            np.array([player.y], dtype=np.float64), np.array([player.height], dtype=np.float64),
+            np.array([player.speed], dtype=np.float64), remaining,
+            obstacles, np.ones(obstacles.shape[:2], dtype=bool),
+            items, np.ones(items.shape[:2], dtype=bool),
+        )[0]
+
+
+class VectorYokeroEnv:
+    """N 個の独立したゲームを配列で一度に進める環境
+
+    ルールは Game.update_game と同じだが、乱数列は NumPy のものを使うため
+    同じシードでも YokeroEnv とは別の展開になる。
+    終了したゲームは step の中で自動的にリセットされ、
+    その時の成績は info['final_score'] / info['final_frames'] に入る（それ以外は -1）。
+    """
+
+    def __init__(self, num_envs, tunables=None, max_frames=None, capacity=64, item_capacity=8):
+        self.num_envs = num_envs
+        self.tunables = dict(DEFAULT_TUNABLES, **(tunables or {}))
+        self.max_frames = max_frames
+        self.capacity = capacity
+        self.item_capacity = item_capacity
+        self.rng = np.random.default_rng()
+        self._allocate()
+
+    def _allocate(self):
+        n = self.num_envs
+        # プレイヤー（速度・サイズはアイテム効果の適用後の値）
+        self.player_y = np.zeros(n)
+        self.player_speed = np.zeros(n)
+        self.player_w = np.zeros(n, dtype=np.int64)
+        self.player_h = np.zeros(n, dtype=np.int64)
+        # 障害物: x, y, 基本の幅, 基本の高さ, 基本速度 と生存フラグ
+        self.ob_x = np.zeros((n, self.capacity))
+        self.ob_y = np.zeros((n, self.capacity))
+        self.ob_base_w = np.zeros((n, self.capacity))
+        self.ob_base_h = np.zeros((n, self.capacity))
+        self.ob_base_speed = np.zeros((n, self.capacity))
+        self.ob_alive = np.zeros((n, self.capacity), dtype=bool)
+        # アイテム: x, y, 種類（1 始まり）と生存フラグ
+        self.it_x = np.zeros((n, self.item_capacity))
+        self.it_y = np.zeros((n, self.item_capacity))
+        self.it_type = np.zeros((n, self.item_capacity), dtype=np.int64)
+        self.it_alive = np.zeros((n, self.item_capacity), dtype=bool)
+        # アイテム効果の経過フレーム + 1（ITEM_TYPES の順、0 = 無効）
+        self.effect_timer = np.zeros((n, len(ITEM_TYPES)), dtype=np.int64)
+        # 進行状況
+        self.score = np.zeros(n, dtype=np.int64)
+        self.items_collected = np.zeros(n, dtype=np.int64)
+        self.game_time = np.zeros(n, dtype=np.int64)
+        self.score_timer = np.zeros(n, dtype=np.int64)
+        self.last_obstacle_spawn = np.zeros(n, dtype=np.int64)
+        self.last_item_spawn = np.zeros(n, dtype=np.int64)
+        self.last_speed_up = np.zeros(n, dtype=np.int64)
+        self.last_obstacle_count_increase = np.zeros(n, dtype=np.int64)
+        self.obstacle_increase_counter = np.zeros(n, dtype=np.int64)
+        self.obstacle_spawn_interval = np.zeros(n, dtype=np.int64)
+        self.obstacle_spawn_count = np.zeros(n, dtype=np.int64)
+        self.obstacle_speed = np.zeros(n)
+
+    def reset(self, seed=None):
+        if seed is not None:
+            self.rng = np.random.default_rng(seed)
+        self._reset_envs(np.ones(self.num_envs, dtype=bool))
+        return self._observations(), self._info()
+
+    def _reset_envs(self, mask):
+        tunables = self.tunables
+        self.player_y[mask] = SCREEN_HEIGHT // 2 - PLAYER_HEIGHT // 2
+        self.player_speed[mask] = PLAYER_SPEED
+        self.player_w[mask] = PLAYER_WIDTH
+        self.player_h[mask] = PLAYER_HEIGHT
+        self.ob_alive[mask] = False
+        self.it_alive[mask] = False
+        self.effect_timer[mask] = 0
+        for name in ('score', 'items_collected', 'game_time', 'score_timer', 'last_obstacle_spawn',
+                     'last_item_spawn', 'last_speed_up', 'last_obstacle_count_increase',
+                     'obstacle_increase_counter'):
+            getattr(self, name)[mask] = 0
+        self.obstacle_spawn_interval[mask] = tunables['obstacle_spawn_interval']
+        self.obstacle_spawn_count[mask] = 1
+        self.obstacle_speed[mask] = tunables['base_obstacle_speed']
+
+    def step(self, actions):
+        """actions: (N,) の行動配列"""
+        tunables = self.tunables
+        actions = np.asarray(actions)
+        score_before = self.score.copy()
+
+        # 時間とスコア
+        self.game_time += 1
+        self.score_timer += 1
+        scored = self.score_timer >= 6
+        self.score += scored
+        self.score_timer[scored] = 0
+
+        # 障害物の生成
+        spawn = self.game_time - self.last_obstacle_spawn >= self.obstacle_spawn_interval
+        if spawn.any():
+            self._spawn_obstacles(spawn)
+            self.last_obstacle_spawn[spawn] = self.game_time[spawn]
+            shorten = spawn & (self.obstacle_spawn_interval > tunables['min_obstacle_spawn_interval'])
+            self.obstacle_spawn_interval[shorten] -= 1
+
+        # 障害物の数を増やす
+        increase = self.game_time - self.last_obstacle_count_increase >= tunables['obstacle_count_interval']
+        if increase.any():
+            self.obstacle_increase_counter[increase] += self.obstacle_spawn_count[increase]
+            self.last_obstacle_count_increase[increase] = self.game_time[increase]
+            grow = increase & (self.obstacle_increase_counter % tunables['obstacle_count_step'] == 0)
+            self.obstacle_spawn_count[grow] += 1
+
+        # アイテムの生成
+        item_roll = self.game_time - self.last_item_spawn >= tunables['item_spawn_interval']
+        if item_roll.any():
+            chance = self.rng.random(self.num_envs) < tunables['item_spawn_chance']
+            self._spawn_items(item_roll & chance)
+            self.last_item_spawn[item_roll] = self.game_time[item_roll]
+
+        # 速度上昇（すべての障害物の基本速度も更新）
+        speed_up = self.game_time - self.last_speed_up >= tunables['speed_up_interval']
+        if speed_up.any():
+            self.obstacle_speed[speed_up] += tunables['speed_up_step']
+            self.last_speed_up[speed_up] = self.game_time[speed_up]
+            self.ob_base_speed[speed_up] = self.obstacle_speed[speed_up, None]
+
+        # プレイヤーの移動（前のフレームで適用した速度・サイズを使う、上下の端でワープ）
+        up = actions == 1
+        down = actions == 2
+        self.player_y = np.where(up, self.player_y - self.player_speed, self.player_y)
+        self.player_y = np.where(up & (self.player_y < 0), SCREEN_HEIGHT - self.player_h, self.player_y)
+        self.player_y = np.where(down, self.player_y + self.player_speed, self.player_y)
+        self.player_y = np.where(down & (self.player_y > SCREEN_HEIGHT - self.player_h), 0, self.player_y)
+
+        # アイテム効果の経過（持続時間が終わったら解除）と適用
+        duration = tunables['item_effect_duration']
+        self.effect_timer[self.effect_timer > 0] += 1
+        self.effect_timer[self.effect_timer > duration] = 0
+        active = self.effect_timer > 0
+        self.player_speed = np.where(active[:, 0], PLAYER_SPEED * SPEED_BOOST, PLAYER_SPEED)
+        self.player_w = np.where(active[:, 1], int(PLAYER_WIDTH * PLAYER_SHRINK), PLAYER_WIDTH)
+        self.player_h = np.where(active[:, 1], int(PLAYER_HEIGHT * PLAYER_SHRINK), PLAYER_HEIGHT)
+
+        # 障害物の移動と衝突判定
+        ob_w, ob_h, ob_speed = self._obstacle_geometry(active)
+        self.ob_x -= ob_speed * self.ob_alive
+        hit = self._collide(self.ob_x, self.ob_y, ob_w, ob_h, self.ob_alive).any(axis=1)
+        self.ob_alive &= self.ob_x + ob_w >= 0
+
+        # アイテムの移動と取得判定（衝突したゲームは止まる）
+        moving = ~hit
+        self.it_x -= ITEM_SPEED * (self.it_alive & moving[:, None])
+        self.it_alive &= ~(moving[:, None] & (self.it_x + ITEM_SIZE < 0))
+        collected = self._collide(self.it_x, self.it_y, ITEM_SIZE, ITEM_SIZE, self.it_alive & moving[:, None])
+        if collected.any():
+            self.it_alive &= ~collected
+            count = collected.sum(axis=1)
+            self.score += 100 * count
+            self.items_collected += count
+            for kind in range(len(ITEM_TYPES)):
+                picked = (collected & (self.it_type == kind + 1)).any(axis=1)
+                self.effect_timer[picked, kind] = 1
+
+        reward = (self.score - score_before).astype(np.float32)
+        terminated = hit
+        truncated = np.zeros(self.num_envs, dtype=bool)
+        if self.max_frames is not None:
+            truncated = ~hit & (self.game_time >= self.max_frames)
+        info = self._info()
+        done = terminated | truncated
+        info['final_score'] = np.where(done, self.score, -1)
+        info['final_frames'] = np.where(done, self.game_time, -1)
+        if done.any():
+            self._reset_envs(done)
+        return self._observations(), reward, terminated, truncated, info
+
+    def _obstacle_geometry(self, active):
+        """アイテム効果を反映した障害物の幅・高さ・速度"""
+        shrink = np.where(active[:, 2], OBSTACLE_SHRINK, 1.0)[:, None]
+        slow = np.where(active[:, 3], OBSTACLE_SLOW, 1.0)[:, None]
+        ob_w = np.trunc(self.ob_base_w * shrink)
+        ob_h = np.trunc(self.ob_base_h * shrink)
+        return ob_w, ob_h, self.ob_base_speed * slow
+
+    def _collide(self, x, y, w, h, alive):
+        """pygame.Rect.colliderect と同じ判定（座標は整数に切り捨て）"""
+        px = PLAYER_X
+        py = np.trunc(self.player_y)[:, None]
+        ox = np.trunc(x)
+        oy = np.trunc(y)
+        return (alive & (ox < px + self.player_w[:, None]) & (ox + w > px)
+                & (oy < py + self.player_h[:, None]) & (oy + h > py))
+
+    def _free_slots(self, kind, counts):
+        """各ゲームで空いている枠を counts 個ずつ確保（足りなければ配列を拡張）"""
+        need = int(counts.max())
+        alive = self.ob_alive if kind == 'obstacle' else self.it_alive
+        if ((~alive).sum(axis=1) < counts).any():
+            if kind == 'obstacle':
+                self._grow_obstacles(need)
+                alive = self.ob_alive
+            else:
+                self._grow_items(need)
+                alive = self.it_alive
+        order = np.argsort(alive, axis=1, kind='stable')[:, :need]
+        use = np.arange(need)[None, :] < counts[:, None]
+        return order, use
+
+    def _grow_obstacles(self, need):
+        extra = max(self.capacity, need)
+        for name in ('ob_x', 'ob_y', 'ob_base_w', 'ob_base_h', 'ob_base_speed', 'ob_alive'):
+            array = getattr(self, name)
+            setattr(self, name, np.concatenate([array, np.zeros((self.num_envs, extra), dtype=array.dtype)], axis=1))
+        self.capacity += extra
+
+    def _grow_items(self, need):
+        extra = max(self.item_capacity, need)
+        for name in ('it_x', 'it_y', 'it_type', 'it_alive'):
+            array = getattr(self, name)
+            setattr(self, name, np.concatenate([array, np.zeros((self.num_envs, extra), dtype=array.dtype)], axis=1))
+        self.item_capacity += extra
+
+    def _spawn_obstacles(self, mask):
+        counts = np.where(mask, self.obstacle_spawn_count, 0)
+        slots, use = self._free_slots('obstacle', counts)
+        rows = np.broadcast_to(np.arange(self.num_envs)[:, None], slots.shape)[use]
+        cols = slots[use]
+        n = rows.shape[0]
+        kinds = OBSTACLE_TYPES[self.rng.integers(0, len(OBSTACLE_TYPES), n)]
+        heights = kinds[:, 1] + self.rng.integers(0, kinds[:, 2] - kinds[:, 1] + 1)
+        self.ob_x[rows, cols] = SCREEN_WIDTH
+        self.ob_y[rows, cols] = self.rng.integers(0, SCREEN_HEIGHT - heights + 1)
+        self.ob_base_w[rows, cols] = kinds[:, 0]
+        self.ob_base_h[rows, cols] = heights
+        self.ob_base_speed[rows, cols] = self.obstacle_speed[rows]
+        self.ob_alive[rows, cols] = True
+
+    def _spawn_items(self, mask):
+        if not mask.any():
+            return
+        slots, use = self._free_slots('item', mask.astype(np.int64))
+        rows = np.nonzero(mask)[0]
+        cols = slots[rows, 0]
+        self.it_x[rows, cols] = SCREEN_WIDTH
+        self.it_y[rows, cols] = self.rng.integers(50, SCREEN_HEIGHT - 50 + 1, rows.shape[0])
+        self.it_type[rows, cols] = self.rng.integers(1, len(ITEM_TYPES) + 1, rows.shape[0])
+        self.it_alive[rows, cols] = True
+
+    def _info(self):
+        return {'score': self.score.copy(), 'frames': self.game_time.copy(),
+                'items': self.items_collected.copy()}
+
+    def _observations(self):
+        active = self.effect_timer > 0
+        ob_w, ob_h, ob_speed = self._obstacle_geometry(active)
+        duration = self.tunables['item_effect_duration']
+        remaining = np.where(active, 1 - (self.effect_timer - 1) / duration, 0.0)
+        obstacles = np.stack([self.ob_x, self.ob_y, ob_w, ob_h, ob_speed], axis=2)
+        items = np.stack([self.it_x, self.it_y, self.it_type.astype(np.float64)], axis=2)
+        return build_observations(self.player_y, self.player_h, self.player_speed, remaining,
+                                  obstacles, self.ob_alive, items, self.it_alive)